@@ -0,0 +1,57 @@
+"""keys the books_fts search index on books.search_rowid
+
+Revision ID: 0c4f9e2d7a18
+Revises: f22c038c3a71
+Create Date: 2026-10-19 09:12:40.551873
+
+books_fts used the implicit rowid of books, which has no INTEGER PRIMARY
+KEY, so VACUUM and table rebuilds could renumber it under the index. The
+explicit search_rowid column is copied like any other column. Existing
+books keep their current rowid as search_rowid.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.book import drop_search_index_ddl, search_index_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0c4f9e2d7a18"
+down_revision: Union[str, Sequence[str], None] = "f22c038c3a71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("books", sa.Column("search_rowid", sa.Integer(), nullable=True))
+    op.create_index(
+        op.f("ix_books_search_rowid"), "books", ["search_rowid"], unique=True
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in drop_search_index_ddl("sqlite"):
+            op.execute(statement)
+        op.execute("UPDATE books SET search_rowid = rowid")
+        for statement in search_index_ddl("sqlite"):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    sqlite = op.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        for statement in drop_search_index_ddl("sqlite"):
+            op.execute(statement)
+    op.drop_index(op.f("ix_books_search_rowid"), table_name="books")
+    if sqlite:
+        # A plain ALTER (SQLite 3.35+); a batch rebuild would drop the
+        # row count triggers.
+        op.execute("ALTER TABLE books DROP COLUMN search_rowid")
+        for statement in search_index_ddl("sqlite", key="rowid"):
+            op.execute(statement)
+    else:
+        op.drop_column("books", "search_rowid")
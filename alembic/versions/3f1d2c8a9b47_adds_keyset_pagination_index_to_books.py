@@ -0,0 +1,30 @@
+"""adds (created_at, id) index to books for keyset pagination
+
+Revision ID: 3f1d2c8a9b47
+Revises: 2a351ef8f622
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1d2c8a9b47"
+down_revision: Union[str, Sequence[str], None] = "2a351ef8f622"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_books_created_at_id", "books", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_created_at_id", table_name="books")
@@ -0,0 +1,80 @@
+"""hashes verification tokens and adds lookup indexes
+
+Revision ID: 7e2a9c41d6b3
+Revises: 5b8e0c7d3f14
+Create Date: 2026-10-18 23:41:07.218364
+
+"""
+
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2a9c41d6b3"
+down_revision: Union[str, Sequence[str], None] = "5b8e0c7d3f14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "verification_tokens",
+        sa.Column("token_digest", sa.String(length=64), nullable=True),
+    )
+
+    # Outstanding tokens keep working: store the digest of each one.
+    tokens = sa.table(
+        "verification_tokens",
+        sa.column("token_id", sa.Uuid()),
+        sa.column("token", sa.String()),
+        sa.column("token_digest", sa.String()),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(tokens.c.token_id, tokens.c.token)).all()
+    for token_id, token in rows:
+        bind.execute(
+            tokens.update()
+            .where(tokens.c.token_id == token_id)
+            .values(token_digest=hashlib.sha256(token.encode("utf-8")).hexdigest())
+        )
+    if bind.dialect.name == "sqlite":
+        # Rows written with the old "'false'" default hold that string, which
+        # is_used = 0 never matches.
+        op.execute("UPDATE verification_tokens SET is_used = 0 WHERE is_used = 'false'")
+
+    # SQLite can't alter or drop columns in place; batch mode recreates the
+    # table there and emits plain ALTERs elsewhere.
+    with op.batch_alter_table("verification_tokens") as batch_op:
+        batch_op.alter_column("token_digest", nullable=False)
+        batch_op.drop_column("token")
+        batch_op.alter_column("is_used", server_default=sa.false())
+        batch_op.create_index(
+            batch_op.f("ix_verification_tokens_token_digest"),
+            ["token_digest"],
+            unique=True,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_verification_tokens_user_id"), ["user_id"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_verification_tokens_expires_at"), ["expires_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Plaintext tokens can't be recovered from their digests; unverified users
+    # request a new one through /auth/resend-verification-token.
+    op.execute("DELETE FROM verification_tokens")
+    with op.batch_alter_table("verification_tokens") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_verification_tokens_expires_at"))
+        batch_op.drop_index(batch_op.f("ix_verification_tokens_user_id"))
+        batch_op.drop_index(batch_op.f("ix_verification_tokens_token_digest"))
+        batch_op.alter_column("is_used", server_default=sa.text("'false'"))
+        batch_op.add_column(sa.Column("token", sa.String(), nullable=False))
+        batch_op.drop_column("token_digest")
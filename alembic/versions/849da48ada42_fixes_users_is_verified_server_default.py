@@ -0,0 +1,35 @@
+"""fixes users.is_verified server default
+
+Revision ID: 849da48ada42
+Revises: a3f0b7c92e51
+Create Date: 2026-10-19 01:40:22.618304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "849da48ada42"
+down_revision: Union[str, Sequence[str], None] = "a3f0b7c92e51"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # The "'false'" default stored that string, which reads back as true:
+        # these users never verified their email.
+        op.execute("UPDATE users SET is_verified = 0 WHERE is_verified = 'false'")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column("is_verified", server_default=sa.false())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column("is_verified", server_default=sa.text("'false'"))
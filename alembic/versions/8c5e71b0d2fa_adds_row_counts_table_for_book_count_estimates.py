@@ -0,0 +1,61 @@
+"""adds row_counts table for book count estimates
+
+Revision ID: 8c5e71b0d2fa
+Revises: 3f1d2c8a9b47
+Create Date: 2026-10-18 10:04:57.218840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c5e71b0d2fa"
+down_revision: Union[str, Sequence[str], None] = "3f1d2c8a9b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Created everywhere to match models/row_count.py (and autogenerate);
+    # Postgres estimates come from pg_class, so only SQLite fills it.
+    op.create_table(
+        "row_counts",
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("row_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "INSERT OR IGNORE INTO row_counts (table_name, row_count) "
+        "SELECT 'books', COUNT(*) FROM books"
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS books_row_count_insert AFTER INSERT ON books
+        BEGIN
+            UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'books';
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS books_row_count_delete AFTER DELETE ON books
+        BEGIN
+            UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'books';
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS books_row_count_delete")
+        op.execute("DROP TRIGGER IF EXISTS books_row_count_insert")
+    op.drop_table("row_counts")
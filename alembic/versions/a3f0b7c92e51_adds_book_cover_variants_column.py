@@ -0,0 +1,29 @@
+"""adds book_cover_variants column to books
+
+Revision ID: a3f0b7c92e51
+Revises: 7e2a9c41d6b3
+Create Date: 2026-10-19 01:12:48.506231
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f0b7c92e51"
+down_revision: Union[str, Sequence[str], None] = "7e2a9c41d6b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("books", sa.Column("book_cover_variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("books", "book_cover_variants")
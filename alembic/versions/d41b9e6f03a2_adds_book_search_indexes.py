@@ -0,0 +1,33 @@
+"""adds full-text and trigram search indexes to books
+
+Revision ID: d41b9e6f03a2
+Revises: 8c5e71b0d2fa
+Create Date: 2026-10-18 11:37:02.660413
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from models.book import drop_search_index_ddl, search_index_ddl
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d41b9e6f03a2"
+down_revision: Union[str, Sequence[str], None] = "8c5e71b0d2fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyed on rowid until 0c4f9e2d7a18 adds books.search_rowid.
+    for statement in search_index_ddl(op.get_bind().dialect.name, key="rowid"):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in drop_search_index_ddl(op.get_bind().dialect.name):
+        op.execute(statement)
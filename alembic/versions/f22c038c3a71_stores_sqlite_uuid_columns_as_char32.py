@@ -0,0 +1,177 @@
+"""stores SQLite uuid columns as CHAR(32)
+
+Revision ID: f22c038c3a71
+Revises: 849da48ada42
+Create Date: 2026-10-19 02:05:47.310925
+
+The id columns used to be declared with the PostgreSQL UUID type, which
+SQLite creates as a column named UUID with NUMERIC affinity (batch
+migrations reflect it back as NUMERIC). An id whose hex digits read as a
+number was stored as a REAL and could no longer be loaded. The models now
+use the generic Uuid type, CHAR(32) on SQLite; this rebuilds the tables
+created before that. PostgreSQL keeps its native uuid columns, so nothing
+runs there.
+
+Ids that were already turned into numbers can't be recovered: they are
+logged (table, rowid) before the rebuild and come out as text that still
+does not parse as a UUID. Delete or fix those rows by hand.
+
+The downgrade rebuilds the columns as UUID (NUMERIC affinity) again. It
+refuses to run while any stored id would be turned into a number by that
+affinity, since the rebuild would lose it.
+
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f22c038c3a71"
+down_revision: Union[str, Sequence[str], None] = "849da48ada42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger(f"alembic.runtime.migration.{revision}")
+
+UUID_COLUMNS = {
+    "users": ("id",),
+    "books": ("id", "owner_id"),
+    "verification_tokens": ("token_id", "user_id"),
+}
+
+
+def _columns(bind, table: str, columns: tuple[str, ...]) -> list:
+    """PRAGMA table_info rows of the given `columns` that exist in `table`."""
+    return [
+        row
+        for row in bind.exec_driver_sql(f"PRAGMA table_info({table})")
+        if row.name in columns
+    ]
+
+
+def _is_text(row) -> bool:
+    return "CHAR" in row.type.upper() or "TEXT" in row.type.upper()
+
+
+@contextmanager
+def _recreate(bind, table: str, **batch_args):
+    """Batch-recreate `table`, keeping its triggers."""
+    # Dropping the old table drops its triggers (search index, row count).
+    triggers = [
+        sql
+        for (sql,) in bind.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+            (table,),
+        )
+    ]
+    with op.batch_alter_table(table, recreate="always", **batch_args) as batch_op:
+        yield batch_op
+    for sql in triggers:
+        op.execute(sql)
+
+
+def _rebuild_search_index(bind) -> None:
+    fts = bind.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+    ).first()
+    if fts:
+        # The copy renumbered the books rowids the search index points at.
+        op.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    rebuilt = []
+    for table, columns in UUID_COLUMNS.items():
+        numeric = [row.name for row in _columns(bind, table, columns) if not _is_text(row)]
+        if not numeric:
+            continue
+        rebuilt.append(table)
+        for column in numeric:
+            for (rowid,) in bind.exec_driver_sql(
+                f"SELECT rowid FROM {table} WHERE typeof({column}) NOT IN ('text', 'null')"
+            ):
+                logger.warning("%s rowid %s: %s is not a stored UUID", table, rowid, column)
+
+        with _recreate(bind, table) as batch_op:
+            for column in numeric:
+                batch_op.alter_column(column, type_=sa.Uuid())
+
+    if "books" in rebuilt:
+        _rebuild_search_index(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+
+    text_columns = {}
+    for table, columns in UUID_COLUMNS.items():
+        rows = [row for row in _columns(bind, table, columns) if _is_text(row)]
+        if rows:
+            text_columns[table] = rows
+    if not text_columns:
+        return
+
+    # Under the old NUMERIC affinity a hex id that reads as a number (all
+    # digits, or digits around one "e") would be stored as a number and lost.
+    # Copy the ids through a column of that type first and refuse before
+    # touching any table if one would not survive.
+    op.execute("CREATE TEMP TABLE uuid_affinity_probe (value UUID)")
+    try:
+        for table, rows in text_columns.items():
+            for row in rows:
+                op.execute(
+                    f"INSERT INTO uuid_affinity_probe SELECT {row.name} FROM {table}"
+                )
+        lost = bind.exec_driver_sql(
+            "SELECT count(*) FROM uuid_affinity_probe "
+            "WHERE typeof(value) NOT IN ('text', 'null')"
+        ).scalar()
+    finally:
+        op.execute("DROP TABLE uuid_affinity_probe")
+    if lost:
+        raise RuntimeError(
+            f"{lost} stored UUIDs would turn into numbers in the old UUID column "
+            "type; fix or delete those rows before downgrading"
+        )
+
+    for table, rows in text_columns.items():
+        # Declared through reflect_args rather than alter_column: the batch
+        # copy would CAST(... AS UUID), which converts every id to a number.
+        # An overriding column replaces the reflected one, foreign key included.
+        foreign_keys = {}
+        for fk in bind.exec_driver_sql(f"PRAGMA foreign_key_list({table})"):
+            _, _, target, column, target_column, _, on_delete, _ = fk
+            foreign_keys[column] = [
+                sa.ForeignKey(
+                    f"{target}.{target_column}",
+                    ondelete=None if on_delete == "NO ACTION" else on_delete,
+                )
+            ]
+        reflect_args = [
+            sa.Column(
+                row.name,
+                sa.UUID(),
+                *foreign_keys.get(row.name, []),
+                primary_key=bool(row.pk),
+                nullable=not row.notnull,
+            )
+            for row in rows
+        ]
+        with _recreate(bind, table, reflect_args=reflect_args):
+            pass
+
+    if "books" in text_columns:
+        _rebuild_search_index(bind)
@@ -0,0 +1,61 @@
+"""
+Repricing N books: one PATCH /books/{id} per book vs a single PATCH /books/bulk.
+
+    poetry run python -m benchmarks.bench_bulk --books 2000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=50_000, help="catalog size")
+    args = parser.parse_args()
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_bulk.db")
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+
+    import main as app_main
+    from config.session import sync_engine
+    from models import Book
+
+    seed_books(sync_engine, args.rows)
+    with sync_engine.connect() as conn:
+        ids = [str(book_id) for book_id in conn.scalars(select(Book.id).limit(2 * args.books))]
+    per_row_ids, bulk_ids = ids[: args.books], ids[args.books :]
+
+    with TestClient(app_main.app) as client:
+        token = client.post(
+            "/auth/login", json={"email": "admin@gmail.com", "password": "admin123"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        started = time.perf_counter()
+        for book_id in per_row_ids:
+            client.patch(f"/books/{book_id}", data={"price": "9.99"}, headers=headers)
+        per_row = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = client.patch(
+            "/books/bulk",
+            json={"filter": {"ids": bulk_ids}, "changes": {"price": 9.99}},
+            headers=headers,
+        ).json()
+        bulk = time.perf_counter() - started
+
+    print(f"{'mode':<10} {'books':>8} {'seconds':>10}")
+    print(f"{'per-row':<10} {len(per_row_ids):>8} {per_row:>10.3f}")
+    print(f"{'bulk':<10} {result['affected']:>8} {bulk:>10.3f}")
+    print(f"speedup: {per_row / bulk:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
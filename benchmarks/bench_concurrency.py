@@ -0,0 +1,88 @@
+"""
+Throughput of the API under N concurrent clients, driven in-process over ASGI.
+
+    poetry run python -m benchmarks.bench_concurrency --clients 1,10,50
+
+Each client loops over a read-heavy mix (list, get by id, admin patch) for
+--seconds. Blocking work done on the event loop shows up here as throughput
+that stops scaling with the number of clients.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+async def run_clients(app, clients: int, seconds: float, book_ids, token) -> dict:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + seconds
+    counts = {"ok": 0, "failed": 0}
+
+    async def client_loop(client, rng):
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < 0.45:
+                response = await client.get("/books", params={"per_page": 20})
+            elif roll < 0.9:
+                response = await client.get(f"/books/{rng.choice(book_ids)}")
+            else:
+                response = await client.patch(
+                    f"/books/{rng.choice(book_ids)}",
+                    data={"price": f"{rng.uniform(5, 50):.2f}"},
+                    headers=headers,
+                )
+            counts["ok" if response.status_code < 400 else "failed"] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(client_loop(client, random.Random(n)) for n in range(clients))
+        )
+        elapsed = time.perf_counter() - started
+    return {**counts, "rps": counts["ok"] / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--clients", default="1,10,50")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_concurrency.db")
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+
+    import main as app_main
+    from config.session import sync_engine
+    from models import Book
+
+    seed_books(sync_engine, args.rows)
+    with sync_engine.connect() as conn:
+        book_ids = [str(i) for i in conn.scalars(select(Book.id).limit(1000))]
+
+    # TestClient runs the lifespan (admin seed) and keeps it alive.
+    with TestClient(app_main.app) as client:
+        token = client.post(
+            "/auth/login", json={"email": "admin@gmail.com", "password": "admin123"}
+        ).json()["access_token"]
+
+        print(f"{'clients':>8} {'req/s':>10} {'failed':>8}")
+        for clients in (int(c) for c in args.clients.split(",")):
+            result = client.portal.call(
+                run_clients, app_main.app, clients, args.seconds, book_ids, token
+            )
+            print(f"{clients:>8} {result['rps']:>10.1f} {result['failed']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput and peak RSS of the streaming CSV ingestion.
+
+    poetry run python -m benchmarks.bench_csv_ingest --rows 2000000
+
+Peak RSS should stay roughly constant as --rows grows; it depends on
+--chunk-size, not on the file size. (Unix only: uses the resource module.)
+"""
+
+import argparse
+import asyncio
+import tempfile
+import resource
+import time
+import uuid
+from pathlib import Path
+
+from benchmarks.common import use_database
+from utils.data_generator import FaultRates, GeneratorConfig, generate_books, write_csv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--commit", choices=["chunk", "all"], default="chunk")
+    parser.add_argument(
+        "--fault-rate", type=float, default=0.0, help="per-column share of invalid values"
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    use_database(workdir / "bench_csv_ingest.db")
+
+    from config.base import Base
+    from config.session import AsyncSessionLocal, sync_engine
+    from utils.csv_ingest import ingest_books_csv
+
+    Base.metadata.create_all(sync_engine)
+
+    async def ingest(raw):
+        async with AsyncSessionLocal() as db:
+            return await ingest_books_csv(
+                db,
+                raw,
+                uuid.uuid4(),
+                chunk_size=args.chunk_size,
+                commit_policy=args.commit,
+            )
+
+    csv_path = workdir / "books.csv"
+    config = GeneratorConfig(faults=FaultRates.uniform(args.fault_rate))
+    write_csv(generate_books(config, args.rows), csv_path)
+    size_mb = csv_path.stat().st_size / 1024 / 1024
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    with open(csv_path, "rb") as raw:
+        result = asyncio.run(ingest(raw))
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"file: {size_mb:.1f} MiB, {args.rows:,} rows")
+    print(f"inserted: {result['inserted']:,}  skipped: {result['skipped']:,}")
+    print(f"throughput: {result['inserted'] / elapsed:,.0f} rows/s ({elapsed:.2f}s)")
+    # ru_maxrss is KiB on Linux
+    print(
+        f"peak RSS: {rss_after / 1024:.1f} MiB "
+        f"(+{(rss_after - rss_before) / 1024:.1f} MiB during ingestion)"
+    )
+
+
+if __name__ == "__main__":
+    main()
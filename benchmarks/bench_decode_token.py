@@ -0,0 +1,44 @@
+"""
+Micro-benchmark of utils.token.decode_token with and without the verified
+token cache.
+
+    poetry run python -m benchmarks.bench_decode_token --calls 100000
+"""
+
+import argparse
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--tokens", type=int, default=100, help="distinct tokens")
+    args = parser.parse_args()
+
+    from utils.token import create_access_token, decode_token, verified_tokens
+
+    tokens = [
+        create_access_token(f"user{n}@example.com", "user")[0]
+        for n in range(args.tokens)
+    ]
+
+    def run() -> float:
+        started = time.perf_counter()
+        for n in range(args.calls):
+            decode_token(tokens[n % len(tokens)])
+        return (time.perf_counter() - started) / args.calls * 1_000_000
+
+    verified_tokens.enabled = False
+    uncached = run()
+    verified_tokens.enabled = True
+    verified_tokens.clear()
+    cached = run()
+
+    print(f"{'mode':<10} {'us/call':>10}")
+    print(f"{'uncached':<10} {uncached:>10.2f}")
+    print(f"{'cached':<10} {cached:>10.2f}")
+    print(f"speedup: {uncached / cached:.1f}x  {verified_tokens.stats()}")
+
+
+if __name__ == "__main__":
+    main()
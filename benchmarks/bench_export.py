@@ -0,0 +1,102 @@
+"""
+Rows/sec and peak RSS of GET /books/export.
+
+    poetry run python -m benchmarks.bench_export --rows 1000000
+
+RSS growth during the export should not depend on --rows. The response is
+consumed straight from the ASGI app, since TestClient buffers whole bodies.
+(Unix only: uses the resource module.)
+"""
+
+import argparse
+import asyncio
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+async def export(app, token: str, export_format: str) -> tuple[int, int]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/books/export",
+        "raw_path": b"/books/export",
+        "query_string": f"format={export_format}".encode(),
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    totals = {"lines": 0, "size": 0}
+    request_sent = False
+    never_disconnects = asyncio.Event()
+
+    async def receive():
+        # StreamingResponse keeps polling for a disconnect until the body
+        # is done; after the request itself, block like an idle client.
+        nonlocal request_sent
+        if request_sent:
+            await never_disconnects.wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"export failed with HTTP {message['status']}")
+        if message["type"] == "http.response.body":
+            totals["lines"] += message["body"].count(b"\n")
+            totals["size"] += len(message["body"])
+
+    await app(scope, receive, send)
+    return totals["lines"], totals["size"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--db", help="reuse/keep this SQLite file")
+    args = parser.parse_args()
+
+    db_path = Path(args.db or Path(tempfile.mkdtemp()) / "bench_export.db")
+    fresh = not db_path.exists()
+    use_database(db_path)
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from config.session import sync_engine
+
+    if fresh:
+        print(f"seeding {args.rows:,} books into {db_path} ...")
+        seed_books(sync_engine, args.rows)
+
+    with TestClient(app_main.app) as client:
+        token = client.post(
+            "/auth/login", json={"email": "admin@gmail.com", "password": "admin123"}
+        ).json()["access_token"]
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        lines, size = client.portal.call(export, app_main.app, token, args.format)
+        elapsed = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    rows = lines - 1 if args.format == "csv" else lines
+    print(f"exported {rows:,} rows, {size / 1024 / 1024:.1f} MiB in {elapsed:.2f}s")
+    print(f"throughput: {rows / elapsed:,.0f} rows/s")
+    # ru_maxrss is KiB on Linux
+    print(
+        f"peak RSS: {rss_after / 1024:.1f} MiB "
+        f"(+{(rss_after - rss_before) / 1024:.1f} MiB during export)"
+    )
+
+
+if __name__ == "__main__":
+    main()
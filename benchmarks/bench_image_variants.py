@@ -0,0 +1,90 @@
+"""
+Cover variant rendering: time per stage, output sizes and pool throughput.
+
+    poetry run python -m benchmarks.bench_image_variants --width 3024 --height 4032 --images 8
+
+Renders a synthetic photo-like JPEG with utils/image_variants.render_variants
+and reports the median decode/resize/encode time and the size of every
+variant next to the original, i.e. what a thumbnail grid downloads instead.
+Then --images uploads are rendered through VariantPool with 1..--workers
+processes to show the throughput the pool adds on this machine.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def make_photo(path: Path, width: int, height: int) -> None:
+    from PIL import Image
+
+    # Gradients plus low-frequency noise compress roughly like a photo: a
+    # flat image is unrealistically cheap, per-pixel noise unrealistically dear.
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width // 8, height // 8), 60).resize(
+        (width, height), Image.Resampling.BICUBIC
+    )
+    Image.merge("RGB", (gradient, noise, gradient.rotate(90, expand=False))).save(
+        path, "JPEG", quality=92
+    )
+
+
+async def pool_throughput(source: Path, images: int, workers: int) -> float:
+    from utils.image_variants import VariantPool
+
+    pool = VariantPool(workers)
+    try:
+        # Warm the workers so process start-up is not counted.
+        with tempfile.TemporaryDirectory() as out_dir:
+            await asyncio.gather(*(pool.render(str(source), out_dir) for _ in range(workers)))
+        out_dirs = [tempfile.mkdtemp() for _ in range(images)]
+        started = time.perf_counter()
+        await asyncio.gather(*(pool.render(str(source), out_dir) for out_dir in out_dirs))
+        return images / (time.perf_counter() - started)
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--images", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4))
+    args = parser.parse_args()
+
+    from utils.image_variants import render_variants
+
+    source = Path(tempfile.mkdtemp()) / "photo.jpg"
+    make_photo(source, args.width, args.height)
+
+    timings: dict[str, list[float]] = {}
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as out_dir:
+            rendered = render_variants(str(source), out_dir)
+            sizes = [(size, key, os.path.getsize(path)) for size, key, path in rendered["files"]]
+        for stage, seconds in rendered["timings"].items():
+            timings.setdefault(stage, []).append(seconds)
+
+    print(f"source {args.width}x{args.height} JPEG, {source.stat().st_size / 1024:.0f} KiB")
+    print(f"{'stage':<8} {'median ms':>10}")
+    for stage, values in timings.items():
+        print(f"{stage:<8} {statistics.median(values) * 1000:>10.1f}")
+    print(f"{'variant':<8} {'format':<6} {'KiB':>8} {'% of original':>14}")
+    for size, key, nbytes in sizes:
+        share = nbytes / source.stat().st_size * 100
+        print(f"{size:<8} {key:<6} {nbytes / 1024:>8.1f} {share:>14.2f}")
+
+    print(f"{'workers':<8} {'images/s':>9}")
+    for workers in range(1, args.workers + 1):
+        rate = asyncio.run(pool_throughput(source, args.images, workers))
+        print(f"{workers:<8} {rate:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
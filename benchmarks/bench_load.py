@@ -0,0 +1,433 @@
+"""
+Load-test harness: replay a request trace against the API and report per-route latency.
+
+    # synthetic mix, in-process over ASGI
+    poetry run python -m benchmarks.bench_load run --rows 100000 --requests 5000 \\
+        --concurrency 32 --out results/base.json
+
+    # same trace through uvicorn with 4 workers
+    poetry run python -m benchmarks.bench_load run --target uvicorn --workers 4 ...
+
+    # replay a recorded trace, then compare two runs
+    poetry run python -m benchmarks.bench_load run --trace trace.jsonl --out results/new.json
+    poetry run python -m benchmarks.bench_load compare results/base.json results/new.json
+
+A trace is JSONL, one request per line:
+
+    {"route": "GET /books/{book_id}", "method": "GET", "path": "/books/{book_id}"}
+    {"method": "GET", "path": "/books", "params": {"q": "garden"}}
+    {"method": "POST", "path": "/auth/login", "json": {"email": "...", "password": "..."}}
+    {"method": "POST", "path": "/books", "form": {...}, "auth": "admin"}
+    {"method": "POST", "path": "/books/upload", "csv_rows": 20, "auth": "admin"}
+
+`{book_id}` in a path is replaced by a random seeded book id, "auth":
+"admin" sends the admin bearer token, and "csv_rows" uploads a generated
+CSV of that many rows. `route` is the label results are grouped by; it
+defaults to "<METHOD> <path>" before substitution. (The backlog file
+requests.jsonl at the repo root is not a trace.) --write-trace saves the
+synthetic mix so later runs can replay exactly the same requests.
+
+`compare` exits with status 1 when a route's p95 grows, or its throughput
+drops, by more than --threshold (default 10%).
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+from utils.data_generator import SURNAMES, TITLE_WORDS
+
+ADMIN = {"email": "admin@gmail.com", "password": "admin123"}
+
+# share of each request kind in the synthetic mix
+SYNTHETIC_MIX = {
+    "list": 0.35,
+    "get": 0.30,
+    "search": 0.12,
+    "login": 0.08,
+    "create": 0.10,
+    "upload": 0.05,
+}
+
+
+def synthetic_trace(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    kinds, weights = zip(*SYNTHETIC_MIX.items())
+    trace = []
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind == "list":
+            entry = {
+                "route": "GET /books",
+                "method": "GET",
+                "path": "/books",
+                "params": {"page": rng.randint(1, 50), "per_page": 20},
+            }
+        elif kind == "get":
+            entry = {
+                "route": "GET /books/{book_id}",
+                "method": "GET",
+                "path": "/books/{book_id}",
+            }
+        elif kind == "search":
+            entry = {
+                "route": "GET /books?q",
+                "method": "GET",
+                "path": "/books",
+                "params": {"q": rng.choice(TITLE_WORDS), "per_page": 20},
+            }
+        elif kind == "login":
+            entry = {
+                "route": "POST /auth/login",
+                "method": "POST",
+                "path": "/auth/login",
+                "json": ADMIN,
+            }
+        elif kind == "create":
+            entry = {
+                "route": "POST /books",
+                "method": "POST",
+                "path": "/books",
+                "auth": "admin",
+                "form": {
+                    "title": f"{rng.choice(TITLE_WORDS).title()} Load {rng.randrange(10**6)}",
+                    "author": rng.choice(SURNAMES).title(),
+                    "price": f"{rng.uniform(5, 60):.2f}",
+                    "published_date": f"{rng.randint(1950, 2024)}-01-01",
+                },
+            }
+        else:
+            entry = {
+                "route": "POST /books/upload",
+                "method": "POST",
+                "path": "/books/upload",
+                "auth": "admin",
+                "csv_rows": 20,
+            }
+        trace.append(entry)
+    return trace
+
+
+def load_trace(path: Path) -> list[dict]:
+    with open(path) as trace_file:
+        return [json.loads(line) for line in trace_file if line.strip()]
+
+
+def _csv_upload(rows: int, rng: random.Random) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["title", "author", "price", "published_date"])
+    for _ in range(rows):
+        writer.writerow(
+            [
+                f"{rng.choice(TITLE_WORDS).title()} Upload {rng.randrange(10**6)}",
+                rng.choice(SURNAMES).title(),
+                f"{rng.uniform(5, 60):.2f}",
+                f"{rng.randint(1950, 2024)}-06-01",
+            ]
+        )
+    return buffer.getvalue().encode()
+
+
+def _percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def summarize(
+    samples: dict[str, list[float]], errors: dict[str, dict[str, int]], elapsed: float
+) -> dict:
+    routes = {}
+    for route in sorted(set(samples) | set(errors)):
+        ordered = sorted(samples.get(route, []))
+        routes[route] = {
+            "count": len(ordered),
+            "errors": sum(errors.get(route, {}).values()),
+            "error_statuses": errors.get(route, {}),
+            "rps": len(ordered) / elapsed,
+            "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+            "p50_ms": _percentile(ordered, 0.50) * 1000,
+            "p95_ms": _percentile(ordered, 0.95) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+        }
+    everything = sorted(s for route_samples in samples.values() for s in route_samples)
+    total = {
+        "count": len(everything),
+        "errors": sum(sum(by_status.values()) for by_status in errors.values()),
+        "rps": len(everything) / elapsed,
+        "p50_ms": _percentile(everything, 0.50) * 1000,
+        "p95_ms": _percentile(everything, 0.95) * 1000,
+        "p99_ms": _percentile(everything, 0.99) * 1000,
+    }
+    return {"routes": routes, "total": total}
+
+
+async def replay(client, trace, requests, seconds, concurrency, book_ids, token, seed):
+    headers = {"Authorization": f"Bearer {token}"}
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, dict[str, int]] = {}
+    deadline = time.perf_counter() + seconds if seconds else None
+    issued = 0
+
+    def next_entry():
+        nonlocal issued
+        if requests is not None and issued >= requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        entry = trace[issued % len(trace)]
+        issued += 1
+        return entry
+
+    async def worker(rng: random.Random):
+        while (entry := next_entry()) is not None:
+            route = entry.get("route") or f"{entry['method']} {entry['path']}"
+            path = entry["path"].replace("{book_id}", rng.choice(book_ids))
+            kwargs = {"params": entry.get("params"), "headers": None}
+            if entry.get("auth") == "admin":
+                kwargs["headers"] = headers
+            if "json" in entry:
+                kwargs["json"] = entry["json"]
+            if "form" in entry:
+                kwargs["data"] = entry["form"]
+            if "csv_rows" in entry:
+                kwargs["files"] = {
+                    "csv_file": ("books.csv", _csv_upload(entry["csv_rows"], rng), "text/csv")
+                }
+
+            started = time.perf_counter()
+            try:
+                response = await client.request(entry["method"], path, **kwargs)
+                outcome = str(response.status_code)
+            except Exception as exc:
+                outcome = type(exc).__name__
+            elapsed = time.perf_counter() - started
+            if not outcome.isdigit() or int(outcome) >= 400:
+                by_status = errors.setdefault(route, {})
+                by_status[outcome] = by_status.get(outcome, 0) + 1
+            else:
+                samples.setdefault(route, []).append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + n)) for n in range(concurrency)))
+    return summarize(samples, errors, time.perf_counter() - started)
+
+
+async def _login(client) -> str:
+    response = await client.post("/auth/login", json=ADMIN)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_in_process(args, trace, book_ids) -> dict:
+    import httpx
+
+    import main as app_main
+
+    app = app_main.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            token = await _login(client)
+            return await replay(
+                client, trace, args.requests, args.seconds, args.concurrency,
+                book_ids, token, args.seed,
+            )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(args, trace, book_ids) -> dict:
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits
+        ) as client:
+            for _ in range(300):
+                try:
+                    await client.get("/books", params={"per_page": 1})
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            token = await _login(client)
+            return await replay(
+                client, trace, args.requests, args.seconds, args.concurrency,
+                book_ids, token, args.seed,
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(result: dict) -> None:
+    print(
+        f"{'route':<24} {'count':>7} {'err':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, r in rows:
+        statuses = " ".join(f"{code}x{n}" for code, n in r.get("error_statuses", {}).items())
+        print(
+            f"{route:<24} {r['count']:>7} {r['errors']:>5} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}  {statuses}"
+        )
+
+
+def command_run(args) -> None:
+    if args.trace:
+        trace = load_trace(args.trace)
+    else:
+        trace = synthetic_trace(args.requests or 10_000, args.seed)
+    if args.write_trace:
+        with open(args.write_trace, "w") as trace_file:
+            trace_file.writelines(json.dumps(entry) + "\n" for entry in trace)
+
+    db_path = Path(args.db or Path(tempfile.mkdtemp()) / "bench_load.db")
+    fresh = not db_path.exists()
+    use_database(db_path)
+
+    from sqlalchemy import select
+
+    import main  # noqa: F401
+    from config.session import sync_engine
+    from models import Book
+
+    if fresh:
+        print(f"seeding {args.rows:,} books into {db_path} ...")
+        seed_books(sync_engine, args.rows)
+    with sync_engine.connect() as conn:
+        book_ids = [str(i) for i in conn.scalars(select(Book.id).limit(5000))]
+
+    if args.target == "uvicorn":
+        # Seed the admin once here so the workers don't race to create it.
+        asyncio.run(_run_lifespan_once())
+        result = asyncio.run(run_uvicorn(args, trace, book_ids))
+    else:
+        result = asyncio.run(run_in_process(args, trace, book_ids))
+
+    result["meta"] = {
+        "target": args.target,
+        "workers": args.workers if args.target == "uvicorn" else None,
+        "concurrency": args.concurrency,
+        "rows": args.rows,
+        "trace": str(args.trace) if args.trace else "synthetic",
+        "seed": args.seed,
+        "git_revision": _git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    print_results(result)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(result, indent=2))
+        print(f"results written to {args.out}")
+
+
+async def _run_lifespan_once() -> None:
+    import main as app_main
+
+    async with app_main.app.router.lifespan_context(app_main.app):
+        pass
+
+
+def command_compare(args) -> None:
+    base = json.loads(args.base.read_text())
+    new = json.loads(args.new.read_text())
+    regressions = []
+
+    print(
+        f"{'route':<24} {'p95 base':>9} {'p95 new':>9} {'delta':>8} "
+        f"{'rps base':>9} {'rps new':>9} {'delta':>8}"
+    )
+    routes = [r for r in base["routes"] if r in new["routes"]] + ["TOTAL"]
+    for route in routes:
+        b = base["total"] if route == "TOTAL" else base["routes"][route]
+        n = new["total"] if route == "TOTAL" else new["routes"][route]
+        p95_delta = (n["p95_ms"] - b["p95_ms"]) / b["p95_ms"] if b["p95_ms"] else 0.0
+        rps_delta = (n["rps"] - b["rps"]) / b["rps"] if b["rps"] else 0.0
+        regressed = p95_delta > args.threshold or rps_delta < -args.threshold
+        if regressed:
+            regressions.append(route)
+        print(
+            f"{route:<24} {b['p95_ms']:>9.1f} {n['p95_ms']:>9.1f} {p95_delta:>+8.1%} "
+            f"{b['rps']:>9.1f} {n['rps']:>9.1f} {rps_delta:>+8.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+
+    if regressions:
+        print(f"{len(regressions)} route(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay a trace and record results")
+    run.add_argument("--trace", type=Path, help="JSONL trace; synthetic mix when omitted")
+    run.add_argument("--write-trace", type=Path, help="save the trace that was replayed")
+    run.add_argument("--requests", type=int, help="stop after this many requests")
+    run.add_argument("--seconds", type=float, help="stop after this long")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--rows", type=int, default=10_000, help="books to seed")
+    run.add_argument("--db", help="reuse/keep this SQLite file")
+    run.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    run.add_argument("--workers", type=int, default=2, help="uvicorn workers")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--out", type=Path, help="write results JSON here")
+    run.set_defaults(handler=command_run)
+
+    compare = commands.add_parser("compare", help="compare two result files")
+    compare.add_argument("base", type=Path)
+    compare.add_argument("new", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.10)
+    compare.set_defaults(handler=command_compare)
+
+    args = parser.parse_args()
+    if args.command == "run" and args.requests is None and args.seconds is None:
+        args.requests = 2000
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
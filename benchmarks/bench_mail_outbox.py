@@ -0,0 +1,140 @@
+"""
+Mail outbox throughput against a local aiosmtpd server.
+
+    poetry run python -m benchmarks.bench_mail_outbox --messages 500 --handshake-ms 50
+
+Queues --messages verification-sized mails and drains them with
+utils/mail_outbox.OutboxWorker in two ways:
+    per-message  one message per batch and a new SMTP connection per
+                 message, like the old BackgroundTasks + FastMail path
+    pooled       MAIL_OUTBOX_BATCH_SIZE messages per batch over one
+                 reused connection
+--handshake-ms is added to EHLO to stand in for the TCP/TLS setup to a
+remote server; --fail-rate makes the server answer 451 to that share of
+recipients once, to exercise the retry path.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import use_database
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SinkHandler:
+    """aiosmtpd handler that accepts everything after optional delays."""
+
+    def __init__(self, handshake_ms: float, fail_rate: float, seed: int = 7):
+        self.handshake = handshake_ms / 1000
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.refused: set[str] = set()
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        session.host_name = hostname
+        await asyncio.sleep(self.handshake)
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address not in self.refused and self.rng.random() < self.fail_rate:
+            self.refused.add(address)
+            return "451 4.3.0 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+async def drain(worker, per_message: bool) -> None:
+    while True:
+        claimed = await worker.drain_once()
+        if per_message:
+            await worker.smtp.close()
+        if not claimed:
+            # Retries are due after the (zero) backoff; stop once nothing is left.
+            if worker.queue_depth == 0:
+                return
+            await asyncio.sleep(0.01)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--handshake-ms", type=float, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_mail_outbox.db")
+
+    from sqlalchemy import delete
+
+    from config.base import Base
+    from config.session import AsyncSessionLocal, sync_engine
+    from models import OutboxMessage
+    from utils.mail_outbox import MAIL_OUTBOX_BATCH_SIZE, OutboxWorker, PooledSMTP, enqueue_mail
+
+    Base.metadata.create_all(sync_engine)
+    # Retries from --fail-rate are expected here.
+    logging.getLogger("utils.mail_outbox").setLevel(logging.ERROR)
+
+    async def enqueue(count: int) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(OutboxMessage))
+            for n in range(count):
+                enqueue_mail(
+                    db,
+                    f"reader{n}@example.com",
+                    "Prime Bookstore Verification",
+                    "Follow the following link for verification:\n"
+                    f"http://localhost:8000/auth/verify?token={n:043d}",
+                )
+            await db.commit()
+
+    async def run() -> None:
+        print(f"{'strategy':<12} {'messages':>8} {'seconds':>8} {'msg/s':>8} {'connections':>11} {'retried':>7}")
+        for strategy, batch_size in (("per-message", 1), ("pooled", MAIL_OUTBOX_BATCH_SIZE)):
+            port = _free_port()
+            handler = SinkHandler(args.handshake_ms, args.fail_rate)
+            controller = Controller(handler, hostname="127.0.0.1", port=port)
+            controller.start()
+            try:
+                await enqueue(args.messages)
+                worker = OutboxWorker(
+                    AsyncSessionLocal,
+                    smtp=PooledSMTP(hostname="127.0.0.1", port=port, start_tls=False, use_tls=False),
+                    batch_size=batch_size,
+                    backoff_seconds=0,
+                )
+                started = time.perf_counter()
+                await drain(worker, per_message=strategy == "per-message")
+                elapsed = time.perf_counter() - started
+                await worker.smtp.close()
+            finally:
+                controller.stop()
+            assert handler.received == args.messages, handler.received
+            print(
+                f"{strategy:<12} {args.messages:>8} {elapsed:>8.2f} {args.messages / elapsed:>8.0f} "
+                f"{worker.smtp.connections:>11} {worker.retried:>7}"
+            )
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-request cost of MetricsMiddleware and the query hooks (utils/metrics.py).
+
+    poetry run python -m benchmarks.bench_metrics_overhead --requests 5000
+
+Requests are sent straight to the ASGI app in a loop, without an HTTP
+client, so the instrumentation is not hidden behind client overhead. Each
+route is measured with the instrumentation on, then off.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+def _scope(path: str, query: str = "") -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def _run(app, scope: dict, requests: int) -> list[float]:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_metrics.db")
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    import main as app_main
+    from config.session import async_engine, sync_engine
+    from utils import metrics
+
+    app = app_main.app
+    instrumented_middleware = list(app.user_middleware)
+    plain_middleware = [
+        m for m in instrumented_middleware if m.cls is not metrics.MetricsMiddleware
+    ]
+    seed_books(sync_engine, 1000)
+
+    def set_instrumentation(enabled: bool) -> None:
+        target = async_engine.sync_engine
+        for name, hook in (
+            ("before_cursor_execute", metrics._before_cursor_execute),
+            ("after_cursor_execute", metrics._after_cursor_execute),
+        ):
+            if enabled and not event.contains(target, name, hook):
+                event.listen(target, name, hook)
+            elif not enabled and event.contains(target, name, hook):
+                event.remove(target, name, hook)
+        app.user_middleware = instrumented_middleware if enabled else plain_middleware
+        app.middleware_stack = app.build_middleware_stack()
+
+    with TestClient(app) as client:
+        book_id = client.get("/books", params={"per_page": 1}).json()["books"][0]["id"]
+        routes = {
+            "GET /books/{id} (cached)": _scope(f"/books/{book_id}"),
+            "GET /books?per_page=20": _scope("/books", "per_page=20&count=none"),
+        }
+
+        print(f"{'route':<28} {'off us':>9} {'on us':>9} {'overhead':>9}")
+        for label, scope in routes.items():
+            medians = {True: [], False: []}
+            for _ in range(args.rounds):
+                for enabled in (False, True):
+                    set_instrumentation(enabled)
+                    samples = client.portal.call(_run, app, scope, args.requests)
+                    medians[enabled].append(statistics.median(samples) * 1_000_000)
+            off, on = min(medians[False]), min(medians[True])
+            print(f"{label:<28} {off:>9.1f} {on:>9.1f} {on - off:>8.1f}us ({(on - off) / off:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
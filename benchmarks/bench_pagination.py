@@ -0,0 +1,82 @@
+"""
+Offset vs cursor pagination on GET /books at increasing page depths.
+
+    poetry run python -m benchmarks.bench_pagination --rows 1000000
+
+Offset latency grows with the page number because the database walks and
+discards every skipped row (and counts the table on every call); the cursor
+mode seeks straight to the key and should stay flat.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_books, timed, use_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--depths", default="0,0.01,0.1,0.5,0.99", help="fractions of the catalog"
+    )
+    parser.add_argument("--db", help="reuse/keep this SQLite file")
+    args = parser.parse_args()
+
+    db_path = Path(args.db or Path(tempfile.mkdtemp()) / "bench_pagination.db")
+    fresh = not db_path.exists()
+    use_database(db_path)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+
+    import main as app_main
+    from config.session import sync_engine
+    from models import Book
+    from utils.pagination import NEXT, encode_cursor, keyset_order
+
+    with TestClient(app_main.app) as client:
+        if fresh:
+            print(f"seeding {args.rows:,} books into {db_path} ...")
+            seed_books(sync_engine, args.rows)
+
+        print(f"{'depth':>8} {'page':>9} {'offset p50':>12} {'cursor p50':>12}")
+        for fraction in (float(d) for d in args.depths.split(",")):
+            row_offset = int(args.rows * fraction)
+            page = row_offset // args.per_page + 1
+
+            cursor = None
+            if row_offset:
+                with sync_engine.connect() as conn:
+                    created_at, book_id = conn.execute(
+                        select(Book.created_at, Book.id)
+                        .order_by(*keyset_order(NEXT))
+                        .offset(row_offset - 1)
+                        .limit(1)
+                    ).one()
+                cursor = encode_cursor(created_at, book_id, NEXT)
+
+            offset_stats = timed(
+                lambda: client.get(
+                    "/books", params={"page": page, "per_page": args.per_page}
+                ).raise_for_status(),
+                args.repeat,
+            )
+            cursor_params = {"mode": "cursor", "per_page": args.per_page}
+            if cursor:
+                cursor_params["cursor"] = cursor
+            cursor_stats = timed(
+                lambda: client.get("/books", params=cursor_params).raise_for_status(),
+                args.repeat,
+            )
+            print(
+                f"{fraction:>8.2%} {page:>9,} "
+                f"{offset_stats['p50_ms']:>10.2f}ms {cursor_stats['p50_ms']:>10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
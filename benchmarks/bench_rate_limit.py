@@ -0,0 +1,88 @@
+"""
+Per-request overhead of the auth rate limiter (utils/rate_limit.py).
+
+    poetry run python -m benchmarks.bench_rate_limit --calls 200000
+
+Times `await rate_limiter.check()` on a prepared Starlette request, the work the
+limiter adds in front of /auth/login, /auth/register and resend:
+    hot key     every call from one IP and email (one bucket pair)
+    many keys   a new IP and email per call, --keys distinct clients
+                (with --keys above --max-keys the memory store evicts)
+    throttled   every call rejected with 429 (the exception path)
+for the memory store, the SQLite store and a disabled limiter.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from utils.rate_limit import (
+    Limit,
+    MemoryBucketStore,
+    RateLimiter,
+    SQLiteBucketStore,
+)
+
+OPEN = Limit(per_minute=1e12, burst=10**9)
+CLOSED = Limit(per_minute=1e-9, burst=0)
+
+
+def _request(ip: str) -> Request:
+    return Request({"type": "http", "headers": [], "client": (ip, 50000)})
+
+
+async def run(limiter: RateLimiter, requests: list[Request], calls: int) -> float:
+    """Median ns per check over 5 rounds."""
+    emails = [f"reader{n}@example.com" for n in range(len(requests))]
+    rounds = []
+    for _ in range(5):
+        started = time.perf_counter_ns()
+        for n in range(calls):
+            i = n % len(requests)
+            try:
+                await limiter.check(requests[i], "login", emails[i])
+            except HTTPException:
+                pass
+        rounds.append((time.perf_counter_ns() - started) / calls)
+    return statistics.median(rounds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+
+    hot = [_request("203.0.113.7")]
+    many = [_request(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}") for n in range(args.keys)]
+    sqlite_path = Path(tempfile.mkdtemp()) / "bench_rate_limit.db"
+
+    def stores():
+        yield "memory", lambda: MemoryBucketStore(args.shards, args.max_keys), args.calls
+        # Each SQLite check is a write transaction; fewer calls keep the run short.
+        yield "sqlite", lambda: SQLiteBucketStore(str(sqlite_path)), max(args.calls // 20, 1)
+
+    print(f"{'store':<9} {'scenario':<10} {'calls':>8} {'ns/check':>10}")
+    disabled = RateLimiter(MemoryBucketStore(), OPEN, OPEN, enabled=False)
+    print(f"{'disabled':<9} {'-':<10} {args.calls:>8} {asyncio.run(run(disabled, hot, args.calls)):>10.0f}")
+    for name, make_store, calls in stores():
+        for scenario, requests, limit in (
+            ("hot key", hot, OPEN),
+            ("many keys", many, OPEN),
+            ("throttled", hot, CLOSED),
+        ):
+            limiter = RateLimiter(make_store(), limit, limit)
+            ns = asyncio.run(run(limiter, requests, calls))
+            print(f"{name:<9} {scenario:<10} {calls:>8} {ns:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
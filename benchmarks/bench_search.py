@@ -0,0 +1,65 @@
+"""
+Latency of the indexed search filters on GET /books.
+
+    poetry run python -m benchmarks.bench_search --rows 1000000
+
+Each query runs through the API with count=exact, so the reported time
+includes the filtered COUNT(*) as well as the ranked page fetch.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import seed_books, timed, use_database
+
+QUERIES = [
+    {"q": "garden"},
+    {"q": "silent river"},
+    {"q": "gol"},
+    {"title": "winter glass"},
+    {"author": "murakami"},
+    {"author": "tolkien", "q": "storm"},
+    {"q": "nomatchanywhere"},
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="reuse/keep this SQLite file")
+    args = parser.parse_args()
+
+    db_path = Path(args.db or Path(tempfile.mkdtemp()) / "bench_search.db")
+    fresh = not db_path.exists()
+    use_database(db_path)
+
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from config.session import sync_engine
+
+    with TestClient(app_main.app) as client:
+        if fresh:
+            print(f"seeding {args.rows:,} books into {db_path} ...")
+            seed_books(sync_engine, args.rows)
+
+        print(f"{'query':<36} {'matches':>9} {'p50':>10} {'p95':>10}")
+        for params in QUERIES:
+            params = {**params, "per_page": args.per_page}
+            matches = client.get("/books", params=params).json()["total_books"]
+            stats = timed(
+                lambda: client.get("/books", params=params).raise_for_status(),
+                args.repeat,
+            )
+            label = " ".join(f"{k}={v}" for k, v in params.items() if k != "per_page")
+            print(
+                f"{label:<36} {matches:>9,} "
+                f"{stats['p50_ms']:>8.2f}ms {stats['p95_ms']:>8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
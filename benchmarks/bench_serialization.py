@@ -0,0 +1,102 @@
+"""
+Cost of rendering a GET /books page: FastAPI's generic path vs utils/book_json.py.
+
+    poetry run python -m benchmarks.bench_serialization --sizes 10,50,100
+
+generic: load Book ORM objects, then let FastAPI validate the page dict
+         against response_model and encode it with jsonable_encoder and
+         json.dumps (what the route did before).
+fast:    load plain BOOK_COLUMNS rows and render them with render_book_page.
+
+Each is measured twice per page size: serialization alone, and the query
+plus serialization. Both paths must produce the same JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+def _median_us(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,50,100")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_serialization.db")
+
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    import main as app_main
+    from config.session import sync_engine
+    from models import Book
+    from utils.book_json import BOOK_COLUMNS, render_book_page
+    from utils.pagination import NEXT, keyset_order
+
+    seed_books(sync_engine, 1000)
+    route = next(r for r in app_main.app.routes if getattr(r, "path", None) == "/books" and "GET" in r.methods)
+    page = {"next_page": "/books?page=2&per_page=10", "prev_page": None, "total_pages": 100, "total_books": 1000}
+    loop = asyncio.new_event_loop()
+
+    def generic(books) -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=route.response_field, response_content={"books": books, **page})
+        )
+        return JSONResponse(content).body
+
+    def fast(rows) -> bytes:
+        return render_book_page(rows=rows, **page)
+
+    print(f"{'per_page':>8} {'stage':<22} {'generic us':>11} {'fast us':>9} {'speedup':>8}")
+    with Session(sync_engine) as session:
+        for size in (int(s) for s in args.sizes.split(",")):
+            orm_query = select(Book).order_by(*keyset_order(NEXT)).limit(size)
+            row_query = select(*BOOK_COLUMNS).order_by(*keyset_order(NEXT)).limit(size)
+
+            def load_orm():
+                books = session.scalars(orm_query).all()
+                session.expunge_all()
+                return books
+
+            books, rows = load_orm(), session.execute(row_query).all()
+            assert json.loads(generic(books)) == json.loads(fast(rows))
+
+            stages = {
+                "serialize": (lambda: generic(books), lambda: fast(rows)),
+                "query + serialize": (
+                    lambda: generic(load_orm()),
+                    lambda: fast(session.execute(row_query).all()),
+                ),
+            }
+            for stage, (generic_fn, fast_fn) in stages.items():
+                # Alternate the two paths and keep the best round of each.
+                before = after = float("inf")
+                for _ in range(args.rounds):
+                    before = min(before, _median_us(generic_fn, args.repeat))
+                    after = min(after, _median_us(fast_fn, args.repeat))
+                print(f"{size:>8} {stage:<22} {before:>11.1f} {after:>9.1f} {before / after:>7.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Mixed read/write throughput on SQLite: tuned profile (config/sqlite.py) vs defaults.
+
+    poetry run python -m benchmarks.bench_sqlite_profile --readers 8 --writers 2
+
+Each profile runs in a fresh interpreter (the engines are built at import)
+against its own copy of the seeded database. Readers fetch a book by id and
+the next 20 ids after it; writers update one book's price per
+transaction, which also fires the search-index triggers.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.common import seed_books, use_database
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+
+def run_workload(db_path: Path, readers: int, writers: int, seconds: float) -> dict:
+    use_database(db_path)
+
+    from sqlalchemy import select, update
+
+    from config.session import sync_engine
+    from models import Book
+
+    with sync_engine.connect() as conn:
+        ids = list(conn.scalars(select(Book.id)))
+        journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    stop = time.perf_counter() + seconds
+    results = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+
+    def reader(seed: int) -> None:
+        rng = random.Random(seed)
+        latencies = []
+        with sync_engine.connect() as conn:
+            while time.perf_counter() < stop:
+                started = time.perf_counter()
+                try:
+                    book_id = rng.choice(ids)
+                    conn.execute(select(Book).where(Book.id == book_id)).one()
+                    conn.execute(
+                        select(Book.id, Book.title)
+                        .where(Book.id > book_id)
+                        .order_by(Book.id)
+                        .limit(20)
+                    ).all()
+                    conn.rollback()
+                except Exception:
+                    conn.rollback()
+                    with lock:
+                        results["errors"] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+        with lock:
+            results["read"].extend(latencies)
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        latencies = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                with sync_engine.begin() as conn:
+                    conn.execute(
+                        update(Book)
+                        .where(Book.id == rng.choice(ids))
+                        .values(price=rng.uniform(5, 100))
+                    )
+            except Exception:
+                with lock:
+                    results["errors"] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        with lock:
+            results["write"].extend(latencies)
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sync_engine.dispose()
+
+    return {
+        "journal_mode": journal,
+        "reads_per_s": len(results["read"]) / seconds,
+        "writes_per_s": len(results["write"]) / seconds,
+        "read_p95_ms": _percentile(results["read"], 0.95),
+        "write_p95_ms": _percentile(results["write"], 0.95),
+        "errors": results["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_workload(Path(args.child), args.readers, args.writers, args.seconds)
+        print(json.dumps(result))
+        return
+
+    workdir = Path(tempfile.mkdtemp())
+    seed_path = use_database(workdir / "seed.db")
+    # Seed with the stock settings so both profiles start from the same file.
+    os.environ["SQLITE_TUNED"] = "false"
+    import models  # noqa: F401  (registers the tables and DDL events)
+    from config.base import Base
+    from config.session import sync_engine
+
+    Base.metadata.create_all(sync_engine)
+    print(f"seeding {args.rows:,} books ...")
+    seed_books(sync_engine, args.rows)
+    sync_engine.dispose()
+
+    print(
+        f"{'profile':<9} {'journal':>8} {'reads/s':>9} {'writes/s':>9} "
+        f"{'read p95':>9} {'write p95':>10} {'errors':>7}"
+    )
+    for profile, tuned in (("default", "false"), ("tuned", "true")):
+        db_path = workdir / f"{profile}.db"
+        shutil.copy(seed_path, db_path)
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_sqlite_profile",
+                "--child", str(db_path),
+                "--readers", str(args.readers),
+                "--writers", str(args.writers),
+                "--seconds", str(args.seconds),
+            ],
+            env={**os.environ, "SQLITE_TUNED": tuned},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{profile:<9} {r['journal_mode']:>8} {r['reads_per_s']:>9.0f} "
+            f"{r['writes_per_s']:>9.0f} {r['read_p95_ms']:>8.1f}ms "
+            f"{r['write_p95_ms']:>8.1f}ms {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Cold-start cost of a worker: import time and time to first response.
+
+    poetry run python -m benchmarks.bench_startup --runs 5
+
+Every run starts a fresh interpreter against a database prepared once with
+`bootstrap.py --create-schema`. Two modes are compared:
+    lazy   the defaults: no schema creation or admin check at startup
+    eager  DB_CREATE_ALL=true and SEED_ADMIN_ON_STARTUP=true
+
+import          wall time of `import main`
+first response  from spawning uvicorn to the first 200 from GET /books
+first login     the first POST /auth/login after that; it pays for what
+                lazy mode defers (jose, passlib, the bcrypt worker)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import use_database
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = {
+    "lazy": {"DB_CREATE_ALL": "false", "SEED_ADMIN_ON_STARTUP": "false"},
+    "eager": {"DB_CREATE_ALL": "true", "SEED_ADMIN_ON_STARTUP": "true"},
+}
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(port: int, method: str, path: str, body: dict | None = None) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        headers = {"Content-Type": "application/json"} if body else {}
+        conn.request(method, path, json.dumps(body) if body else None, headers)
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def measure_server(env: dict) -> tuple[float, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT, env=env,
+    )
+    try:
+        while True:
+            try:
+                if _request(port, "GET", "/books?per_page=1&count=none") == 200:
+                    break
+            except OSError:
+                pass
+            if server.poll() is not None or time.perf_counter() - started > 60:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.005)
+        first_response = (time.perf_counter() - started) * 1000
+
+        login_started = time.perf_counter()
+        status = _request(
+            port, "POST", "/auth/login", {"email": "admin@gmail.com", "password": "admin123"}
+        )
+        if status != 200:
+            raise RuntimeError(f"login failed with {status}")
+        first_login = (time.perf_counter() - login_started) * 1000
+        return first_response, first_login
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    use_database(Path(tempfile.mkdtemp()) / "bench_startup.db")
+    subprocess.run(
+        [sys.executable, "bootstrap.py", "--create-schema"],
+        cwd=ROOT, env=os.environ.copy(), check=True, capture_output=True,
+    )
+
+    print(f"{'mode':<6} {'import ms':>10} {'first response ms':>18} {'first login ms':>15}")
+    for mode, overrides in MODES.items():
+        env = {**os.environ, **overrides}
+        imports, responses, logins = [], [], []
+        for _ in range(args.runs):
+            imports.append(measure_import(env))
+            first_response, first_login = measure_server(env)
+            responses.append(first_response)
+            logins.append(first_login)
+        print(
+            f"{mode:<6} {statistics.median(imports):>10.0f} "
+            f"{statistics.median(responses):>18.0f} {statistics.median(logins):>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Shared helpers for the scripts in benchmarks/. Run them from the project root
+as modules, e.g. `poetry run python -m benchmarks.bench_pagination`.
+
+Benchmarks run against a throwaway SQLite file so they never touch the
+database configured in .env. Call `use_database` before importing anything
+from the application, because config.session builds its engines at import.
+"""
+
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+
+def use_database(path: str | Path) -> Path:
+    path = Path(path).resolve()
+    os.environ["SYNC_DATABASE_URL"] = f"sqlite+pysqlite:///{path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    # The app validates these at import; benchmarks never send mail.
+    os.environ.setdefault("MAIL_FROM", "bench@example.com")
+    # A fresh database needs the tables and the admin used to log in.
+    os.environ.setdefault("DB_CREATE_ALL", "true")
+    os.environ.setdefault("SEED_ADMIN_ON_STARTUP", "true")
+    # Every benchmark client is 127.0.0.1; the auth rate limiter would throttle it.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("IMAGEKIT_URL_ENDPOINT", "https://ik.imagekit.io/bench")
+    # Keep image uploads offline, next to the database file.
+    os.environ.setdefault("STORAGE_BACKEND", "local")
+    os.environ.setdefault("LOCAL_STORAGE_ROOT", str(path.parent / "media"))
+    return path
+
+
+def seed_books(engine, rows: int, batch_size: int = 10_000, seed: int = 42) -> None:
+    from config.base import Base
+    from utils.data_generator import GeneratorConfig, write_db
+
+    # Benchmarks often seed before the app's lifespan has created the tables.
+    Base.metadata.create_all(engine)
+    write_db(engine, GeneratorConfig(seed=seed), books=rows, batch_size=batch_size)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> dict[str, float]:
+    fn()  # warm up caches and the connection pool
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
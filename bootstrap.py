@@ -0,0 +1,40 @@
+"""
+Run once per deployment, after `alembic upgrade head`:
+
+    python bootstrap.py                  create the admin user if missing
+    python bootstrap.py --create-schema  also create missing tables (no Alembic)
+"""
+
+import argparse
+import asyncio
+
+from config.session import AsyncSessionLocal, async_engine
+from config.startup import ADMIN_EMAIL, create_schema, seed_admin
+from utils.hashing import hashing_pool
+
+
+async def bootstrap(create_tables: bool) -> None:
+    try:
+        if create_tables:
+            await create_schema(async_engine)
+            print("Schema created")
+        if await seed_admin(AsyncSessionLocal):
+            print(f"Created admin user {ADMIN_EMAIL}")
+        else:
+            print(f"Admin user {ADMIN_EMAIL} already exists")
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--create-schema", action="store_true")
+    args = parser.parse_args()
+    try:
+        asyncio.run(bootstrap(args.create_schema))
+    finally:
+        hashing_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Connection pool settings and instrumentation for config/session.py.
+
+Both engines get their pool parameters from the environment. Their pools
+are QueuePool subclasses that time how long a checkout waits for a free
+connection (`_do_get`, which also covers opening a new one) and the whole
+checkout including pre-ping; pool events count connects, checkouts,
+checkins and invalidations. Checkouts slower than DB_POOL_SLOW_CHECKOUT_MS
+are logged as warnings. GET /internal/db-pool reports the numbers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_SLOW_CHECKOUT_MS = float(os.getenv("DB_POOL_SLOW_CHECKOUT_MS", 100))
+
+# Latency samples kept per pool for the percentiles.
+SAMPLE_SIZE = 1024
+
+
+class _Timings:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": self.max * 1000,
+        }
+
+
+class PoolMetrics:
+    """Counters and checkout timings for one engine's pool."""
+
+    def __init__(self, name: str, slow_checkout_ms: float = DB_POOL_SLOW_CHECKOUT_MS):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.slow_checkouts = 0
+            self.wait = _Timings()
+            self.checkout = _Timings()
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait.add(seconds)
+
+    def record_checkout(self, pool, seconds: float) -> None:
+        with self._lock:
+            self.checkout.add(seconds)
+            slow = seconds * 1000 > self.slow_checkout_ms
+            if slow:
+                self.slow_checkouts += 1
+        if slow:
+            logger.warning(
+                "Slow %s pool checkout: %.1f ms (%s)",
+                self.name,
+                seconds * 1000,
+                pool.status(),
+            )
+
+    def _count(self, counter: str):
+        def listener(*args):
+            with self._lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+        return listener
+
+    def listen(self, pool) -> None:
+        event.listen(pool, "connect", self._count("connects"))
+        event.listen(pool, "checkout", self._count("checkouts"))
+        event.listen(pool, "checkin", self._count("checkins"))
+        event.listen(pool, "invalidate", self._count("invalidations"))
+
+    def snapshot(self, pool) -> dict:
+        data = {"pool": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout_s=pool.timeout(),
+            )
+        with self._lock:
+            data.update(
+                connects=self.connects,
+                checkouts=self.checkouts,
+                checkins=self.checkins,
+                invalidations=self.invalidations,
+                slow_checkouts=self.slow_checkouts,
+                slow_checkout_threshold_ms=self.slow_checkout_ms,
+                wait=self.wait.summary(),
+                checkout_latency=self.checkout.summary(),
+            )
+        return data
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started)
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        self.metrics.record_checkout(self, time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine kwargs for `url`; non-queue pools (in-memory SQLite) are left alone."""
+    parsed = make_url(url)
+    default_pool = parsed.get_dialect().get_pool_class(parsed)
+    if not issubclass(default_pool, QueuePool):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def instrument(engine, name: str) -> PoolMetrics | None:
+    pool = engine.pool
+    if not isinstance(pool, _InstrumentedPoolMixin):
+        return None
+    pool.metrics = PoolMetrics(name)
+    pool.metrics.listen(pool)
+    return pool.metrics
+
+
+def pool_report(engine) -> dict:
+    pool = engine.pool
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return {"pool": type(pool).__name__, "instrumented": False}
+    return metrics.snapshot(pool)
@@ -4,28 +4,46 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
+from config.pool import engine_options, instrument
+from config.sqlite import apply_sqlite_profile
+
 
 load_dotenv()
 
 SYNC_DATABASE_URL = os.getenv("SYNC_DATABASE_URL")
 ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 
+# Pool size, overflow, timeout, recycle and pre-ping come from DB_POOL_*
+# settings; see config/pool.py.
 if SYNC_DATABASE_URL is None:
     SYNC_DATABASE_URL = "sqlite+pysqlite:///./blog_platform_api.db"
     sync_engine = create_engine(
-        SYNC_DATABASE_URL, connect_args={"check_same_thread": False}
+        SYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **engine_options(SYNC_DATABASE_URL),
     )
 else:
-    sync_engine = create_engine(SYNC_DATABASE_URL, pool_size=5)
+    sync_engine = create_engine(SYNC_DATABASE_URL, **engine_options(SYNC_DATABASE_URL))
 
 SessionLocal = sessionmaker(bind=sync_engine, autoflush=False, expire_on_commit=False)
 if ASYNC_DATABASE_URL is None:
     ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./blog_platform_api.db"
     async_engine = create_async_engine(
-        ASYNC_DATABASE_URL, connect_args={"check_same_thread": False}
+        ASYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **engine_options(ASYNC_DATABASE_URL, is_async=True),
     )
 else:
-    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True)
+    )
+
+# WAL and related PRAGMAs for file-backed SQLite; see config/sqlite.py.
+sqlite_tuned = apply_sqlite_profile(sync_engine)
+apply_sqlite_profile(async_engine)
+
+sync_pool_metrics = instrument(sync_engine, "sync")
+async_pool_metrics = instrument(async_engine, "async")
 
 AsyncSessionLocal = async_sessionmaker(
     bind=async_engine, autoflush=False, expire_on_commit=False
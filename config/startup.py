@@ -0,0 +1,60 @@
+"""
+One-off startup work, kept out of the import path of every worker.
+
+DB_CREATE_ALL           create missing tables when the app starts
+                        (Base.metadata.create_all). Off by default: deployed
+                        schemas come from `alembic upgrade head`.
+SEED_ADMIN_ON_STARTUP   make sure the default admin exists when the app
+                        starts. Off by default: deployments run
+                        `python bootstrap.py` once instead of every worker
+                        querying for the admin on every start.
+
+.env.example turns both on for local development.
+"""
+
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+import models
+from config.base import Base
+
+load_dotenv()
+
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() in ("1", "true", "yes")
+SEED_ADMIN_ON_STARTUP = os.getenv("SEED_ADMIN_ON_STARTUP", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+ADMIN_EMAIL = "admin@gmail.com"
+ADMIN_PASSWORD = "admin123"
+
+
+async def create_schema(async_engine) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_admin(session_factory) -> bool:
+    """Create the default admin if it does not exist; True if it was created."""
+    from utils.hashing import hash_async
+
+    async with session_factory() as session:
+        async with session.begin():
+            user = await session.scalar(
+                select(models.User).where(models.User.email == ADMIN_EMAIL)
+            )
+            if user:
+                return False
+            session.add(
+                models.User(
+                    email=ADMIN_EMAIL,
+                    password=await hash_async(ADMIN_PASSWORD),
+                    role="admin",
+                    is_verified=True,
+                )
+            )
+    return True
@@ -1,40 +1,66 @@
-import csv
-
-valid_books = [
-    ["Deep Work","Cal Newport",25.50,"https://example.com/images/deep_work.jpg","2016-01-05"],
-    ["Atomic Habits","James Clear",20.99,"https://example.com/images/atomic_habits.jpg","2018-10-16"],
-    ["The Lean Startup","Eric Ries",22.00,"https://example.com/images/lean_startup.jpg","2011-09-13"],
-    ["Thinking, Fast and Slow","Daniel Kahneman",18.50,"https://example.com/images/thinking_fast_slow.jpg","2011-10-25"],
-    ["The 7 Habits of Highly Effective People","Stephen R. Covey",19.99,"https://example.com/images/7_habits.jpg","1989-08-15"],
-    ["Start With Why","Simon Sinek",21.50,"https://example.com/images/start_with_why.jpg","2009-09-01"],
-    ["Grit","Angela Duckworth",17.75,"https://example.com/images/grit.jpg","2016-05-03"],
-    ["The Power of Habit","Charles Duhigg",16.99,"https://example.com/images/power_of_habit.jpg","2012-02-28"],
-    ["Hooked","Nir Eyal",23.00,"https://example.com/images/hooked.jpg","2014-11-24"],
-    ["Drive","Daniel H. Pink",18.25,"https://example.com/images/drive.jpg","2009-04-21"],
-]
-
-faulty_books = [
-    ["Deep Work","Cal Newport",25.50,"https://example.com/images/deep_work.jpg","2016-01-05"],
-    ["Atomic Habits","James Clear","abc","https://example.com/images/atomic_habits.jpg","2018-10-16"],  # price invalid
-    ["","Eric Ries",22.00,"https://example.com/images/lean_startup.jpg","2011-09-13"],  # missing title
-    ["Thinking, Fast and Slow","Daniel Kahneman",18.50,"https://example.com/images/thinking_fast_slow.jpg","2011-10-25"],
-    ["The 7 Habits of Highly Effective People","Stephen R. Covey",19.99,"","1989-08-15"],  # missing cover image
-    ["Start With Why","Simon Sinek",21.50,"https://example.com/images/start_with_why.jpg","2009-09-01"],
-    ["Grit","Angela Duckworth",17.75,"https://example.com/images/grit.jpg","not_a_date"],  # invalid date
-    ["The Power of Habit","Charles Duhigg",16.99,"https://example.com/images/power_of_habit.jpg","2012-02-28"],
-    ["Hooked","Nir Eyal",23.00,"https://example.com/images/hooked.jpg","2014-11-24"],
-    ["Drive","Daniel H. Pink",18.25,"https://example.com/images/drive.jpg","2009-04-21"],
-]
-
-header = ["title","author","price","book_cover_image","published_date"]
-
-def write_csv(filename, data):
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(header)
-        writer.writerows(data)
-    print(f"{filename} created with {len(data)} rows.")
+"""
+Generate test data with utils/data_generator.py.
+
+    python generate_dummy_data.py
+        books_valid.csv and books_faulty.csv, 10 rows each (for /books/upload)
+    python generate_dummy_data.py --rows 5000000 --format ndjson --out books.ndjson
+    python generate_dummy_data.py --rows 1000000 --users 10000 --format db
+        bulk insert into the database configured in .env
+
+Output is deterministic for a given --seed and runs in constant memory.
+"""
+
+import argparse
+import time
+
+from utils.data_generator import (
+    FaultRates,
+    GeneratorConfig,
+    generate_books,
+    write_csv,
+    write_ndjson,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--users", type=int, default=0, help="only with --format db")
+    parser.add_argument("--format", choices=["csv", "ndjson", "db"], default="csv")
+    parser.add_argument("--out", help="output file (csv default: books_valid.csv and books_faulty.csv)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--authors", type=int, default=5000)
+    parser.add_argument("--author-skew", type=float, default=1.0, help="Zipf exponent")
+    parser.add_argument("--fault-rate", type=float, default=0.0, help="per-column share of invalid values")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    def config(fault_rate: float) -> GeneratorConfig:
+        return GeneratorConfig(
+            seed=args.seed,
+            authors=args.authors,
+            author_skew=args.author_skew,
+            faults=FaultRates.uniform(fault_rate),
+        )
+
+    started = time.perf_counter()
+    if args.format == "db":
+        from config.session import sync_engine
+        from utils.data_generator import write_db
+
+        write_db(sync_engine, config(args.fault_rate), args.rows, args.users, args.batch_size)
+        print(f"Inserted {args.users} users and {args.rows} books", end="")
+    elif args.out or args.format == "ndjson":
+        out = args.out or "books.ndjson"
+        writer = write_csv if args.format == "csv" else write_ndjson
+        writer(generate_books(config(args.fault_rate), args.rows), out)
+        print(f"Wrote {args.rows} books to {out}", end="")
+    else:
+        write_csv(generate_books(config(0.0), args.rows), "books_valid.csv")
+        write_csv(generate_books(config(args.fault_rate or 0.1), args.rows), "books_faulty.csv")
+        print(f"Wrote {args.rows} books to books_valid.csv and books_faulty.csv", end="")
+    print(f" in {time.perf_counter() - started:.1f} s")
+
 
 if __name__ == "__main__":
-    write_csv("books_valid.csv", valid_books)
-    write_csv("books_faulty.csv", faulty_books)
+    main()
@@ -1,43 +1,84 @@
+import os
 from fastapi import FastAPI
-import models
-from config.base import Base
 from routes.auth import router as auth_router
 from routes.book import router as book_router
 from routes.user import router as user_router
+from routes.internal import router as internal_router
+from routes.metrics import router as metrics_router
+from utils.metrics import MetricsMiddleware, instrument_engine
 from contextlib import asynccontextmanager
 from config.session import AsyncSessionLocal
-from sqlalchemy import select
-from utils.hashing import hash
-from config.session import async_engine, sync_engine
+from config.startup import (
+    DB_CREATE_ALL,
+    SEED_ADMIN_ON_STARTUP,
+    create_schema,
+    seed_admin,
+)
+from utils.hashing import hashing_pool
+from utils.mail_outbox import MAIL_OUTBOX_WORKER_ENABLED, outbox_worker
+from utils.token_sweeper import TOKEN_SWEEP_ENABLED, token_sweeper
+from config.session import async_engine, sync_engine, sqlite_tuned
+from config.sqlite import sqlite_maintenance
+import asyncio
+from fastapi.staticfiles import StaticFiles
+from utils.storage import (
+    LOCAL_STORAGE_BASE_URL,
+    LOCAL_STORAGE_ROOT,
+    STORAGE_BACKEND,
+    image_uploads,
+)
+from utils.image_variants import variant_pool
 
-Base.metadata.create_all(bind=sync_engine)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with AsyncSessionLocal() as session:
-        async with session.begin():
-            result = await session.execute(
-                select(models.User).filter(models.User.email == "admin@gmail.com")
-            )
-            user = result.scalar_one_or_none()
-            if not user:
-                hashed_password = hash("admin123")
-                user = models.User(
-                    email="admin@gmail.com",
-                    password=hashed_password,
-                    role="admin",
-                    is_verified=True,
-                )
-                session.add(user)
-                await session.commit()
+    # Both are opt-in (config/startup.py); deployments use Alembic and
+    # bootstrap.py so workers start without touching the database.
+    if DB_CREATE_ALL:
+        await create_schema(async_engine)
+    if SEED_ADMIN_ON_STARTUP:
+        await seed_admin(AsyncSessionLocal)
+
+    maintenance = None
+    if sqlite_tuned:
+        maintenance = asyncio.create_task(sqlite_maintenance(async_engine))
+    sweeper = None
+    if TOKEN_SWEEP_ENABLED:
+        sweeper = asyncio.create_task(token_sweeper.run())
+    if MAIL_OUTBOX_WORKER_ENABLED:
+        outbox_worker.start()
     yield
 
+    if maintenance is not None:
+        maintenance.cancel()
+    if sweeper is not None:
+        sweeper.cancel()
+    if MAIL_OUTBOX_WORKER_ENABLED:
+        await outbox_worker.stop()
+
     await async_engine.dispose()
     sync_engine.dispose()
+    hashing_pool.shutdown()
+    image_uploads.shutdown()
+    variant_pool.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
 
+instrument_engine(sync_engine)
+instrument_engine(async_engine)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(book_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+
+if STORAGE_BACKEND == "local":
+    os.makedirs(LOCAL_STORAGE_ROOT, exist_ok=True)
+    app.mount(
+        LOCAL_STORAGE_BASE_URL,
+        StaticFiles(directory=LOCAL_STORAGE_ROOT),
+        name="media",
+    )
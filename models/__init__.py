@@ -1,5 +1,7 @@
 from .user import User
 from .book import Book
 from .verification_tokens import VerificationToken
+from .row_count import RowCount
+from .mail_outbox import OutboxMessage
 
-__all__ = ["User", "Book", "VerificationToken"]
+__all__ = ["User", "Book", "VerificationToken", "RowCount", "OutboxMessage"]
@@ -1,8 +1,7 @@
 from config import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, Date, Float, func, ForeignKey
+from sqlalchemy import String, DateTime, Date, Float, Integer, Uuid, func, ForeignKey, Index, JSON, event
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime, date
 from typing import TYPE_CHECKING
 
@@ -12,9 +11,13 @@ if TYPE_CHECKING:
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # Sort key for keyset pagination; see utils/pagination.py
+        Index("ix_books_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid(as_uuid=True),
         primary_key=True,
         unique=True,
         nullable=False,
@@ -24,6 +27,9 @@ class Book(Base):
     author: Mapped[str] = mapped_column(String(80), nullable=False)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     book_cover_image: Mapped[str] = mapped_column(String, nullable=True)
+    # {"thumb": {"webp": url, "jpeg": url}, "medium": ..., "full": ...};
+    # see utils/image_variants.py. NULL for covers uploaded without variants.
+    book_cover_variants: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     published_date: Mapped[date] = mapped_column(Date, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -39,3 +45,112 @@ class Book(Base):
         ForeignKey("users.id", ondelete="SET NULL"), nullable=True
     )
     owner: Mapped["User"] = relationship("User", back_populates="books")
+
+    # Key of the book's books_fts row on SQLite, set by the books_fts_insert
+    # trigger. Unlike the implicit rowid it survives VACUUM and table
+    # rebuilds. Unused on PostgreSQL.
+    search_rowid: Mapped[int | None] = mapped_column(
+        Integer, nullable=True, unique=True, index=True
+    )
+
+
+SEARCH_KEY = "search_rowid"
+
+
+def _sqlite_search_triggers(key: str) -> list[str]:
+    if key == "rowid":
+        insert = """
+        INSERT INTO books_fts (rowid, title, author)
+        VALUES (new.rowid, new.title, new.author);
+        """
+    else:
+        # max() is served by the unique index on the key column.
+        insert = f"""
+        UPDATE books SET {key} = (SELECT coalesce(max({key}), 0) + 1 FROM books)
+        WHERE rowid = new.rowid AND {key} IS NULL;
+        INSERT INTO books_fts (rowid, title, author)
+        SELECT {key}, title, author FROM books WHERE rowid = new.rowid;
+        """
+    return [
+        f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books
+    BEGIN
+        {insert.strip()}
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books
+    BEGIN
+        INSERT INTO books_fts (books_fts, rowid, title, author)
+        VALUES ('delete', old.{key}, old.title, old.author);
+    END
+    """,
+        f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author ON books
+    BEGIN
+        INSERT INTO books_fts (books_fts, rowid, title, author)
+        VALUES ('delete', old.{key}, old.title, old.author);
+        INSERT INTO books_fts (rowid, title, author)
+        VALUES (new.{key}, new.title, new.author);
+    END
+    """,
+    ]
+
+
+POSTGRES_SEARCH_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS ix_books_search ON books USING GIN
+    (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '')))
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_books_title_trgm ON books USING GIN (title gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_books_author_trgm ON books USING GIN (author gin_trgm_ops)",
+]
+
+
+def search_index_ddl(dialect_name: str, key: str = SEARCH_KEY, backfill: bool = True) -> list[str]:
+    """
+    Statements creating the search indexes used by utils/book_search.py;
+    create_all and the Alembic migrations both run these. On SQLite, `key`
+    is the books column books_fts is keyed on ("rowid" only for migrations
+    older than search_rowid) and `backfill` indexes the existing rows.
+    """
+    if dialect_name == "sqlite":
+        statements = [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5"
+            f"(title, author, content='books', content_rowid='{key}')"
+        ]
+        if backfill:
+            statements.append("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        return statements + _sqlite_search_triggers(key)
+    if dialect_name == "postgresql":
+        # Index builds read the whole table, so they always backfill.
+        return POSTGRES_SEARCH_INDEXES
+    return []
+
+
+def drop_search_index_ddl(dialect_name: str) -> list[str]:
+    if dialect_name == "sqlite":
+        return [
+            "DROP TRIGGER IF EXISTS books_fts_update",
+            "DROP TRIGGER IF EXISTS books_fts_delete",
+            "DROP TRIGGER IF EXISTS books_fts_insert",
+            "DROP TABLE IF EXISTS books_fts",
+        ]
+    if dialect_name == "postgresql":
+        return [
+            "DROP INDEX IF EXISTS ix_books_author_trgm",
+            "DROP INDEX IF EXISTS ix_books_title_trgm",
+            "DROP INDEX IF EXISTS ix_books_search",
+        ]
+    return []
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_indexes(target, connection, **kw):
+    # Fires on every create_all; only a new books_fts needs filling.
+    exists = connection.dialect.name == "sqlite" and connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+    ).first()
+    for statement in search_index_ddl(connection.dialect.name, backfill=not exists):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,42 @@
+from config.base import Base
+from sqlalchemy import DateTime, Index, Integer, String, Text, Uuid, func
+from sqlalchemy.orm import Mapped, mapped_column
+import uuid
+from datetime import datetime, timezone
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OutboxMessage(Base):
+    """Outgoing mail waiting to be sent by utils/mail_outbox.OutboxWorker."""
+
+    __tablename__ = "mail_outbox"
+    __table_args__ = (
+        # The worker's "due messages" scan.
+        Index("ix_mail_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    recipient: Mapped[str] = mapped_column(String, nullable=False)
+    subject: Mapped[str] = mapped_column(String, nullable=False)
+    # Cleared once the message is sent or has failed.
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    subtype: Mapped[str] = mapped_column(String(16), nullable=False, default="html")
+    # pending -> sent | failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Set from Python, never server_default: it is compared with Python
+    # datetimes, and SQLite stores CURRENT_TIMESTAMP in another text format.
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=_utcnow
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Python default for the same reason; the purge compares it.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=_utcnow, server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,41 @@
+from config.base import Base
+from sqlalchemy import DDL, BigInteger, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class RowCount(Base):
+    """Trigger-maintained row counters, used where the database has no cheap
+    planner estimate for COUNT(*) (SQLite). The table exists on every
+    dialect, but only SQLite gets the triggers that fill it."""
+
+    __tablename__ = "row_counts"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+SQLITE_BOOK_COUNT_DDL = [
+    """
+    INSERT OR IGNORE INTO row_counts (table_name, row_count)
+    SELECT 'books', COUNT(*) FROM books
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_row_count_insert AFTER INSERT ON books
+    BEGIN
+        UPDATE row_counts SET row_count = row_count + 1 WHERE table_name = 'books';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_row_count_delete AFTER DELETE ON books
+    BEGIN
+        UPDATE row_counts SET row_count = row_count - 1 WHERE table_name = 'books';
+    END
+    """,
+]
+
+# Metadata-level so it runs once both tables exist; every statement is
+# idempotent because create_all fires this on every start.
+for statement in SQLITE_BOOK_COUNT_DDL:
+    event.listen(
+        Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
@@ -1,8 +1,7 @@
 from config import Base
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, DateTime, text, func, Boolean
+from sqlalchemy import String, DateTime, Uuid, text, func, Boolean, false
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
@@ -15,7 +14,7 @@ class User(Base):
     __tablename__ = "users"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid(as_uuid=True),
         primary_key=True,
         unique=True,
         nullable=False,
@@ -30,7 +29,7 @@ class User(Base):
     password: Mapped[str] = mapped_column(String, nullable=False)
     profile_img_url: Mapped[str] = mapped_column(String, nullable=True)
     is_verified: Mapped[bool] = mapped_column(
-        Boolean, server_default=text("'false'"), nullable=False
+        Boolean, server_default=false(), nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
@@ -46,5 +45,5 @@ class User(Base):
         "Book", back_populates="owner", passive_deletes=True
     )
     verification_token: Mapped["VerificationToken"] = relationship(
-        "VerificationToken", back_populates="user"
+        "VerificationToken", back_populates="user", passive_deletes=True
     )
@@ -1,6 +1,5 @@
 from config.base import Base
-from sqlalchemy import ForeignKey, String, Boolean, DateTime, text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import ForeignKey, String, Boolean, DateTime, Uuid, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import uuid
 from datetime import datetime
@@ -14,21 +13,25 @@ class VerificationToken(Base):
     __tablename__ = "verification_tokens"
 
     token_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
+        Uuid(as_uuid=True),
         primary_key=True,
         nullable=False,
         unique=True,
         default=uuid.uuid4,
     )
-    token: Mapped[str] = mapped_column(String, nullable=False)
-    user_id: Mapped[UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    # SHA-256 hex of the token that was mailed (utils.token.hash_verification_token);
+    # the token itself is never stored.
+    token_digest: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True, index=True
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), nullable=False, index=True
     )  # expire at now() + 15 minutes
     is_used: Mapped[bool] = mapped_column(
-        Boolean, server_default=text("'false'"), nullable=False
+        Boolean, server_default=false(), nullable=False
     )
 
     user: Mapped["User"] = relationship("User", back_populates="verification_token")
@@ -1,92 +1,108 @@
-from utils.smtp_config import mail_config
 from fastapi import (
     APIRouter,
     HTTPException,
     Depends,
+    Request,
     Response,
     status,
     UploadFile,
     File,
     Form,
-    BackgroundTasks,
 )
-from fastapi_mail import FastMail, MessageSchema, MessageType
-from database import get_db
+from database import get_async_db
 from models import User, VerificationToken
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
-from utils.hashing import hash, authenticate_user
-from utils.token import create_access_token, generate_secret_token
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.hashing import hash_async, authenticate_user_async
+from utils.token import (
+    create_access_token,
+    generate_secret_token,
+    hash_verification_token,
+)
 from datetime import datetime, timezone, timedelta
 from schemas.user import UserRead, UserLogin, UserLoginSuccess
-from utils.imagekit import upload_profile_img
+from utils.storage import upload_profile_img
+from utils.principal_cache import principal_cache
+from utils.mail_outbox import enqueue_mail, outbox_worker
+from utils.rate_limit import rate_limiter
 from sqlalchemy.exc import IntegrityError
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+def queue_verification_mail(db: AsyncSession, email: str, token: str) -> None:
+    enqueue_mail(
+        db,
+        recipient=email,
+        subject="Prime Bookstore Verification",
+        body=f"Follow the following link for verification:\n"
+        + f"http://localhost:8000/auth/verify?token={token}",
+    )
+
+
 @router.post("/register", response_model=UserRead)
 async def register_user(
-    background_tasks: BackgroundTasks,
+    request: Request,
     email: str = Form(...),
     password: str = Form(...),
     profile_img: UploadFile = File(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    existing_user = db.query(User).filter(User.email == email).first()
+    await rate_limiter.check(request, "register", email)
+    existing_user = await db.scalar(select(User).where(User.email == email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use."
         )
-    hashed_password = hash(password)
+    hashed_password = await hash_async(password)
+    img_url = None
     if profile_img is not None:
         img_url = await upload_profile_img(profile_img)
     new_user = User(email=email, password=hashed_password, profile_img_url=img_url)
     db.add(new_user)
-    db.flush()
+    await db.flush()
     verification_token = generate_secret_token()
     new_token = VerificationToken(
-        token=verification_token,
+        token_digest=hash_verification_token(verification_token),
         user_id=new_user.id,
         expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
     )
     db.add(new_token)
 
-    message = MessageSchema(
-        subject="Prime Bookstore Verification",
-        recipients=[new_user.email],
-        body=f"Follow the following link for verification:\n"
-        + f"http://localhost:8000/auth/verify?token={verification_token}",
-        subtype=MessageType.html,
-    )
-
-    fm = FastMail(mail_config)
+    queue_verification_mail(db, new_user.email, verification_token)
 
     try:
-        db.commit()
-        db.refresh(new_user)
-        db.refresh(new_token)
+        await db.commit()
+        await db.refresh(new_user)
+        await db.refresh(new_token)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Intgerity error occured."
         )
 
-    background_tasks.add_task(fm.send_message, message)
+    outbox_worker.wake()
     return new_user
 
 
 @router.post("/login", response_model=UserLoginSuccess)
-def login_user(
-    user_login: UserLogin, response: Response, db: Session = Depends(get_db)
+async def login_user(
+    user_login: UserLogin,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.email == user_login.email).first()
+    await rate_limiter.check(request, "login", user_login.email)
+    user = await db.scalar(select(User).where(User.email == user_login.email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Wrong credentials"
         )
 
-    authenticated, new_hash = authenticate_user(user_login.password, user.password)
+    authenticated, new_hash = await authenticate_user_async(
+        user_login.password, user.password
+    )
     if not authenticated:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Wrong credentials."
@@ -95,8 +111,8 @@ def login_user(
     if new_hash:
         user.password = new_hash
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
     access_token, max_age = create_access_token(user.email, user.role)
     response.set_cookie(
         key="access_token",
@@ -116,20 +132,20 @@ def login_user(
 
 
 @router.get("/verify", response_model=dict[str, str])
-def verify_user_by_token(token: str, db: Session = Depends(get_db)):
+async def verify_user_by_token(
+    token: str, db: AsyncSession = Depends(get_async_db)
+):
     if not token:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Token not found."
         )
 
-    existing_token = (
-        db.query(VerificationToken)
-        .filter(
-            VerificationToken.token == token,
+    existing_token = await db.scalar(
+        select(VerificationToken).where(
+            VerificationToken.token_digest == hash_verification_token(token),
             VerificationToken.expires_at > datetime.now(timezone.utc),
             VerificationToken.is_used == False,
         )
-        .first()
     )
 
     if not existing_token:
@@ -137,7 +153,9 @@ def verify_user_by_token(token: str, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail="Token not found."
         )
 
-    existing_user = db.query(User).filter(User.id == existing_token.user_id).first()
+    existing_user = await db.scalar(
+        select(User).where(User.id == existing_token.user_id)
+    )
 
     if not existing_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found!")
@@ -148,21 +166,24 @@ def verify_user_by_token(token: str, db: Session = Depends(get_db)):
     db.add(existing_user)
     db.add(existing_token)
     try:
-        db.commit()
-        db.refresh(existing_user)
-        db.refresh(existing_token)
+        await db.commit()
+        await db.refresh(existing_user)
+        await db.refresh(existing_token)
     except IntegrityError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bad request, integrity error.",
         )
+    principal_cache.invalidate(existing_user.email)
 
     return {"message": "You are successfully verified."}
 
 @router.post("/resend-verification-token", response_model=dict[str, str])
-def resend_verification(email: EmailStr, background_tasks: BackgroundTasks, db:Session = Depends(get_db)):
+async def resend_verification(request: Request, email: EmailStr, db: AsyncSession = Depends(get_async_db)):
 
-    user = db.query(User).filter(User.email == email).first()
+    await rate_limiter.check(request, "resend", email)
+    user = await db.scalar(select(User).where(User.email == email))
 
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found!")
@@ -170,35 +191,27 @@ def resend_verification(email: EmailStr, background_tasks: BackgroundTasks, db:S
     if user.is_verified:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bad request, already verified.")
     
-    existing_token = db.query(VerificationToken).filter(VerificationToken.user_id == user.id).first()
-    if existing_token:
-        db.delete(existing_token)
-        db.flush()
+    await db.execute(
+        delete(VerificationToken).where(VerificationToken.user_id == user.id)
+    )
 
     verification_token = generate_secret_token()
     new_token = VerificationToken(
-        token = verification_token,
+        token_digest = hash_verification_token(verification_token),
         user_id= user.id,
         expires_at = datetime.now(timezone.utc) + timedelta(minutes=15),
     )
-    message = MessageSchema(
-        subject="Prime Bookstore Verification",
-        recipients=[email],
-        body=f"Follow the following link for verification:\n"
-        + f"http://localhost:8000/auth/verify?token={verification_token}",
-        subtype=MessageType.html,
-    )
-    fm=FastMail(mail_config)
+    queue_verification_mail(db, email, verification_token)
     db.add(new_token)
     try:
-        db.commit()
-        db.refresh(new_token)
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(new_token)
+        await db.refresh(user)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Intgerity error occured."
         )
 
-    background_tasks.add_task(fm.send_message, message)
+    outbox_worker.wake()
     return {"message": "New token issued."}
@@ -1,17 +1,60 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Form, UploadFile, File
-from database import get_db
-from datetime import datetime, date
-from schemas.book import BookRead, BookCreate, BookDelete, PaginatedBookList, BookBulkUploadResponse
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    status,
+    Form,
+    UploadFile,
+    File,
+    Header,
+    Response,
+)
+from database import get_async_db
+from datetime import date
+from schemas.book import (
+    BookRead,
+    BookDelete,
+    PaginatedBookList,
+    BookBulkUploadResponse,
+    BookBatchGet,
+    BookBatchGetResponse,
+    BookBulkUpdate,
+    BookBulkDelete,
+    BookBulkResult,
+)
 import uuid
-from models import Book, User
-from sqlalchemy.orm import Session
+from models import Book
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from utils.imagekit import upload_profile_img
+from utils.storage import upload_book_cover
 from utils.user import allowed_role
-from typing import List, Dict, Any
-import io
-import csv
+from utils.principal_cache import Principal
+from utils.book_count import book_counter
+from utils.book_cache import book_cache, etag_matches, make_cached_book
+from utils.book_json import BOOK_COLUMNS, render_book_page
+from utils.book_batch import BATCH_GET_MAX_IDS, get_books_by_ids, render_batch
+from utils.book_bulk import (
+    BULK_MAX_IDS,
+    bulk_delete_books,
+    bulk_update_books,
+    count_matching,
+)
+from utils.book_export import MEDIA_TYPES, ExportFormat, stream_books
+from fastapi.responses import StreamingResponse
+from utils.book_search import apply_search, has_search
+from utils.pagination import (
+    NEXT,
+    PREV,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order,
+)
+from utils.csv_ingest import CSV_CHUNK_SIZE, CommitPolicy, ingest_books_csv
+from typing import Any, Literal
 import math
+from urllib.parse import urlencode
 router = APIRouter(prefix="/books", tags=["books"])
 """
 CRUD Endpoints:
@@ -20,6 +63,10 @@ CRUD Endpoints:
 ○ PUT /books/{id} → Update a book
 ○ DELETE /books/{id} → Delete a book
 ○ GET /books → List books with pagination and filtering by author/title
+○ GET /books/export → Stream the whole catalog as CSV or NDJSON
+○ POST /books/batch-get → Get many books by id in one request
+○ PATCH /books/bulk → Update every book matching an id list or filter
+○ POST /books/bulk-delete → Delete every book matching an id list or filter
 """
 
 
@@ -30,12 +77,12 @@ async def create_book(
     price: float = Form(...),
     published_date: date = Form(...),
     book_cover_image: UploadFile = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
 ):
-    cover_image_url = ""
+    cover_image_url, cover_variants = "", None
     if book_cover_image:
-        cover_image_url = await upload_profile_img(book_cover_image)
+        cover_image_url, cover_variants = await upload_book_cover(book_cover_image)
 
     new_book = Book(
         title=title,
@@ -44,31 +91,141 @@ async def create_book(
         published_date=published_date,
         owner_id=current_user.id,
         book_cover_image=cover_image_url,
+        book_cover_variants=cover_variants,
     )
     db.add(new_book)
 
     try:
-        db.commit()
-        db.refresh(new_book)
+        await db.commit()
+        await db.refresh(new_book)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Intgerity error occured."
         )
+    book_counter.adjust(1)
 
     return new_book
 
 
-@router.get("/{book_id}", response_model=BookRead)
-def get_book_by_id(book_id: uuid.UUID, db: Session = Depends(get_db)):
-    existing_book = db.query(Book).filter(Book.id == book_id).first()
+@router.get("/export")
+async def export_books(
+    format: ExportFormat = "csv",
+    current_user: Principal = Depends(allowed_role("admin")),
+):
+    filename = f"books.{format}"
+    return StreamingResponse(
+        stream_books(format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-    if not existing_book:
+
+@router.post("/batch-get", response_model=BookBatchGetResponse)
+async def batch_get_books(
+    payload: BookBatchGet,
+    db: AsyncSession = Depends(get_async_db),
+):
+    if len(payload.ids) > BATCH_GET_MAX_IDS:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Book not found!"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_GET_MAX_IDS} ids per request.",
         )
 
-    return existing_book
+    books, not_found = await get_books_by_ids(db, payload.ids)
+    return Response(
+        content=render_batch(books, not_found), media_type="application/json"
+    )
+
+
+def _check_bulk_ids(ids: list[uuid.UUID] | None) -> None:
+    if ids is not None and len(ids) > BULK_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_MAX_IDS} ids per request.",
+        )
+
+
+@router.patch("/bulk", response_model=BookBulkResult)
+async def bulk_update(
+    payload: BookBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
+):
+    _check_bulk_ids(payload.filter.ids)
+
+    values: dict[str, Any] = payload.changes.model_dump(
+        exclude_none=True, exclude={"price_multiplier"}
+    )
+    if payload.changes.price_multiplier is not None:
+        values["price"] = Book.price * payload.changes.price_multiplier
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="No changes given."
+        )
+
+    if payload.dry_run:
+        matched = await count_matching(db, payload.filter)
+        return {"matched": matched, "affected": 0, "dry_run": True}
+
+    try:
+        affected = await bulk_update_books(db, payload.filter, values)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occurred."
+        )
+    return {"matched": affected, "affected": affected, "dry_run": False}
+
+
+@router.post("/bulk-delete", response_model=BookBulkResult)
+async def bulk_delete(
+    payload: BookBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
+):
+    _check_bulk_ids(payload.filter.ids)
+
+    if payload.dry_run:
+        matched = await count_matching(db, payload.filter)
+        return {"matched": matched, "affected": 0, "dry_run": True}
+
+    try:
+        affected = await bulk_delete_books(db, payload.filter)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occurred."
+        )
+    return {"matched": affected, "affected": affected, "dry_run": False}
+
+
+@router.get("/{book_id}", response_model=BookRead)
+async def get_book_by_id(
+    book_id: uuid.UUID,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    cached = book_cache.get(book_id)
+    if cached is None:
+        existing_book = (
+            await db.execute(select(*BOOK_COLUMNS).where(Book.id == book_id))
+        ).first()
+
+        if not existing_book:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Book not found!"
+            )
+
+        cached = make_cached_book(existing_book)
+        book_cache.put(book_id, cached)
+
+    headers = {"ETag": cached.etag}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=cached.body, media_type="application/json", headers=headers
+    )
 
 
 @router.patch("/{book_id}", response_model=BookRead)
@@ -79,20 +236,20 @@ async def update_book(
     price: float | None = Form(None),
     published_date: date | None = Form(None),
     book_cover_image: UploadFile | None = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
 ):
-    existing_book = db.query(Book).filter(Book.id == book_id).first()
+    existing_book = await db.scalar(select(Book).where(Book.id == book_id))
     if not existing_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found!"
         )
 
     if book_cover_image:
-        cover_image_url = await upload_profile_img(book_cover_image)
-        if not cover_image_url:
-            cover_image_url = existing_book.book_cover_image
-        existing_book.book_cover_image = cover_image_url
+        cover_image_url, cover_variants = await upload_book_cover(book_cover_image)
+        if cover_image_url:
+            existing_book.book_cover_image = cover_image_url
+            existing_book.book_cover_variants = cover_variants
 
     if title is not None:
         existing_book.title = title
@@ -105,48 +262,98 @@ async def update_book(
 
     db.add(existing_book)
     try:
-        db.commit()
-        db.refresh(existing_book)
+        await db.commit()
+        await db.refresh(existing_book)
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occurred."
         )
+    book_cache.invalidate(book_id)
     return existing_book
 
 
 @router.delete("/{book_id}", response_model=BookDelete)
-def delete_book(
+async def delete_book(
     book_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
 ):
-    existing_book = db.query(Book).filter(Book.id == book_id).first()
+    existing_book = await db.scalar(select(Book).where(Book.id == book_id))
 
     if not existing_book:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Book not found!"
         )
 
-    db.delete(existing_book)
+    await db.delete(existing_book)
 
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occurred."
         )
+    book_counter.adjust(-1)
+    book_cache.invalidate(book_id)
     return {"book": existing_book, "message": "Book successfully deleted."}
 
 
 @router.get("", response_model=PaginatedBookList)
-def get_paginated_books(
-    page: int = 1, per_page: int = 10, db: Session = Depends(get_db)
+async def get_paginated_books(
+    page: int = 1,
+    per_page: int = 10,
+    mode: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = None,
+    count: Literal["exact", "estimate", "none"] | None = None,
+    q: str | None = None,
+    author: str | None = None,
+    title: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    total_books = db.query(Book).count()
+    if per_page <= 0:
+        per_page = 10
+    elif per_page > 100:
+        per_page = 100
+
+    cursor_mode = mode == "cursor" or cursor is not None
+    if count is None:
+        count = "none" if cursor_mode else "exact"
+
+    query, relevance = apply_search(
+        select(*BOOK_COLUMNS), db.get_bind().dialect.name, q=q, author=author, title=title
+    )
+    searching = has_search(q, author, title)
+
+    total_books: int | None = None
+    if count != "none" and searching:
+        # Cached totals describe the whole catalog, not a filtered slice.
+        total_books = await db.scalar(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )
+    elif count == "exact":
+        total_books = await book_counter.exact(db)
+    elif count == "estimate":
+        total_books = await book_counter.estimate(db)
+    total_pages: int | None = (
+        math.ceil(total_books / per_page) if total_books is not None else None
+    )
+
+    link_params = {"per_page": per_page}
+    if count != ("none" if cursor_mode else "exact"):
+        link_params["count"] = count
+    link_params.update(
+        {k: v for k, v in {"q": q, "author": author, "title": title}.items() if v}
+    )
+
+    if cursor_mode:
+        result = await _get_books_by_cursor(db, query, per_page, cursor, link_params)
+        result.update(total_books=total_books, total_pages=total_pages)
+        return Response(render_book_page(**result), media_type="application/json")
 
-    if total_books == 0:
+    exact_total = count == "exact" or (count == "estimate" and searching)
+    if exact_total and total_books == 0:
         return {
             "books": [],
             "next_page": None,
@@ -155,35 +362,99 @@ def get_paginated_books(
             "total_books": 0,
         }
 
-    if per_page <= 0:
-        per_page = 10
-    elif per_page > 100:
-        per_page = 100
-
-    total_pages: int = math.ceil(total_books / per_page) if total_books else 1
-
     if page < 1:
         page = 1
-    elif page > total_pages:
+    elif exact_total and page > total_pages:
         page = total_pages
 
     offset: int = (page - 1) * per_page
 
-    paginated_books = db.query(Book).offset(offset).limit(per_page).all()
+    paginated_books = (
+        await db.execute(
+            query.order_by(*relevance, *keyset_order(NEXT))
+            .offset(offset)
+            .limit(per_page + 1)
+        )
+    ).all()
+    has_more = len(paginated_books) > per_page
+    paginated_books = paginated_books[:per_page]
 
     def make_link(p):
-        return f"/books?page={p}&per_page={per_page}"
+        return f"/books?{urlencode({'page': p, **link_params})}"
+
+    return Response(
+        render_book_page(
+            rows=paginated_books,
+            next_page=make_link(page + 1) if has_more else None,
+            prev_page=make_link(page - 1) if page > 1 else None,
+            total_pages=total_pages,
+            total_books=total_books,
+            has_more=has_more,
+        ),
+        media_type="application/json",
+    )
+
+
+async def _get_books_by_cursor(
+    db: AsyncSession,
+    query: Select,
+    per_page: int,
+    cursor: str | None,
+    link_params: dict[str, Any],
+):
+    # Cursor pages keep the (created_at, id) order even when searching; a
+    # relevance score is not a stable seek key.
+    direction = NEXT
+    if cursor:
+        created_at, book_id, direction = decode_cursor(cursor)
+        query = query.where(
+            keyset_filter(db.get_bind().dialect.name, created_at, book_id, direction)
+        )
+
+    # Probe one row past the page to learn whether another page exists
+    # without counting the table.
+    rows = list(
+        await db.execute(query.order_by(*keyset_order(direction)).limit(per_page + 1))
+    )
+    more_in_direction = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if direction == NEXT:
+        has_next = more_in_direction
+        has_prev = bool(cursor) and bool(rows)
+    else:
+        rows.reverse()
+        has_next = bool(rows)
+        has_prev = more_in_direction
+
+    next_cursor = (
+        encode_cursor(rows[-1].created_at, rows[-1].id, NEXT) if has_next else None
+    )
+    prev_cursor = (
+        encode_cursor(rows[0].created_at, rows[0].id, PREV) if has_prev else None
+    )
+
+    def make_link(c):
+        return f"/books?{urlencode({'mode': 'cursor', 'cursor': c, **link_params})}"
 
     return {
-        "books": paginated_books,
-        "next_page": make_link(page + 1) if page < total_pages else None,
-        "prev_page": make_link(page - 1) if page > 1 else None,
-        "total_pages": total_pages,
-        "total_books": total_books,
+        "rows": rows,
+        "next_page": make_link(next_cursor) if next_cursor else None,
+        "prev_page": make_link(prev_cursor) if prev_cursor else None,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "has_more": has_next,
     }
 
+
 @router.post("/upload", response_model=BookBulkUploadResponse)
-async def upload_books_using_csv(csv_file: UploadFile = File(...), db: Session = Depends(get_db), current_user: User = Depends(allowed_role("admin"))):
+async def upload_books_using_csv(
+    csv_file: UploadFile = File(...),
+    commit: CommitPolicy = "chunk",
+    chunk_size: int = CSV_CHUNK_SIZE,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
+):
 
     if not csv_file or not csv_file.filename:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Failed to upload file.")
@@ -194,45 +465,12 @@ async def upload_books_using_csv(csv_file: UploadFile = File(...), db: Session =
             detail="Only CSV files are allowed."
         )
 
-    content = await csv_file.read()
-    csv_data = io.StringIO(content.decode('utf-8'))
-    reader = csv.DictReader(csv_data)
-
-    required_fields = {"title", "author", "price", "published_date"}
+    chunk_size = min(max(chunk_size, 1), 10_000)
 
-    missing_fields = required_fields - set(reader.fieldnames or [])
-    if missing_fields:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Missing required columns: {', '.join(missing_fields)}"
-        )
-    
-    inserted_count = 0
-    skipped_count = 0
-    errors: List[Dict[str, Any]] = []
-
-    for i, row in enumerate(reader, start=2):
-        try:
-            book_data = BookCreate(
-                title=row["title"].strip(),
-                author=row["author"].strip(),
-                price=float(row["price"].strip()),
-                book_cover_image=row["book_cover_image"].strip(),
-                published_date=datetime.strptime(row["published_date"].strip(), "%Y-%m-%d").date(),
-                owner_id=current_user.id
-            )
-
-            book = Book(**book_data.model_dump())
-            db.add(book)
-            inserted_count +=1
-        except Exception as e:
-            skipped_count += 1
-            errors.append({"row": 1, "error": str(e)})
-
-    db.commit()
-
-    return {
-        "inserted": inserted_count,
-        "skipped": skipped_count,
-        "errors": errors
-    }
\ No newline at end of file
+    return await ingest_books_csv(
+        db,
+        csv_file.file,
+        current_user.id,
+        chunk_size=chunk_size,
+        commit_policy=commit,
+    )
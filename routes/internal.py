@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from config.pool import pool_report
+from config.session import async_engine, sync_engine
+from utils.user import allowed_role
+from utils.principal_cache import Principal
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+"""
+Operational endpoints (admin only):
+○ GET /internal/db-pool → Pool occupancy, checkout wait and latency per engine
+"""
+
+
+@router.get("/db-pool")
+async def db_pool_stats(
+    current_user: Principal = Depends(allowed_role("admin")),
+):
+    return {
+        "sync": pool_report(sync_engine),
+        "async": pool_report(async_engine),
+    }
@@ -0,0 +1,59 @@
+import os
+import secrets
+from dotenv import load_dotenv
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from config.pool import pool_report
+from config.session import async_engine, sync_engine
+from utils.book_cache import book_cache
+from utils.hashing import hashing_pool
+from utils.image_variants import variant_pool
+from utils.mail_outbox import mail_send_duration, outbox_worker
+from utils.metrics import render_gauges, render_request_metrics
+from utils.principal_cache import principal_cache
+from utils.storage import image_stage_duration
+from utils.rate_limit import rate_limiter, throttled_requests
+from utils.token import verified_tokens
+from utils.token_sweeper import token_sweeper
+
+load_dotenv()
+
+# Optional shared secret for the scraper; /metrics is open when unset.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+router = APIRouter(tags=["internal"])
+"""
+○ GET /metrics → Prometheus text: per-route latency, DB time and query counts,
+  mail send latency, throttled auth requests, image stage timings, plus pool,
+  cache, rate limiter, mail outbox and token sweeper gauges
+"""
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics(authorization: str | None = Header(None)):
+    if METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {METRICS_TOKEN}"
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token."
+        )
+
+    lines = render_request_metrics() + mail_send_duration.render()
+    lines += throttled_requests.render() + image_stage_duration.render()
+    lines += render_gauges("bookstore_rate_limit", rate_limiter.stats())
+    lines += render_gauges("bookstore_hashing_pool", hashing_pool.stats())
+    lines += render_gauges("bookstore_image_variant_pool", variant_pool.stats())
+    lines += render_gauges("bookstore_mail_outbox", outbox_worker.stats())
+    lines += render_gauges("bookstore_token_sweeper", token_sweeper.stats())
+    for name, cache in (
+        ("principal", principal_cache),
+        ("token", verified_tokens),
+        ("book", book_cache),
+    ):
+        lines += render_gauges("bookstore_cache", cache.stats(), {"cache": name})
+    for name, engine in (("sync", sync_engine), ("async", async_engine)):
+        lines += render_gauges("bookstore_db_pool", pool_report(engine), {"engine": name})
+
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type="text/plain; version=0.0.4"
+    )
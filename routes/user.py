@@ -4,25 +4,28 @@ from fastapi import (
     Depends,
     status
 )
-from database import get_db
-from sqlalchemy.orm import Session
+from database import get_async_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
 from schemas.user import UserRead, UserDelete, UserUpdate
 from sqlalchemy.exc import IntegrityError
 from utils.user import allowed_role
+from utils.principal_cache import Principal, principal_cache
+from utils.book_cache import book_cache
 from uuid import UUID
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.patch("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     user_id: UUID,
     user: UserUpdate,
-    current_user: User = Depends(allowed_role("admin")),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(allowed_role("admin")),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    existing_user = db.query(User).filter(User.id == user_id).first()
+    existing_user = await db.scalar(select(User).where(User.id == user_id))
 
     if not existing_user:
         raise HTTPException(
@@ -36,30 +39,40 @@ def update_user(
 
     db.add(existing_user)
     try:
-        db.commit()
-        db.refresh(existing_user)
+        await db.commit()
+        await db.refresh(existing_user)
+        principal_cache.invalidate(existing_user.email)
         return existing_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occured."
         )
 
 
 @router.delete("/{user_id}", response_model=UserDelete)
-def delete_user(
+async def delete_user(
     user_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(allowed_role("admin")),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(allowed_role("admin")),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
 
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    db.delete(user)
-    db.refresh(user)
+    await db.delete(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Integrity error occured."
+        )
+    principal_cache.invalidate(user.email)
+    # The FK sets owner_id to NULL on this user's books.
+    book_cache.clear()
 
     return {"user": user, "message": "User successfully deleted."}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Dict, Optional, List
 from datetime import datetime, date
 from uuid import UUID
 
@@ -10,6 +10,7 @@ class BookRead(BaseModel):
     author: str
     price: float
     book_cover_image: Optional[str] = None
+    book_cover_variants: Optional[Dict[str, Dict[str, str]]] = None
     published_date: date
     created_at: datetime
     updated_at: datetime
@@ -54,8 +55,65 @@ class PaginatedBookList(BaseModel):
     books: List[BookRead]
     next_page: Optional[str] = None
     prev_page: Optional[str] = None
-    total_pages: int
-    total_books: int
+    total_pages: Optional[int] = None
+    total_books: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    has_more: bool = False
+
+class BookBatchGet(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1)
+
+
+class BookBatchGetResponse(BaseModel):
+    books: List[BookRead]
+    not_found: List[UUID] = []
+
+class BookFilter(BaseModel):
+    ids: Optional[List[UUID]] = Field(None, min_length=1)
+    author: Optional[str] = None
+    owner_id: Optional[UUID] = None
+    published_from: Optional[date] = None
+    published_to: Optional[date] = None
+
+    @model_validator(mode="after")
+    def not_unbounded(self):
+        # Guard against touching the whole catalog by accident.
+        if all(value is None for value in self.__dict__.values()):
+            raise ValueError("At least one filter is required")
+        return self
+
+
+class BookBulkChanges(BaseModel):
+    title: Optional[str] = Field(None, max_length=120)
+    author: Optional[str] = Field(None, max_length=80)
+    price: Optional[float] = Field(None, gt=0)
+    price_multiplier: Optional[float] = Field(None, gt=0)
+    book_cover_image: Optional[str] = None
+    published_date: Optional[date] = None
+
+    @model_validator(mode="after")
+    def one_price_change(self):
+        if self.price is not None and self.price_multiplier is not None:
+            raise ValueError("Give either price or price_multiplier, not both")
+        return self
+
+
+class BookBulkUpdate(BaseModel):
+    filter: BookFilter
+    changes: BookBulkChanges
+    dry_run: bool = False
+
+
+class BookBulkDelete(BaseModel):
+    filter: BookFilter
+    dry_run: bool = False
+
+
+class BookBulkResult(BaseModel):
+    matched: int
+    affected: int
+    dry_run: bool
 
 class UploadError(BaseModel):
     row: int
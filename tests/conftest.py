@@ -0,0 +1,22 @@
+"""
+Tests run against a throwaway SQLite file, like the benchmarks. The
+environment is set here, before any test module imports the application,
+because config.session builds its engines at import.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from benchmarks.common import use_database
+
+use_database(Path(tempfile.mkdtemp(prefix="bookstore_tests_")) / "test.db")
+# Tests drive the outbox themselves instead of racing the background worker.
+os.environ.setdefault("MAIL_OUTBOX_WORKER_ENABLED", "false")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
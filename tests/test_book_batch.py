@@ -0,0 +1,85 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from models import Book
+from utils.book_cache import book_cache
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def book_ids(client) -> list[uuid.UUID]:
+    from config.session import sync_engine
+
+    ids = [uuid.uuid4() for _ in range(5)]
+    with sync_engine.begin() as conn:
+        conn.execute(
+            insert(Book),
+            [
+                {
+                    "id": book_id,
+                    "title": f"Batched {n}",
+                    "author": "Someone",
+                    "price": 1.0,
+                    "published_date": date(2000, 1, 1),
+                }
+                for n, book_id in enumerate(ids)
+            ],
+        )
+    return ids
+
+
+def _batch_get(client, ids: list[uuid.UUID]):
+    return client.post("/books/batch-get", json={"ids": [str(i) for i in ids]})
+
+
+def test_books_come_back_in_request_order(client, book_ids):
+    unknown = uuid.uuid4()
+    ids = [book_ids[3], unknown, book_ids[0], book_ids[3], book_ids[1]]
+
+    response = _batch_get(client, ids)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [uuid.UUID(book["id"]) for book in body["books"]] == [
+        book_ids[3],
+        book_ids[0],
+        book_ids[1],
+    ]
+    assert body["not_found"] == [str(unknown)]
+
+
+def test_cached_and_loaded_books_are_merged(client, book_ids, monkeypatch):
+    monkeypatch.setattr("utils.book_batch.BATCH_GET_QUERY_CHUNK", 2)
+    assert client.get(f"/books/{book_ids[2]}").status_code == 200
+    assert book_cache.get(book_ids[2]) is not None
+
+    response = _batch_get(client, book_ids)
+
+    assert response.status_code == 200
+    books = response.json()["books"]
+    assert [book["title"] for book in books] == [f"Batched {n}" for n in range(5)]
+    assert all(book_cache.get(book_id) is not None for book_id in book_ids)
+
+
+def test_too_many_ids_is_a_bad_request(client, book_ids, monkeypatch):
+    monkeypatch.setattr("routes.book.BATCH_GET_MAX_IDS", 4)
+
+    response = _batch_get(client, book_ids)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At most 4 ids per request."
+
+
+def test_empty_ids_are_rejected(client):
+    assert _batch_get(client, []).status_code == 422
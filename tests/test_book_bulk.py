@@ -0,0 +1,158 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from config.startup import ADMIN_EMAIL, ADMIN_PASSWORD
+from models import Book
+from utils.book_count import book_counter
+
+BOOKS = 5
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    response = client.post(
+        "/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def author(client) -> str:
+    """A fresh author owning BOOKS books priced 1..BOOKS."""
+    from config.session import sync_engine
+
+    author = f"Bulk {uuid.uuid4().hex[:8]}"
+    with sync_engine.begin() as conn:
+        conn.execute(
+            insert(Book),
+            [
+                {
+                    "title": f"Bulk {n}",
+                    "author": author,
+                    "price": float(n),
+                    "published_date": date(2000, 1, n),
+                }
+                for n in range(1, BOOKS + 1)
+            ],
+        )
+    return author
+
+
+def _books(author: str) -> list[Book]:
+    from config.session import SessionLocal
+
+    with SessionLocal() as db:
+        return db.scalars(
+            select(Book).where(Book.author == author).order_by(Book.price)
+        ).all()
+
+
+def test_update_by_filter_applies_price_multiplier(client, admin_headers, author):
+    response = client.patch(
+        "/books/bulk",
+        json={
+            "filter": {"author": author, "published_from": "2000-01-03"},
+            "changes": {"price_multiplier": 2},
+        },
+        headers=admin_headers,
+    )
+
+    assert response.json() == {"matched": 3, "affected": 3, "dry_run": False}
+    assert [book.price for book in _books(author)] == [1, 2, 6, 8, 10]
+
+
+def test_dry_run_counts_without_writing(client, admin_headers, author):
+    response = client.post(
+        "/books/bulk-delete",
+        json={"filter": {"author": author}, "dry_run": True},
+        headers=admin_headers,
+    )
+
+    assert response.json() == {"matched": BOOKS, "affected": 0, "dry_run": True}
+    assert len(_books(author)) == BOOKS
+
+
+@pytest.mark.parametrize("by_ids", [True, False])
+def test_update_invalidates_cached_books(client, admin_headers, author, by_ids):
+    book_id = _books(author)[0].id
+    assert client.get(f"/books/{book_id}").json()["title"] == "Bulk 1"
+
+    book_filter = {"ids": [str(book_id)]} if by_ids else {"author": author}
+    response = client.patch(
+        "/books/bulk",
+        json={"filter": book_filter, "changes": {"title": "Bulk Renamed"}},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 200
+    assert client.get(f"/books/{book_id}").json()["title"] == "Bulk Renamed"
+
+
+def test_delete_by_ids_in_chunks_adjusts_the_counter(
+    client, admin_headers, author, monkeypatch
+):
+    from config.session import sync_engine
+
+    monkeypatch.setattr("utils.book_bulk.BULK_ID_CHUNK", 2)
+    book_counter.invalidate()
+    total = client.get("/books").json()["total_books"]
+    ids = [str(book.id) for book in _books(author)]
+    cached_id = ids[0]
+    assert client.get(f"/books/{cached_id}").status_code == 200
+
+    response = client.post(
+        "/books/bulk-delete",
+        json={"filter": {"ids": ids + ids[:2]}},
+        headers=admin_headers,
+    )
+
+    assert response.json() == {"matched": BOOKS, "affected": BOOKS, "dry_run": False}
+    assert client.get(f"/books/{cached_id}").status_code == 404
+    with sync_engine.connect() as conn:
+        counted = conn.scalar(select(func.count()).select_from(Book))
+    assert client.get("/books").json()["total_books"] == total - BOOKS == counted
+
+
+@pytest.mark.parametrize("path", ["/books/bulk", "/books/bulk-delete"])
+def test_too_many_ids_is_a_bad_request(client, admin_headers, monkeypatch, path):
+    monkeypatch.setattr("routes.book.BULK_MAX_IDS", 2)
+    payload = {
+        "filter": {"ids": [str(uuid.uuid4()) for _ in range(3)]},
+        "changes": {"title": "Never Applied"},
+    }
+
+    if path == "/books/bulk":
+        response = client.patch(path, json=payload, headers=admin_headers)
+    else:
+        response = client.post(path, json=payload, headers=admin_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At most 2 ids per request."
+
+
+def test_unbounded_filter_and_empty_changes_are_rejected(client, admin_headers, author):
+    unbounded = client.post(
+        "/books/bulk-delete", json={"filter": {}}, headers=admin_headers
+    )
+    no_changes = client.patch(
+        "/books/bulk",
+        json={"filter": {"author": author}, "changes": {}},
+        headers=admin_headers,
+    )
+
+    assert unbounded.status_code == 422
+    assert no_changes.status_code == 400
+    assert no_changes.json()["detail"] == "No changes given."
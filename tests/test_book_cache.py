@@ -0,0 +1,112 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, update
+
+from config.startup import ADMIN_EMAIL, ADMIN_PASSWORD
+from models import Book
+from utils.book_cache import etag_matches
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    response = client.post(
+        "/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def book_id(client) -> uuid.UUID:
+    from config.session import sync_engine
+
+    book_id = uuid.uuid4()
+    with sync_engine.begin() as conn:
+        conn.execute(
+            insert(Book).values(
+                id=book_id,
+                title="Cached Title",
+                author="Someone",
+                price=1.0,
+                published_date=date(2000, 1, 1),
+            )
+        )
+    return book_id
+
+
+def _rename_behind_the_cache(book_id: uuid.UUID, title: str) -> None:
+    from config.session import sync_engine
+
+    with sync_engine.begin() as conn:
+        conn.execute(update(Book).where(Book.id == book_id).values(title=title))
+
+
+@pytest.mark.parametrize(
+    "if_none_match, matches",
+    [
+        (None, False),
+        ('"other"', False),
+        ('"v1-abc"', True),
+        ('W/"v1-abc"', True),
+        ('"other", "v1-abc"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, '"v1-abc"') is matches
+
+
+def test_matching_etag_is_not_modified(client, book_id):
+    first = client.get(f"/books/{book_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_reads_are_served_from_the_cache(client, book_id):
+    etag = client.get(f"/books/{book_id}").headers["ETag"]
+    _rename_behind_the_cache(book_id, "Renamed Behind")
+
+    response = client.get(f"/books/{book_id}")
+
+    assert response.headers["ETag"] == etag
+    assert response.json()["title"] == "Cached Title"
+
+
+def test_update_invalidates_the_cached_body(client, admin_headers, book_id):
+    etag = client.get(f"/books/{book_id}").headers["ETag"]
+
+    patched = client.patch(
+        f"/books/{book_id}", data={"title": "Patched Title"}, headers=admin_headers
+    )
+    assert patched.status_code == 200
+
+    response = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["title"] == "Patched Title"
+
+
+def test_delete_invalidates_the_cached_body(client, admin_headers, book_id):
+    assert client.get(f"/books/{book_id}").status_code == 200
+
+    deleted = client.delete(f"/books/{book_id}", headers=admin_headers)
+    assert deleted.status_code == 200
+
+    assert client.get(f"/books/{book_id}").status_code == 404
@@ -0,0 +1,126 @@
+import math
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, insert, select
+
+from benchmarks.common import seed_books
+from models import Book, RowCount
+from utils.book_count import book_counter
+
+PER_PAGE = 4
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    from config.session import sync_engine
+
+    with TestClient(main.app) as client:
+        seed_books(sync_engine, 10, seed=11)
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def fresh_counter():
+    # Other modules write books behind the process-wide counter's back.
+    book_counter.invalidate()
+    yield
+    book_counter.invalidate()
+
+
+def _count(**where) -> int:
+    from config.session import sync_engine
+
+    query = select(func.count()).select_from(Book)
+    for column, value in where.items():
+        query = query.where(getattr(Book, column) == value)
+    with sync_engine.connect() as conn:
+        return conn.scalar(query)
+
+
+def _insert_books(titles: list[str]) -> None:
+    from config.session import sync_engine
+
+    with sync_engine.begin() as conn:
+        conn.execute(
+            insert(Book),
+            [
+                {
+                    "title": title,
+                    "author": "Counted Author",
+                    "price": 1.0,
+                    "published_date": date(2000, 1, 1),
+                }
+                for title in titles
+            ],
+        )
+
+
+def _list(client, **params) -> dict:
+    response = client.get("/books", params={"per_page": PER_PAGE, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_exact_is_the_offset_default(client):
+    body = _list(client)
+
+    total = _count()
+    assert body["total_books"] == total
+    assert body["total_pages"] == math.ceil(total / PER_PAGE)
+    assert "count=" not in body["next_page"]
+
+
+def test_estimate_reads_the_trigger_counter(client):
+    from config.session import sync_engine
+
+    _insert_books(["Estimated One", "Estimated Two"])
+    with sync_engine.begin() as conn:
+        conn.execute(delete(Book).where(Book.title == "Estimated One"))
+        counted = conn.scalar(
+            select(RowCount.row_count).where(RowCount.table_name == "books")
+        )
+
+    body = _list(client, count="estimate")
+
+    assert counted == _count()
+    assert body["total_books"] == counted
+    assert "count=estimate" in body["next_page"]
+
+
+def test_none_skips_totals_but_still_links(client):
+    body = _list(client, count="none")
+
+    assert body["total_books"] is None and body["total_pages"] is None
+    assert body["has_more"] is True
+    assert "count=none" in body["next_page"]
+
+
+def test_cursor_mode_counts_only_on_request(client):
+    assert _list(client, mode="cursor")["total_books"] is None
+
+    body = _list(client, mode="cursor", count="exact")
+
+    assert body["total_books"] == _count()
+    assert "count=exact" in body["next_page"]
+
+
+@pytest.mark.parametrize("count", ["exact", "estimate"])
+def test_search_counts_the_matches(client, count):
+    _insert_books([f"Countable Matches {n}" for n in range(3)])
+
+    body = _list(client, count=count, author="Counted Author")
+
+    assert body["total_books"] == _count(author="Counted Author")
+
+
+def test_cached_exact_count_follows_adjust(client):
+    total = _list(client)["total_books"]
+    _insert_books(["Uncounted Write"])
+
+    # Within the TTL the cached total only moves through adjust().
+    assert _list(client)["total_books"] == total
+    book_counter.adjust(1)
+    assert _list(client)["total_books"] == total + 1 == _count()
@@ -0,0 +1,54 @@
+import csv
+import io
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config.base import Base
+from utils.csv_ingest import ingest_books_csv
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "title,author,price,published_date\n"
+OVERSIZED = "x" * (csv.field_size_limit() + 1)
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _ingest(db, text: str, **options):
+    return await ingest_books_csv(db, io.BytesIO(text.encode()), uuid.uuid4(), **options)
+
+
+async def test_malformed_record_is_reported_and_skipped(db):
+    text = (
+        HEADER
+        + "Dune,Frank Herbert,9.5,1965-08-01\n"
+        + f"{OVERSIZED},Someone,1,2000-01-01\n"
+        + "Emma,Jane Austen,4,1815-12-23\n"
+    )
+
+    result = await _ingest(db, text, chunk_size=2)
+
+    assert result["inserted"] == 2 and result["skipped"] == 1
+    (error,) = result["errors"]
+    assert error["row"] == 3
+    assert error["error"].startswith("Malformed CSV: field larger than field limit")
+
+
+async def test_malformed_header_is_a_bad_request(db):
+    with pytest.raises(HTTPException) as raised:
+        await _ingest(db, f"title,{OVERSIZED}\nDune,x\n")
+
+    assert raised.value.status_code == 400
+    assert raised.value.detail.startswith("Malformed CSV at line 1:")
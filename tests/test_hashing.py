@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from utils.hashing import HashingPool
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool():
+    pool = HashingPool(workers=1, max_pending=1, retry_after=3)
+    yield pool
+    pool.shutdown()
+
+
+async def _wait_idle(pool: HashingPool, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while pool.pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+async def test_runs_in_worker(pool):
+    assert await pool.run(pow, 2, 10) == 1024
+    assert pool.stats()["completed"] == 1 and pool.pending == 0
+
+
+async def test_rejects_when_full(pool):
+    job = asyncio.create_task(pool.run(time.sleep, 0.5))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as raised:
+        await pool.run(pow, 2, 10)
+    assert raised.value.status_code == 503
+    assert raised.value.headers == {"Retry-After": "3"}
+
+    await job
+    assert pool.rejected == 1 and pool.completed == 1
+
+
+async def test_cancelled_caller_keeps_running_job_counted(pool):
+    # Start the worker process so the next job is picked up at once.
+    await pool.run(pow, 2, 10)
+
+    job = asyncio.create_task(pool.run(time.sleep, 1))
+    await asyncio.sleep(0.3)
+    job.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await job
+
+    # The worker is still busy with the job, so it still takes the only slot.
+    assert pool.pending == 1 and pool.cancelled == 1
+    with pytest.raises(HTTPException):
+        await pool.run(pow, 2, 10)
+
+    await _wait_idle(pool)
+    assert pool.pending == 0
+    assert pool.stats()["completed"] == 2 and pool.stats()["cancelled"] == 1
+    assert await pool.run(pow, 2, 10) == 1024
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from utils.image_variants import VariantPool, parse_sizes, render_variants
+
+SIZES = parse_sizes("thumb:160,full:800")
+
+
+def _image(path: Path, size: tuple[int, int], mode: str = "RGB", **save) -> str:
+    color = {"P": 1, "RGBA": (255, 0, 0, 128)}.get(mode, "red")
+    Image.new(mode, size, color).save(path, **save)
+    return str(path)
+
+
+def _outputs(result: dict) -> dict[tuple[str, str], tuple[str, tuple[int, int], str]]:
+    """(size, key) -> (format, dimensions, mode) of each written file."""
+    outputs = {}
+    for size, key, path in result["files"]:
+        with Image.open(path) as image:
+            outputs[size, key] = (image.format, image.size, image.mode)
+    return outputs
+
+
+def test_parse_sizes_orders_largest_first():
+    assert parse_sizes("thumb:160, full:1600,medium:480") == (
+        ("full", 1600),
+        ("medium", 480),
+        ("thumb", 160),
+    )
+
+
+def test_jpeg_gets_webp_and_jpeg_at_every_size(tmp_path):
+    source = _image(tmp_path / "cover.jpg", (3000, 1500))
+
+    outputs = _outputs(render_variants(source, str(tmp_path), SIZES))
+
+    assert outputs == {
+        ("full", "webp"): ("WEBP", (800, 400), "RGB"),
+        ("full", "jpeg"): ("JPEG", (800, 400), "RGB"),
+        ("thumb", "webp"): ("WEBP", (160, 80), "RGB"),
+        ("thumb", "jpeg"): ("JPEG", (160, 80), "RGB"),
+    }
+
+
+def test_png_keeps_alpha_and_small_images_are_not_enlarged(tmp_path):
+    source = _image(tmp_path / "cover.png", (100, 300), "RGBA")
+
+    outputs = _outputs(render_variants(source, str(tmp_path), SIZES))
+
+    assert outputs[("full", "png")] == ("PNG", (100, 300), "RGBA")
+    assert outputs[("thumb", "png")] == ("PNG", (53, 160), "RGBA")
+    assert outputs[("thumb", "webp")][1:] == ((53, 160), "RGBA")
+
+
+def test_webp_source_is_written_once_per_size(tmp_path):
+    source = _image(tmp_path / "cover.webp", (1000, 1000))
+
+    result = render_variants(source, str(tmp_path), SIZES)
+
+    assert [(size, key) for size, key, _ in result["files"]] == [
+        ("full", "webp"),
+        ("thumb", "webp"),
+    ]
+
+
+def test_palette_gif_is_converted(tmp_path):
+    source = _image(tmp_path / "cover.gif", (400, 200), "P")
+
+    outputs = _outputs(render_variants(source, str(tmp_path), SIZES))
+
+    assert outputs[("thumb", "gif")][:2] == ("GIF", (160, 80))
+    assert outputs[("thumb", "webp")][2] == "RGB"
+
+
+def test_exif_orientation_is_applied(tmp_path):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees clockwise
+    source = _image(tmp_path / "cover.jpg", (1200, 600), exif=exif)
+
+    outputs = _outputs(render_variants(source, str(tmp_path), SIZES))
+
+    assert outputs[("full", "jpeg")][1] == (400, 800)
+
+
+def test_unreadable_and_oversized_images_are_rejected(tmp_path):
+    text = tmp_path / "cover.png"
+    text.write_bytes(b"not an image")
+    with pytest.raises(ValueError, match="Unreadable image"):
+        render_variants(str(text), str(tmp_path), SIZES)
+
+    source = _image(tmp_path / "big.png", (1000, 1000))
+    with pytest.raises(ValueError, match="Unreadable image"):
+        render_variants(source, str(tmp_path), SIZES, max_pixels=100_000)
+
+
+@pytest.mark.anyio
+async def test_pool_counts_completed_and_failed_renders(tmp_path):
+    pool = VariantPool(workers=1)
+    source = _image(tmp_path / "cover.png", (2000, 100))
+    (tmp_path / "broken.png").write_bytes(b"broken")
+    try:
+        result = await pool.render(source, str(tmp_path))
+        with pytest.raises(ValueError):
+            await pool.render(str(tmp_path / "broken.png"), str(tmp_path))
+    finally:
+        pool.shutdown()
+
+    assert {key for _, key, _ in result["files"]} == {"webp", "png"}
+    assert set(result["timings"]) == {"decode", "resize", "encode"}
+    assert pool.stats() == {"workers": 1, "queue_depth": 0, "completed": 1, "failed": 1}
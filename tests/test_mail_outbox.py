@@ -0,0 +1,297 @@
+import os
+import socket
+from datetime import timedelta
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from config.base import Base
+from models import OutboxMessage
+from utils.mail_outbox import (
+    FAILED,
+    PENDING,
+    SENT,
+    OutboxWorker,
+    PooledSMTP,
+    _utcnow,
+    enqueue_mail,
+    is_connection_error,
+    is_permanent,
+)
+from utils.token import generate_secret_token
+
+pytestmark = pytest.mark.anyio
+
+
+class ScriptedHandler:
+    """Accepts mail unless told to refuse recipients or drop the connection."""
+
+    def __init__(self):
+        self.rcpt_reply: str | None = None
+        self.drop_next = False
+        self.received: list[str] = []
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        if self.drop_next:
+            self.drop_next = False
+            server.transport.close()
+            return "421 4.4.2 Closing connection"
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.rcpt_reply:
+            return self.rcpt_reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = ScriptedHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine(os.environ["ASYNC_DATABASE_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(OutboxMessage))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _worker(session_factory, port: int, **options) -> OutboxWorker:
+    smtp = PooledSMTP(
+        hostname="127.0.0.1",
+        port=port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        timeout=5,
+    )
+    return OutboxWorker(session_factory, smtp=smtp, backoff_seconds=60, **options)
+
+
+async def _enqueue(session_factory, *recipients: str) -> None:
+    async with session_factory() as db:
+        for recipient in recipients:
+            enqueue_mail(db, recipient, "Subject", "<p>Body</p>")
+        await db.commit()
+
+
+async def _messages(session_factory) -> dict[str, OutboxMessage]:
+    async with session_factory() as db:
+        rows = (await db.scalars(select(OutboxMessage))).all()
+    return {row.recipient: row for row in rows}
+
+
+async def _make_due(session_factory) -> None:
+    async with session_factory() as db:
+        await db.execute(update(OutboxMessage).values(next_attempt_at=_utcnow()))
+        await db.commit()
+
+
+def test_error_classification():
+    assert is_connection_error(aiosmtplib.SMTPServerDisconnected("gone"))
+    assert is_connection_error(ConnectionResetError())
+    assert not is_connection_error(aiosmtplib.SMTPResponseException(451, "later"))
+
+    assert is_permanent(aiosmtplib.SMTPResponseException(550, "no such user"))
+    assert not is_permanent(aiosmtplib.SMTPResponseException(451, "later"))
+    assert not is_permanent(aiosmtplib.SMTPServerDisconnected("gone"))
+    refused = [
+        aiosmtplib.SMTPRecipientRefused(550, "no such user", "a@example.com"),
+        aiosmtplib.SMTPRecipientRefused(451, "later", "b@example.com"),
+    ]
+    assert not is_permanent(aiosmtplib.SMTPRecipientsRefused(refused))
+    assert is_permanent(aiosmtplib.SMTPRecipientsRefused(refused[:1]))
+
+
+async def test_sends_pending_mail(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    await _enqueue(session_factory, "a@example.com", "b@example.com")
+
+    assert await worker.drain_once() == 2
+    await worker.smtp.close()
+
+    rows = await _messages(session_factory)
+    assert {row.status for row in rows.values()} == {SENT}
+    assert sorted(handler.received) == ["a@example.com", "b@example.com"]
+    assert worker.sent == 2 and worker.smtp.connections == 1
+    assert worker.queue_depth == 0
+
+
+async def test_transient_failure_is_retried_with_backoff(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    await _enqueue(session_factory, "a@example.com")
+
+    handler.rcpt_reply = "451 4.3.0 Try again later"
+    started = _utcnow()
+    assert await worker.drain_once() == 1
+    row = (await _messages(session_factory))["a@example.com"]
+    assert row.status == PENDING and row.attempts == 1
+    assert "451" in row.last_error
+    # Not due again before the backoff has passed.
+    assert row.next_attempt_at.replace(tzinfo=started.tzinfo) >= started + timedelta(seconds=59)
+    assert await worker.drain_once() == 0
+    assert worker.retried == 1 and worker.queue_depth == 1
+
+    handler.rcpt_reply = None
+    await _make_due(session_factory)
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+    row = (await _messages(session_factory))["a@example.com"]
+    assert row.status == SENT and row.attempts == 2
+    assert handler.received == ["a@example.com"]
+
+
+async def test_permanent_failure_is_not_retried(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    await _enqueue(session_factory, "gone@example.com")
+
+    handler.rcpt_reply = "550 5.1.1 No such user"
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+
+    row = (await _messages(session_factory))["gone@example.com"]
+    assert row.status == FAILED and row.attempts == 1
+    assert worker.failed == 1 and worker.retried == 0 and worker.queue_depth == 0
+
+
+async def test_gives_up_after_max_attempts(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port, max_attempts=2)
+    await _enqueue(session_factory, "a@example.com")
+
+    handler.rcpt_reply = "451 4.3.0 Try again later"
+    assert await worker.drain_once() == 1
+    await _make_due(session_factory)
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+
+    row = (await _messages(session_factory))["a@example.com"]
+    assert row.status == FAILED and row.attempts == 2
+    assert worker.retried == 1 and worker.failed == 1
+
+
+async def test_reconnects_when_server_drops_pooled_connection(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    await _enqueue(session_factory, "a@example.com")
+    assert await worker.drain_once() == 1
+
+    # The next message finds the pooled connection closed by the server.
+    handler.drop_next = True
+    await _enqueue(session_factory, "b@example.com")
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+
+    rows = await _messages(session_factory)
+    assert rows["b@example.com"].status == SENT
+    assert rows["b@example.com"].attempts == 1
+    assert handler.received == ["a@example.com", "b@example.com"]
+    assert worker.smtp.connections == 2
+
+
+async def test_connection_refused_is_retried(session_factory):
+    worker = _worker(session_factory, _free_port())
+    await _enqueue(session_factory, "a@example.com")
+
+    assert await worker.drain_once() == 1
+
+    row = (await _messages(session_factory))["a@example.com"]
+    assert row.status == PENDING and row.attempts == 1
+    assert worker.retried == 1 and worker.smtp.connections == 0
+
+
+async def _plaintext_rows(session_factory, token: str) -> list[str]:
+    """Every mail_outbox and verification_tokens row that contains `token`."""
+    found = []
+    async with session_factory() as db:
+        for table in ("mail_outbox", "verification_tokens"):
+            for row in (await db.execute(text(f"SELECT * FROM {table}"))).all():
+                if any(token in str(value) for value in row):
+                    found.append(table)
+    return found
+
+
+async def test_no_plaintext_token_is_kept_after_delivery(smtp_server, session_factory):
+    from routes.auth import queue_verification_mail
+
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    token = generate_secret_token()
+    async with session_factory() as db:
+        queue_verification_mail(db, "a@example.com", token)
+        await db.commit()
+    assert await _plaintext_rows(session_factory, token) == ["mail_outbox"]
+
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+
+    assert handler.received == ["a@example.com"]
+    assert await _plaintext_rows(session_factory, token) == []
+    assert (await _messages(session_factory))["a@example.com"].status == SENT
+
+
+async def test_failed_message_body_is_cleared(smtp_server, session_factory):
+    handler, port = smtp_server
+    worker = _worker(session_factory, port)
+    await _enqueue(session_factory, "gone@example.com")
+
+    handler.rcpt_reply = "550 5.1.1 No such user"
+    assert await worker.drain_once() == 1
+    await worker.smtp.close()
+
+    row = (await _messages(session_factory))["gone@example.com"]
+    assert row.status == FAILED and row.body == ""
+
+
+async def test_purge_expires_pending_and_deletes_finished(session_factory):
+    worker = _worker(session_factory, _free_port(), max_pending_seconds=3600)
+    await _enqueue(session_factory, "old@example.com", "new@example.com", "done@example.com")
+    async with session_factory() as db:
+        day_ago = _utcnow() - timedelta(days=1)
+        await db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.recipient != "new@example.com")
+            .values(created_at=day_ago)
+        )
+        await db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.recipient == "done@example.com")
+            .values(status=SENT, body="")
+        )
+        await db.commit()
+
+    assert await worker.purge_once() == (1, 0)
+    rows = await _messages(session_factory)
+    assert rows["old@example.com"].status == FAILED and rows["old@example.com"].body == ""
+    assert rows["new@example.com"].status == PENDING
+
+    worker.retention_seconds = 3600
+    assert await worker.purge_once() == (0, 2)
+    assert list(await _messages(session_factory)) == ["new@example.com"]
+    assert worker.expired == 1 and worker.purged == 2
@@ -0,0 +1,102 @@
+import uuid
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from benchmarks.common import seed_books
+from models import Book
+from utils.pagination import NEXT, PREV, decode_cursor, encode_cursor
+
+TIED = 7
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    from config.session import sync_engine
+
+    with TestClient(main.app) as client:
+        seed_books(sync_engine, 12, seed=7)
+        with sync_engine.begin() as conn:
+            conn.execute(
+                insert(Book),
+                [
+                    {
+                        "title": f"Tied {n}",
+                        "author": "Someone",
+                        "price": 1.0,
+                        "published_date": date(2000, 1, 1),
+                    }
+                    for n in range(TIED)
+                ],
+            )
+            # Stored the way server_default CURRENT_TIMESTAMP stores it.
+            conn.exec_driver_sql(
+                "UPDATE books SET created_at = '2001-01-01 00:00:00' WHERE title LIKE 'Tied %'"
+            )
+        yield client
+
+
+def _expected_order() -> list[uuid.UUID]:
+    from config.session import sync_engine
+
+    with sync_engine.connect() as conn:
+        return list(conn.scalars(select(Book.id).order_by(Book.created_at, Book.id)))
+
+
+def _walk(client, url: str, link: str) -> tuple[list[list[uuid.UUID]], str | None]:
+    """Follow `link` from `url`; returns the pages and the other-direction link of the last."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append([uuid.UUID(book["id"]) for book in body["books"]])
+        url = body[link]
+    return pages, body["prev_page" if link == "next_page" else "next_page"]
+
+
+def test_cursor_pages_follow_created_at_then_id(client):
+    pages, _ = _walk(client, "/books?mode=cursor&per_page=2", "next_page")
+
+    assert [book_id for page in pages for book_id in page] == _expected_order()
+    assert all(len(page) == 2 for page in pages[:-1])
+
+
+def test_prev_links_retrace_the_same_pages(client):
+    forward, prev_page = _walk(client, "/books?mode=cursor&per_page=3", "next_page")
+    backward, next_page = _walk(client, prev_page, "prev_page")
+
+    assert backward == forward[-2::-1]
+    assert next_page is not None
+
+
+def test_tied_rows_are_not_skipped_or_repeated(client):
+    pages, _ = _walk(client, "/books?mode=cursor&per_page=2&title=Tied", "next_page")
+
+    walked = [book_id for page in pages for book_id in page]
+    assert len(walked) == TIED
+    assert walked == sorted(walked, key=lambda book_id: book_id.hex)
+
+
+def test_cursor_round_trip():
+    book_id = uuid.uuid4()
+    for created_at in (datetime(2001, 1, 1), datetime(2024, 5, 6, 7, 8, 9, 123456)):
+        for direction in (NEXT, PREV):
+            assert decode_cursor(encode_cursor(created_at, book_id, direction)) == (
+                created_at,
+                book_id,
+                direction,
+            )
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not-a-cursor", encode_cursor(datetime(2001, 1, 1), uuid.uuid4(), "sideways")]
+)
+def test_invalid_cursor_is_a_bad_request(client, cursor):
+    response = client.get("/books", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
@@ -0,0 +1,110 @@
+"""
+Query budgets for the read endpoints. Each budget is the number of
+statements the route needs with cold caches; a change that adds a query per
+row (N+1) or per page fails here before it shows up in /metrics.
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.common import seed_books
+from utils.query_inspector import assert_max_queries
+
+BOOKS = 30
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    from config.session import sync_engine
+
+    with TestClient(main.app) as client:
+        seed_books(sync_engine, BOOKS)
+        # Warm the pool so connection set-up is not counted.
+        client.get("/books", params={"count": "none"})
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    from utils.book_cache import book_cache
+    from utils.book_count import book_counter
+
+    book_cache.clear()
+    book_counter.invalidate()
+
+
+@pytest.mark.parametrize(
+    ("params", "budget"),
+    [
+        # count + page
+        ({"mode": "offset"}, 2),
+        ({"mode": "offset", "count": "estimate"}, 2),
+        ({"mode": "offset", "count": "none"}, 1),
+        ({"mode": "offset", "page": 3, "per_page": 5}, 2),
+        # one probe query, no count by default
+        ({"mode": "cursor"}, 1),
+        ({"mode": "cursor", "count": "exact"}, 2),
+    ],
+)
+def test_list_books(client, params, budget):
+    with assert_max_queries(budget):
+        response = client.get("/books", params={"per_page": 10, **params})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    ("params", "budget"),
+    [
+        # filtered count + page
+        ({"mode": "offset"}, 2),
+        ({"mode": "offset", "count": "none"}, 1),
+        ({"mode": "cursor"}, 1),
+    ],
+)
+def test_search_books(client, params, budget):
+    book = client.get("/books", params={"count": "none"}).json()["books"][0]
+    search = {"q": book["title"].split()[0], "author": book["author"]}
+    with assert_max_queries(budget):
+        response = client.get("/books", params={**search, **params})
+    assert response.status_code == 200
+    assert book["id"] in [found["id"] for found in response.json()["books"]]
+
+
+def test_list_books_next_cursor_page(client):
+    first = client.get("/books", params={"mode": "cursor", "per_page": 10}).json()
+    with assert_max_queries(1):
+        response = client.get(first["next_page"])
+    assert response.status_code == 200
+    assert len(response.json()["books"]) == 10
+
+
+def test_list_books_count_is_cached(client):
+    client.get("/books")
+    with assert_max_queries(1):
+        client.get("/books", params={"page": 2})
+
+
+def test_get_book(client):
+    book_id = client.get("/books", params={"count": "none"}).json()["books"][0]["id"]
+    with assert_max_queries(1):
+        response = client.get(f"/books/{book_id}")
+    assert response.status_code == 200
+
+    # Served from the detail cache.
+    with assert_max_queries(0):
+        cached = client.get(f"/books/{book_id}")
+    assert cached.status_code == 200
+    with assert_max_queries(0):
+        not_modified = client.get(
+            f"/books/{book_id}", headers={"If-None-Match": cached.headers["ETag"]}
+        )
+    assert not_modified.status_code == 304
+
+
+def test_get_missing_book(client):
+    with assert_max_queries(1):
+        response = client.get(f"/books/{uuid.uuid4()}")
+    assert response.status_code == 404
@@ -0,0 +1,126 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from utils.rate_limit import (
+    Limit,
+    MemoryBucketStore,
+    SQLiteBucketStore,
+    rate_limiter,
+    refill,
+)
+
+# One token every 10 seconds, at most two in the bucket.
+LIMIT = Limit(per_minute=6, burst=2)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(
+        "utils.rate_limit.time", SimpleNamespace(monotonic=clock, time=clock)
+    )
+    return clock
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.mark.parametrize(
+    "tokens, elapsed, expected",
+    [
+        (2, 0, (1, 0.0)),
+        (0, 0, (0, 10.0)),
+        (0, 5, (0.5, 5.0)),
+        (0, 15, (0.5, 0.0)),
+        (0, 3600, (1, 0.0)),  # capped at burst
+        (0, -30, (0, 10.0)),  # a clock going backwards adds nothing
+    ],
+)
+def test_refill(tokens, elapsed, expected):
+    assert refill(tokens, 100.0, 100.0 + elapsed, LIMIT) == pytest.approx(expected)
+
+
+@pytest.mark.anyio
+async def test_memory_bucket_refills_over_time(clock):
+    store = MemoryBucketStore(shards=1)
+
+    assert [await store.take("k", LIMIT) for _ in range(3)] == [0.0, 0.0, 10.0]
+    clock.now += 4
+    assert await store.take("k", LIMIT) == pytest.approx(6.0)
+    clock.now += 6
+    assert await store.take("k", LIMIT) == 0.0
+    assert await store.take("k", LIMIT) == pytest.approx(10.0)
+
+
+@pytest.mark.anyio
+async def test_memory_store_evicts_least_recently_used(clock):
+    store = MemoryBucketStore(shards=1, max_keys=2)
+    for key in ("a", "a", "b"):
+        await store.take(key, LIMIT)
+    await store.take("a", LIMIT)  # "a" is empty and now the most recent
+    await store.take("c", LIMIT)
+
+    assert store.stats() == {"keys": 2, "evicted": 1}
+    assert await store.take("a", LIMIT) > 0  # kept its level
+    assert await store.take("b", LIMIT) == 0.0  # came back full
+    assert store.stats()["evicted"] == 2
+
+
+@pytest.mark.anyio
+async def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+
+    assert await first.take("k", LIMIT) == 0.0
+    assert await second.take("k", LIMIT) == 0.0
+    assert await first.take("k", LIMIT) > 0
+    assert first.stats()["keys"] == second.stats()["keys"] == 1
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "store", MemoryBucketStore())
+    monkeypatch.setattr(rate_limiter, "ip_limit", Limit(per_minute=60, burst=3))
+    monkeypatch.setattr(rate_limiter, "email_limit", Limit(per_minute=6, burst=1))
+
+
+def _login(client, email: str):
+    return client.post("/auth/login", json={"email": email, "password": "whatever"})
+
+
+def test_email_bucket_answers_429_with_retry_after(client, limited):
+    email = f"{uuid.uuid4().hex}@example.com"
+
+    assert _login(client, email).status_code == 404
+    response = _login(client, email)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
+    assert response.json()["detail"] == "Too many requests, try again later."
+
+
+def test_ip_bucket_is_shared_across_emails(client, limited):
+    statuses = [
+        _login(client, f"{uuid.uuid4().hex}@example.com").status_code for _ in range(4)
+    ]
+
+    assert statuses == [404, 404, 404, 429]
+    metrics = client.get("/metrics").text
+    assert 'rate_limit_throttled_total{scope="login",key="ip"}' in metrics
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from utils.storage import ImageUploadService, LocalFileSystemBackend
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return LocalFileSystemBackend(tmp_path / "media", "/media")
+
+
+def _upload(filename: str, content_type: str) -> UploadFile:
+    return UploadFile(
+        io.BytesIO(b"not really an image"),
+        filename=filename,
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+async def test_extension_comes_from_content_type(backend, tmp_path):
+    service = ImageUploadService(backend, max_bytes=1024, workers=1, timeout=5)
+    try:
+        url = await service.upload(
+            _upload("x./../../../escaped", "image/png"), "covers", [], "cover"
+        )
+    finally:
+        service.shutdown()
+
+    assert url.startswith("/media/covers/cover_") and url.endswith(".png")
+    assert [p.name for p in (tmp_path / "media" / "covers").iterdir()] == [url.rsplit("/", 1)[1]]
+    assert not (tmp_path / "escaped").exists()
+
+
+@pytest.mark.parametrize(
+    ("file_name", "folder"),
+    [("../escaped.png", "covers"), ("cover.png", "../elsewhere"), ("/tmp/cover.png", "covers")],
+)
+def test_local_backend_refuses_paths_outside_its_folder(backend, tmp_path, file_name, folder):
+    source = tmp_path / "source.png"
+    source.write_bytes(b"png")
+
+    with pytest.raises(ValueError):
+        backend.save(source, file_name, folder, [])
+
+    assert not (tmp_path / "escaped.png").exists()
+    assert not (tmp_path / "elsewhere").exists()
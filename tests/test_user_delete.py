@@ -0,0 +1,72 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from config.startup import ADMIN_EMAIL, ADMIN_PASSWORD
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    response = client.post(
+        "/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_deleting_user_releases_books_and_drops_tokens(client, admin_headers):
+    from config.session import SessionLocal
+    from models import Book, User, VerificationToken
+
+    with SessionLocal() as db:
+        user = User(email=f"{uuid.uuid4().hex}@example.com", password="x")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            [
+                Book(
+                    title=f"Owned {n}",
+                    author="Someone",
+                    price=1.0,
+                    published_date=date(2000, 1, 1),
+                    owner_id=user.id,
+                )
+                for n in range(2)
+            ]
+        )
+        db.add(
+            VerificationToken(
+                token_digest=uuid.uuid4().hex,
+                user_id=user.id,
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
+            )
+        )
+        db.commit()
+        user_id = user.id
+
+    response = client.delete(f"/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200
+
+    with SessionLocal() as db:
+        assert db.get(User, user_id) is None
+        assert db.scalars(select(Book.owner_id).where(Book.title.like("Owned %"))).all() == [
+            None,
+            None,
+        ]
+        assert (
+            db.scalars(
+                select(VerificationToken).where(VerificationToken.user_id == user_id)
+            ).all()
+            == []
+        )
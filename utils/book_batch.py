@@ -0,0 +1,73 @@
+"""
+Batch lookup for POST /books/batch-get.
+
+Ids already in `book_cache` are served from it; the rest are loaded with
+`WHERE id IN (...)`, split into chunks of BATCH_GET_QUERY_CHUNK so a single
+statement stays under SQLite's bound-parameter limit (999 on older builds),
+and put back into the cache. The response body is assembled from the
+cached JSON bodies, so found books are serialized at most once.
+"""
+
+import json
+import os
+import uuid
+from itertools import islice
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Book
+from utils.book_cache import CachedBook, book_cache, make_cached_book
+from utils.book_json import BOOK_COLUMNS
+
+load_dotenv()
+
+BATCH_GET_MAX_IDS = int(os.getenv("BATCH_GET_MAX_IDS", 200))
+BATCH_GET_QUERY_CHUNK = int(os.getenv("BATCH_GET_QUERY_CHUNK", 500))
+
+
+def _chunks(ids: list[uuid.UUID], size: int):
+    it = iter(ids)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+async def get_books_by_ids(
+    db: AsyncSession, ids: list[uuid.UUID]
+) -> tuple[list[CachedBook], list[uuid.UUID]]:
+    """Return (found books in request order, ids not found); duplicates are dropped."""
+    requested = list(dict.fromkeys(ids))
+
+    found: dict[uuid.UUID, CachedBook] = {}
+    missing = []
+    for book_id in requested:
+        cached = book_cache.get(book_id)
+        if cached is None:
+            missing.append(book_id)
+        else:
+            found[book_id] = cached
+
+    for chunk in _chunks(missing, BATCH_GET_QUERY_CHUNK):
+        books = await db.execute(select(*BOOK_COLUMNS).where(Book.id.in_(chunk)))
+        for book in books:
+            cached = make_cached_book(book)
+            book_cache.put(book.id, cached)
+            found[book.id] = cached
+
+    books = [found[book_id] for book_id in requested if book_id in found]
+    not_found = [book_id for book_id in requested if book_id not in found]
+    return books, not_found
+
+
+def render_batch(books: list[CachedBook], not_found: list[uuid.UUID]) -> bytes:
+    """Splice cached BookRead bodies into a BookBatchGetResponse document."""
+    return b"".join(
+        (
+            b'{"books":[',
+            b",".join(book.body for book in books),
+            b'],"not_found":',
+            json.dumps([str(book_id) for book_id in not_found]).encode("utf-8"),
+            b"}",
+        )
+    )
@@ -0,0 +1,99 @@
+"""
+Set-based bulk update/delete for PATCH /books/bulk and POST /books/bulk-delete.
+
+A filter becomes one UPDATE/DELETE ... WHERE statement. When it carries an
+id list, the ids are split into chunks of BULK_ID_CHUNK (one statement per
+chunk) to stay under SQLite's bound-parameter limit. All statements of a
+request run in one transaction. dry_run runs the matching COUNT(*) instead.
+"""
+
+import os
+from itertools import islice
+from typing import Any
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Book
+from schemas.book import BookFilter
+from utils.book_cache import book_cache
+from utils.book_count import book_counter
+
+load_dotenv()
+
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", 10_000))
+BULK_ID_CHUNK = int(os.getenv("BULK_ID_CHUNK", 500))
+
+
+def _criteria(book_filter: BookFilter) -> list:
+    criteria = []
+    if book_filter.author is not None:
+        criteria.append(Book.author == book_filter.author)
+    if book_filter.owner_id is not None:
+        criteria.append(Book.owner_id == book_filter.owner_id)
+    if book_filter.published_from is not None:
+        criteria.append(Book.published_date >= book_filter.published_from)
+    if book_filter.published_to is not None:
+        criteria.append(Book.published_date <= book_filter.published_to)
+    return criteria
+
+
+def _where_clauses(book_filter: BookFilter):
+    """Yield one WHERE clause list per statement to run."""
+    criteria = _criteria(book_filter)
+    if book_filter.ids is None:
+        yield criteria
+        return
+    ids = iter(dict.fromkeys(book_filter.ids))
+    while chunk := list(islice(ids, BULK_ID_CHUNK)):
+        yield [Book.id.in_(chunk), *criteria]
+
+
+async def count_matching(db: AsyncSession, book_filter: BookFilter) -> int:
+    matched = 0
+    for where in _where_clauses(book_filter):
+        matched += await db.scalar(select(func.count()).select_from(Book).where(*where))
+    return matched
+
+
+def _forget(book_filter: BookFilter) -> None:
+    if book_filter.ids is None:
+        book_cache.clear()
+    else:
+        for book_id in book_filter.ids:
+            book_cache.invalidate(book_id)
+
+
+async def bulk_update_books(
+    db: AsyncSession, book_filter: BookFilter, values: dict[str, Any]
+) -> int:
+    if "book_cover_image" in values:
+        # The variants were rendered from the old cover.
+        values = {**values, "book_cover_variants": None}
+    affected = 0
+    for where in _where_clauses(book_filter):
+        result = await db.execute(
+            update(Book)
+            .where(*where)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        affected += result.rowcount
+    await db.commit()
+    _forget(book_filter)
+    return affected
+
+
+async def bulk_delete_books(db: AsyncSession, book_filter: BookFilter) -> int:
+    affected = 0
+    for where in _where_clauses(book_filter):
+        result = await db.execute(
+            delete(Book).where(*where).execution_options(synchronize_session=False)
+        )
+        affected += result.rowcount
+    await db.commit()
+    _forget(book_filter)
+    book_counter.adjust(-affected)
+    return affected
+
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from utils.book_json import render_book
+from utils.ttl_cache import TTLCache
+
+load_dotenv()
+
+BOOK_CACHE_ENABLED = os.getenv("BOOK_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+BOOK_CACHE_TTL_SECONDS = float(os.getenv("BOOK_CACHE_TTL_SECONDS", 300))
+BOOK_CACHE_MAX_ENTRIES = int(os.getenv("BOOK_CACHE_MAX_ENTRIES", 10_000))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBook:
+    etag: str
+    body: bytes
+
+
+def make_cached_book(book) -> CachedBook:
+    body_bytes = render_book(book)
+    # updated_at alone is too coarse on SQLite (second resolution), so the
+    # body digest tells apart two writes within the same second.
+    version = int(book.updated_at.timestamp() * 1_000_000)
+    digest = hashlib.blake2b(body_bytes, digest_size=6).hexdigest()
+    return CachedBook(etag=f'"{version:x}-{digest}"', body=body_bytes)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches.
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+# Serialized BookRead bodies keyed by book id. update_book, delete_book and
+# anything that rewrites books in bulk must invalidate or clear it.
+book_cache: TTLCache[uuid.UUID, CachedBook] = TTLCache(
+    max_entries=BOOK_CACHE_MAX_ENTRIES,
+    ttl=BOOK_CACHE_TTL_SECONDS,
+    enabled=BOOK_CACHE_ENABLED,
+)
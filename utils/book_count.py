@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Book, RowCount
+
+load_dotenv()
+
+BOOK_COUNT_TTL_SECONDS = float(os.getenv("BOOK_COUNT_TTL_SECONDS", 60))
+
+
+class BookCountProvider:
+    """
+    Process-local book counts for the listing endpoint.
+
+    exact    -> COUNT(*) once, then kept current by `adjust` from the write
+                routes; re-synced after `ttl` seconds so writes made by other
+                workers are picked up.
+    estimate -> planner statistics on Postgres (pg_class.reltuples) or the
+                trigger-maintained counter row on SQLite, cached for `ttl`.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._exact: int | None = None
+        self._exact_at = 0.0
+        self._estimate: int | None = None
+        self._estimate_at = 0.0
+
+    async def exact(self, db: AsyncSession) -> int:
+        with self._lock:
+            if self._exact is not None and not self._expired(self._exact_at):
+                return self._exact
+
+        total = await db.scalar(select(func.count()).select_from(Book)) or 0
+        with self._lock:
+            self._exact, self._exact_at = total, time.monotonic()
+        return total
+
+    async def estimate(self, db: AsyncSession) -> int:
+        with self._lock:
+            if self._estimate is not None and not self._expired(self._estimate_at):
+                return self._estimate
+
+        total = await self._read_estimate(db)
+        with self._lock:
+            self._estimate, self._estimate_at = total, time.monotonic()
+        return total
+
+    def adjust(self, delta: int) -> None:
+        """Apply a committed insert/delete delta to the cached counts."""
+        if not delta:
+            return
+        with self._lock:
+            if self._exact is not None:
+                self._exact = max(self._exact + delta, 0)
+            if self._estimate is not None:
+                self._estimate = max(self._estimate + delta, 0)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._exact = None
+            self._estimate = None
+
+    def _expired(self, cached_at: float) -> bool:
+        return time.monotonic() - cached_at > self.ttl
+
+    async def _read_estimate(self, db: AsyncSession) -> int:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            reltuples = await db.scalar(
+                text("SELECT reltuples FROM pg_class WHERE oid = 'books'::regclass")
+            )
+            # -1 means the table has never been vacuumed/analyzed.
+            if reltuples is not None and reltuples >= 0:
+                return int(reltuples)
+        elif dialect == "sqlite":
+            row_count = await db.scalar(
+                select(RowCount.row_count).where(RowCount.table_name == "books")
+            )
+            if row_count is not None:
+                return row_count
+        return await self.exact(db)
+
+
+book_counter = BookCountProvider(ttl=BOOK_COUNT_TTL_SECONDS)
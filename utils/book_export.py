@@ -0,0 +1,93 @@
+"""
+Streaming catalog export for GET /books/export.
+
+Rows are read as plain column tuples (no ORM objects) through a streamed
+result with `yield_per`, so Postgres uses a server-side cursor and memory
+stays flat whatever the catalog size. Every batch is encoded and handed to
+the StreamingResponse as soon as it arrives.
+
+The CSV header starts with the columns POST /books/upload requires, so an
+export can be uploaded again as-is; the extra columns are ignored there.
+"""
+
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator, Literal
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from config.session import AsyncSessionLocal
+from models import Book
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_COLUMNS = [
+    Book.title,
+    Book.author,
+    Book.price,
+    Book.book_cover_image,
+    Book.published_date,
+    Book.id,
+    Book.owner_id,
+    Book.created_at,
+    Book.updated_at,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_csv(rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_text(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows) -> bytes:
+    lines = []
+    for row in rows:
+        record = {
+            field: value if value is None or isinstance(value, float) else _text(value)
+            for field, value in zip(EXPORT_FIELDS, row)
+        }
+        lines.append(json.dumps(record, separators=(",", ":")))
+    return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+
+async def stream_books(
+    export_format: ExportFormat, batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[bytes]:
+    # Owns its session: yield dependencies are closed before a streaming
+    # body starts, so the request-scoped session can't be used here.
+    async with AsyncSessionLocal() as db:
+        if export_format == "csv":
+            yield _encode_csv([], header=True)
+
+        result = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .order_by(Book.created_at, Book.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            if export_format == "csv":
+                yield _encode_csv(rows, header=False)
+            else:
+                yield _encode_ndjson(rows)
@@ -0,0 +1,34 @@
+"""
+Fast JSON rendering for book responses.
+
+GET /books and GET /books/{id} select BOOK_COLUMNS as plain rows (no ORM
+identity map or attribute instrumentation), validate them once with a
+prebuilt TypeAdapter and encode straight to bytes with pydantic-core's
+serializer. The routes return those bytes in a Response, so FastAPI skips
+its own response_model validation and jsonable_encoder/json.dumps pass;
+response_model is kept only for the OpenAPI schema.
+"""
+
+from pydantic import TypeAdapter
+
+from models import Book
+from schemas.book import BookRead, PaginatedBookList
+
+BOOK_FIELDS = tuple(BookRead.model_fields)
+BOOK_COLUMNS = tuple(getattr(Book, name) for name in BOOK_FIELDS)
+
+book_list_adapter = TypeAdapter(list[BookRead])
+_page_serializer = PaginatedBookList.__pydantic_serializer__
+
+
+def render_book(row) -> bytes:
+    """Serialize one row of BOOK_COLUMNS as a BookRead body."""
+    book = BookRead.model_validate(dict(zip(BOOK_FIELDS, row)))
+    return book.__pydantic_serializer__.to_json(book)
+
+
+def render_book_page(rows, **page) -> bytes:
+    """Serialize a PaginatedBookList; `page` holds every field except books."""
+    # Validating dicts is several times faster than from_attributes on Row.
+    books = book_list_adapter.validate_python([dict(zip(BOOK_FIELDS, row)) for row in rows])
+    return _page_serializer.to_json(PaginatedBookList.model_construct(books=books, **page))
@@ -0,0 +1,116 @@
+"""
+Indexed search for the book listing.
+
+    SQLite   -> FTS5 table `books_fts` (external content, trigger-synced,
+                keyed on books.search_rowid), ranked by bm25
+    Postgres -> GIN index on a `simple` tsvector of title + author, ranked by
+                ts_rank; trigram GIN indexes back the title/author substring
+                filters
+
+The index DDL lives next to the model in models/book.py.
+"""
+
+import re
+
+from sqlalchemy import Select, column, func, literal_column, or_, table
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import Book
+
+MAX_TERMS = 8
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Must stay textually identical to the expression indexed by ix_books_search
+# so the planner can use it; bound parameters would hide the match on asyncpg.
+PG_SEARCH_VECTOR = literal_column(
+    "to_tsvector('simple', coalesce(books.title, '') || ' ' || coalesce(books.author, ''))"
+)
+
+books_fts = table("books_fts", column("rowid"), column("rank"))
+
+
+def _tokens(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return _TOKEN.findall(value.lower())[:MAX_TERMS]
+
+
+def _like_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def has_search(q: str | None, author: str | None, title: str | None) -> bool:
+    return bool(_tokens(q) or _tokens(author) or _tokens(title))
+
+
+def apply_search(
+    query: Select,
+    dialect_name: str,
+    q: str | None = None,
+    author: str | None = None,
+    title: str | None = None,
+) -> tuple[Select, list[ColumnElement]]:
+    """Filter `query` and return it with the relevance ordering to apply."""
+    if not has_search(q, author, title):
+        return query, []
+    if dialect_name == "sqlite":
+        return _apply_fts5(query, q, author, title)
+    if dialect_name == "postgresql":
+        return _apply_postgres(query, q, author, title)
+    return _apply_like(query, q, author, title), []
+
+
+def _apply_fts5(query, q, author, title):
+    # Every term is quoted (no FTS5 operators leak in from user input) and
+    # prefix-matched; column filters scope author/title terms.
+    terms = [f'"{token}"*' for token in _tokens(q)]
+    terms += [f'title:"{token}"*' for token in _tokens(title)]
+    terms += [f'author:"{token}"*' for token in _tokens(author)]
+
+    query = query.join(books_fts, books_fts.c.rowid == Book.search_rowid).where(
+        literal_column("books_fts").op("MATCH")(" AND ".join(terms))
+    )
+    return query, [books_fts.c.rank]
+
+
+def _apply_postgres(query, q, author, title):
+    ordering: list[ColumnElement] = []
+
+    q_tokens = _tokens(q)
+    if q_tokens:
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{t}:*" for t in q_tokens)
+        )
+        query = query.where(PG_SEARCH_VECTOR.op("@@")(ts_query))
+        ordering.append(func.ts_rank(PG_SEARCH_VECTOR, ts_query).desc())
+
+    if title and title.strip():
+        query = query.where(Book.title.ilike(_like_pattern(title.strip()), escape="\\"))
+        ordering.append(func.similarity(Book.title, title.strip()).desc())
+    if author and author.strip():
+        query = query.where(
+            Book.author.ilike(_like_pattern(author.strip()), escape="\\")
+        )
+        ordering.append(func.similarity(Book.author, author.strip()).desc())
+
+    return query, ordering
+
+
+def _apply_like(query, q, author, title):
+    if q and q.strip():
+        pattern = _like_pattern(q.strip())
+        query = query.where(
+            or_(
+                Book.title.ilike(pattern, escape="\\"),
+                Book.author.ilike(pattern, escape="\\"),
+            )
+        )
+    if title and title.strip():
+        query = query.where(Book.title.ilike(_like_pattern(title.strip()), escape="\\"))
+    if author and author.strip():
+        query = query.where(
+            Book.author.ilike(_like_pattern(author.strip()), escape="\\")
+        )
+    return query
@@ -0,0 +1,184 @@
+"""
+Streaming CSV ingestion for POST /books/upload.
+
+The upload is read through a text wrapper over the spooled upload file, so
+only the current chunk of rows is held in memory. Each chunk is read and
+validated with BookCreate in a worker thread, then written with one
+multi-row INSERT ... RETURNING on the async session.
+
+Commit policies:
+    chunk -> commit after every chunk; a failing chunk is rolled back and
+             reported, earlier chunks stay committed
+    all   -> a single commit at the end; any failing chunk aborts the upload
+"""
+
+import csv
+import io
+import os
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Literal
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Book
+from schemas.book import BookCreate
+from utils.book_count import book_counter
+
+load_dotenv()
+
+CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", 1000))
+# Skipped rows are always counted; only this many are described in detail.
+CSV_MAX_REPORTED_ERRORS = int(os.getenv("CSV_MAX_REPORTED_ERRORS", 1000))
+
+REQUIRED_FIELDS = {"title", "author", "price", "published_date"}
+
+CommitPolicy = Literal["chunk", "all"]
+
+
+def _parse_row(row: dict[str, str | None], owner_id: uuid.UUID) -> dict[str, Any]:
+    if None in row:
+        raise ValueError("Row has more values than the header.")
+    cover = (row.get("book_cover_image") or "").strip()
+    book_data = BookCreate(
+        title=(row["title"] or "").strip(),
+        author=(row["author"] or "").strip(),
+        price=float((row["price"] or "").strip()),
+        book_cover_image=cover,
+        published_date=datetime.strptime(
+            (row["published_date"] or "").strip(), "%Y-%m-%d"
+        ).date(),
+        owner_id=owner_id,
+    )
+    return book_data.model_dump()
+
+
+def _numbered_rows(reader: csv.DictReader):
+    """
+    Yield (line number the record starts on, row), or (line, csv.Error) for
+    a record the csv module can't parse, e.g. a field over the size limit.
+    """
+    while True:
+        # DictReader.line_num isn't updated when a record raises.
+        line = reader.reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            if reader.reader.line_num < line:
+                raise  # nothing was consumed; reading on would loop
+            yield line, e
+            continue
+        yield line, row
+
+
+def _read_chunk(rows, chunk_size: int, owner_id: uuid.UUID):
+    """Read and validate up to `chunk_size` records (blocking)."""
+    values: list[dict[str, Any]] = []
+    invalid: list[tuple[int, str]] = []
+    lines: list[int] = []
+    for line, row in islice(rows, chunk_size):
+        lines.append(line)
+        if isinstance(row, csv.Error):
+            invalid.append((line, f"Malformed CSV: {row}"))
+            continue
+        try:
+            values.append(_parse_row(row, owner_id))
+        except Exception as e:
+            invalid.append((line, str(e)))
+    return values, invalid, lines
+
+
+async def ingest_books_csv(
+    db: AsyncSession,
+    raw_file: BinaryIO,
+    owner_id: uuid.UUID,
+    chunk_size: int = CSV_CHUNK_SIZE,
+    commit_policy: CommitPolicy = "chunk",
+) -> dict[str, Any]:
+    text_file = io.TextIOWrapper(raw_file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text_file)
+    try:
+        return await _ingest(db, reader, owner_id, chunk_size, commit_policy)
+    except UnicodeDecodeError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV file must be UTF-8 encoded.",
+        )
+    except csv.Error as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed CSV at line {reader.reader.line_num}: {e}",
+        )
+    finally:
+        # Leave the underlying upload file open for Starlette to clean up.
+        text_file.detach()
+
+
+async def _ingest(db, reader, owner_id, chunk_size, commit_policy):
+    fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+    missing_fields = REQUIRED_FIELDS - set(fieldnames or [])
+    if missing_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns: {', '.join(sorted(missing_fields))}",
+        )
+
+    inserted_count = 0
+    skipped_count = 0
+    errors: list[dict[str, Any]] = []
+
+    def report(line: int, error: str) -> None:
+        if len(errors) < CSV_MAX_REPORTED_ERRORS:
+            errors.append({"row": line, "error": error})
+
+    rows = _numbered_rows(reader)
+    while True:
+        values, invalid, lines = await run_in_threadpool(
+            _read_chunk, rows, chunk_size, owner_id
+        )
+        if not lines:
+            break
+        skipped_count += len(invalid)
+        for line, error in invalid:
+            report(line, error)
+        if not values:
+            continue
+
+        try:
+            result = await db.execute(insert(Book).returning(Book.id), values)
+            written = len(result.all())
+            if commit_policy == "chunk":
+                await db.commit()
+                book_counter.adjust(written)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            if commit_policy == "all":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Upload aborted at rows {lines[0]}-{lines[-1]}: "
+                    f"{e.__class__.__name__}. Nothing was inserted.",
+                )
+            skipped_count += len(values)
+            report(
+                lines[0],
+                f"Rows {lines[0]}-{lines[-1]} were not inserted: "
+                f"{e.__class__.__name__}",
+            )
+            continue
+        inserted_count += written
+
+    if commit_policy == "all":
+        await db.commit()
+        book_counter.adjust(inserted_count)
+
+    return {"inserted": inserted_count, "skipped": skipped_count, "errors": errors}
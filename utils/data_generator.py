@@ -0,0 +1,226 @@
+"""
+Seeded, streaming generator for realistic users and books.
+
+The same seed and config always produce the same rows, and rows are
+produced one at a time, so millions can be written to a file or inserted
+in batches in constant memory:
+
+    config = GeneratorConfig(seed=7, faults=FaultRates(price=0.01))
+    write_csv(generate_books(config, 1_000_000), "books.csv")
+
+    config = GeneratorConfig(seed=7)
+    write_db(sync_engine, config, books=1_000_000, users=10_000)
+
+Authors follow a Zipf distribution over `authors` names (a few prolific
+authors, a long tail), like a real catalog. Fault rates are per column
+probabilities of writing a value POST /books/upload rejects (too long,
+malformed number or date), for exercising its error reporting; `write_db` only accepts
+fault-free configs.
+"""
+
+import csv
+import json
+import random
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+TITLE_WORDS = (
+    "deep shadow garden river silent empire winter glass hidden final "
+    "golden stone letters night ocean forgotten wild city paper storm "
+    "last little house broken light secret summer iron bright northern "
+    "fire salt crown quiet long distant burning lost morning road"
+).split()
+FIRST_NAMES = (
+    "anna ben carla david elena frank grace hiro ines jonas kira liam "
+    "maya noah olga pablo quinn rosa sam tara umar vera will yuki zoe"
+).split()
+SURNAMES = (
+    "newport clear ries kahneman covey sinek duckworth duhigg eyal pink "
+    "morrison atwood ishiguro tolkien austen orwell le-guin murakami"
+).split()
+
+BOOK_COLUMNS = ["title", "author", "price", "book_cover_image", "published_date"]
+# Shared by every generated user; bcrypt per row would dominate generation.
+USER_PASSWORD = "password123"
+
+
+@dataclass
+class FaultRates:
+    """Probability, per row, that each column gets an invalid value."""
+
+    title: float = 0.0
+    author: float = 0.0
+    price: float = 0.0
+    published_date: float = 0.0
+
+    @classmethod
+    def uniform(cls, rate: float) -> "FaultRates":
+        return cls(title=rate, author=rate, price=rate, published_date=rate)
+
+    def any(self) -> bool:
+        return any(rate > 0 for rate in vars(self).values())
+
+
+@dataclass
+class GeneratorConfig:
+    seed: int = 42
+    authors: int = 5000
+    # Zipf exponent: 0 is uniform, ~1 is typical of real catalogs.
+    author_skew: float = 1.0
+    price_min: float = 2.0
+    price_max: float = 120.0
+    date_min: date = date(1900, 1, 1)
+    date_max: date = date(2025, 12, 31)
+    cover_rate: float = 0.7
+    faults: FaultRates = field(default_factory=FaultRates)
+
+
+def _author_name(rank: int) -> str:
+    last = SURNAMES[rank % len(SURNAMES)]
+    first = FIRST_NAMES[(rank // len(SURNAMES)) % len(FIRST_NAMES)]
+    generation = rank // (len(FIRST_NAMES) * len(SURNAMES))
+    name = f"{first.title()} {last.title()}"
+    return f"{name} {generation + 1}" if generation else name
+
+
+class _AuthorSampler:
+    def __init__(self, authors: int, skew: float):
+        self.cdf = list(accumulate(1 / (rank**skew) for rank in range(1, authors + 1)))
+
+    def __call__(self, rng: random.Random) -> str:
+        return _author_name(bisect_left(self.cdf, rng.random() * self.cdf[-1]))
+
+
+def _random_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+# Values POST /books/upload rejects, per column.
+FAULTY_VALUES = {
+    "title": ["x" * 121, "Title " * 30],
+    "author": ["y" * 81, "Author " * 20],
+    "price": ["abc", "", "12,50"],
+    "published_date": ["not_a_date", "2020-13-45", "", "31/12/2020"],
+}
+
+
+def generate_books(
+    config: GeneratorConfig, count: int | None = None, owner_ids: list[uuid.UUID] | None = None
+) -> Iterator[dict]:
+    """Yield `count` book rows (forever when None) with BOOK_COLUMNS plus `id`/`owner_id`."""
+    rng = random.Random(config.seed)
+    pick_author = _AuthorSampler(config.authors, config.author_skew)
+    days = (config.date_max - config.date_min).days
+    faults = vars(config.faults)
+    check_faults = config.faults.any()
+
+    n = 0
+    while count is None or n < count:
+        words = rng.sample(TITLE_WORDS, rng.randint(2, 4))
+        book = {
+            "id": _random_uuid(rng),
+            "title": " ".join(word.title() for word in words),
+            "author": pick_author(rng),
+            "price": round(rng.uniform(config.price_min, config.price_max), 2),
+            "book_cover_image": (
+                f"https://example.com/covers/{n}.jpg"
+                if rng.random() < config.cover_rate
+                else ""
+            ),
+            "published_date": config.date_min + timedelta(days=rng.randrange(days + 1)),
+            "owner_id": rng.choice(owner_ids) if owner_ids else None,
+        }
+        if check_faults:
+            for column, rate in faults.items():
+                if rate and rng.random() < rate:
+                    book[column] = rng.choice(FAULTY_VALUES[column])
+        yield book
+        n += 1
+
+
+def generate_users(config: GeneratorConfig, count: int) -> Iterator[dict]:
+    """Yield `count` verified users; every one has the password USER_PASSWORD."""
+    rng = random.Random(f"{config.seed}-users")
+    for n in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(SURNAMES)
+        yield {
+            "id": _random_uuid(rng),
+            "email": f"{first}.{last}.{n}@example.com",
+            "role": "user",
+            "is_verified": True,
+        }
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def write_csv(books: Iterable[dict], path: str | Path) -> int:
+    """Write books in the POST /books/upload format; returns the row count."""
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(BOOK_COLUMNS)
+        for book in books:
+            writer.writerow([_text(book[column]) for column in BOOK_COLUMNS])
+            written += 1
+    return written
+
+
+def write_ndjson(books: Iterable[dict], path: str | Path) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8") as ndjson_file:
+        for book in books:
+            record = {column: book[column] for column in BOOK_COLUMNS}
+            record["published_date"] = _text(record["published_date"])
+            ndjson_file.write(json.dumps(record) + "\n")
+            written += 1
+    return written
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(rows)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def write_db(
+    engine, config: GeneratorConfig, books: int, users: int = 0, batch_size: int = 10_000
+) -> list[uuid.UUID]:
+    """
+    Insert `users` then `books` through a sync engine, one transaction per
+    batch. Books are owned by the generated users (none when users=0).
+    Returns the user ids.
+    """
+    from sqlalchemy import insert
+
+    from models import Book, User
+    from utils.hashing import hash
+
+    if config.faults.any():
+        raise ValueError("write_db needs a config without fault rates")
+
+    user_ids: list[uuid.UUID] = []
+    if users:
+        password = hash(USER_PASSWORD)
+        for batch in _batches(generate_users(config, users), batch_size):
+            for user in batch:
+                user["password"] = password
+            with engine.begin() as conn:
+                conn.execute(insert(User), batch)
+            user_ids.extend(user["id"] for user in batch)
+
+    for batch in _batches(generate_books(config, books, user_ids or None), batch_size):
+        with engine.begin() as conn:
+            conn.execute(insert(Book), batch)
+    return user_ids
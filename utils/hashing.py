@@ -1,12 +1,35 @@
-from passlib.context import CryptContext
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import cache, partial
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+load_dotenv()
+
+
+@cache
+def pwd_context():
+    # Built on first use: passlib is only needed once somebody logs in.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+
+
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 1))
+# Submitted-but-unfinished hashes allowed before callers get a 503.
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", HASH_POOL_WORKERS * 8))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", 1))
 
 
 def hash(plain: str) -> str:
     if not plain:
         raise ValueError("Password cannot be empty.")
-    return pwd_context.hash(plain)
+    return pwd_context().hash(plain)
 
 
 def verify_hash(plain: str, hash: str) -> bool:
@@ -14,17 +37,139 @@ def verify_hash(plain: str, hash: str) -> bool:
         raise ValueError("Invalid hashing argument")
     if not hash:
         raise ValueError("Invalid hashing argument")
-    return pwd_context.verify(plain, hash)
+    return pwd_context().verify(plain, hash)
 
 
 def authenticate_user(
     plain_password: str, hashed_password: str
 ) -> tuple[bool, str | None]:
-    if not pwd_context.verify(plain_password, hashed_password):
+    if not pwd_context().verify(plain_password, hashed_password):
         return False, None
 
-    if pwd_context.needs_update(hashed_password):
-        new_hash = pwd_context.hash(plain_password)
+    if pwd_context().needs_update(hashed_password):
+        new_hash = pwd_context().hash(plain_password)
         return True, new_hash
 
     return True, None
+
+
+class HashingPool:
+    """
+    Runs bcrypt in a process pool so it neither blocks the event loop nor
+    contends for the GIL. Admission is bounded: once `max_pending` jobs are
+    queued or running, new calls fail fast with 503 + Retry-After instead of
+    piling up behind the workers.
+
+    A job counts as pending until the pool is done with it, not until its
+    caller stops waiting: a cancelled request (client gone, timeout) only
+    drops its job if no worker has picked it up yet. The counters are also
+    updated from the executor's callback thread, hence the lock.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: workers only import this module, and forking a process
+            # that already runs threads (anyio, aiosqlite) is unsafe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        # Only the event loop thread adds to `pending`, so the check above
+        # can't be overtaken; callbacks only lower it.
+        with self._lock:
+            self.pending += 1
+        started = time.perf_counter()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(partial(self._job_done, started))
+        try:
+            # Cancelling the wrapper also cancels the job if it hasn't started.
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            with self._lock:
+                self.cancelled += 1
+            raise
+
+    def _job_done(self, started: float, future: Future) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                return
+            self.completed += 1
+            self.seconds_total += elapsed
+            self.seconds_max = max(self.seconds_max, elapsed)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+            "latency_seconds_total": self.seconds_total,
+            "latency_seconds_max": self.seconds_max,
+            "latency_seconds_avg": (
+                self.seconds_total / self.completed if self.completed else 0.0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool(
+    workers=HASH_POOL_WORKERS,
+    max_pending=HASH_POOL_MAX_PENDING,
+    retry_after=HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def hash_async(plain: str) -> str:
+    if not plain:
+        raise ValueError("Password cannot be empty.")
+    return await hashing_pool.run(hash, plain)
+
+
+async def verify_hash_async(plain: str, hash: str) -> bool:
+    if not plain or not hash:
+        raise ValueError("Invalid hashing argument")
+    return await hashing_pool.run(verify_hash, plain, hash)
+
+
+async def authenticate_user_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify and, when the hash is outdated, rehash in one pool round trip."""
+    return await hashing_pool.run(authenticate_user, plain_password, hashed_password)
@@ -0,0 +1,186 @@
+"""
+Resized cover variants, rendered in a process pool.
+
+`render_variants` runs in a worker process: it decodes the upload once and
+writes every size in IMAGE_VARIANT_SIZES (largest first, each resized from
+the previous one) as WebP and in the upload's own format. JPEG sources are
+decoded with `draft()`, letting libjpeg scale down by up to 8x while it
+decodes, so a phone photo never has to be expanded to full resolution.
+
+This module only imports Pillow inside the worker, so spawned workers stay
+light. With IMAGE_VARIANTS_ENABLED=false covers are stored as uploaded
+(utils/storage.py).
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def parse_sizes(spec: str) -> tuple[tuple[str, int], ...]:
+    """Parse "thumb:160,medium:480" into (name, longest edge) pairs, largest first."""
+    sizes = []
+    for item in spec.split(","):
+        name, _, edge = item.strip().partition(":")
+        sizes.append((name, int(edge)))
+    return tuple(sorted(sizes, key=lambda size: size[1], reverse=True))
+
+
+IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Longest edge in pixels per variant; the largest one becomes book_cover_image.
+IMAGE_VARIANT_SIZES = parse_sizes(
+    os.getenv("IMAGE_VARIANT_SIZES", "thumb:160,medium:480,full:1600")
+)
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", min(os.cpu_count() or 1, 4)))
+IMAGE_VARIANT_TIMEOUT_SECONDS = float(os.getenv("IMAGE_VARIANT_TIMEOUT_SECONDS", 30))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", 80))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", 85))
+# Larger images are rejected before they are decoded (decompression bombs).
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 50_000_000))
+
+# Pillow format name -> (variant key, file extension) for the "original" copy.
+ORIGINAL_FORMATS = {
+    "JPEG": ("jpeg", "jpg"),
+    "PNG": ("png", "png"),
+    "WEBP": ("webp", "webp"),
+    "GIF": ("gif", "gif"),
+}
+
+
+def variants_enabled() -> bool:
+    return IMAGE_VARIANTS_ENABLED
+
+
+def render_variants(
+    source: str,
+    out_dir: str,
+    sizes: tuple[tuple[str, int], ...] = IMAGE_VARIANT_SIZES,
+    webp_quality: int = IMAGE_WEBP_QUALITY,
+    jpeg_quality: int = IMAGE_JPEG_QUALITY,
+    max_pixels: int = IMAGE_MAX_PIXELS,
+) -> dict:
+    """
+    Write the variants of `source` into `out_dir`. Returns
+    {"files": [(size, key, path), ...], "timings": {stage: seconds}}, with
+    key "webp" or the original format's key. Raises ValueError for anything
+    that is not a readable image within max_pixels.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    timings = {"decode": 0.0, "resize": 0.0, "encode": 0.0}
+
+    started = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            with Image.open(source) as opened:
+                original = ORIGINAL_FORMATS.get(opened.format, ORIGINAL_FORMATS["PNG"])
+                scale = sizes[0][1] / max(opened.size)
+                if scale < 1:
+                    # JPEG only: decode at the smallest 1/2^n scale that still
+                    # covers the largest variant.
+                    opened.draft(
+                        "RGB",
+                        (math.ceil(opened.width * scale), math.ceil(opened.height * scale)),
+                    )
+                # Returns a decoded copy, upright per the EXIF orientation.
+                image = ImageOps.exif_transpose(opened)
+    except (OSError, Image.DecompressionBombError, Image.DecompressionBombWarning) as e:
+        raise ValueError(f"Unreadable image: {e}") from None
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.mode or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    timings["decode"] = time.perf_counter() - started
+
+    files = []
+    current = image
+    for name, edge in sizes:
+        started = time.perf_counter()
+        if max(current.size) > edge:
+            current = current.copy()
+            current.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        timings["resize"] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        webp_path = os.path.join(out_dir, f"{name}.webp")
+        current.save(webp_path, "WEBP", quality=webp_quality, method=4)
+        files.append((name, "webp", webp_path))
+        key, ext = original
+        if key != "webp":
+            path = os.path.join(out_dir, f"{name}.{ext}")
+            if key == "jpeg":
+                rgb = current if current.mode == "RGB" else current.convert("RGB")
+                rgb.save(path, "JPEG", quality=jpeg_quality, optimize=True, progressive=True)
+            else:
+                current.save(path, key.upper(), optimize=True)
+            files.append((name, key, path))
+        timings["encode"] += time.perf_counter() - started
+
+    return {"files": files, "timings": timings}
+
+
+class VariantPool:
+    """
+    Process pool for `render_variants`, created on first use with spawn
+    (forking a process that runs threads is unsafe; see HashingPool).
+    Only touched from the event loop thread.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def render(self, source: str, out_dir: str) -> dict:
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(), render_variants, source, out_dir
+            )
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+variant_pool = VariantPool(IMAGE_VARIANT_WORKERS)
@@ -1,55 +1,42 @@
-from imagekitio import ImageKit
 import os
-import base64
+from pathlib import Path
 from dotenv import load_dotenv
-from fastapi import UploadFile, HTTPException, status
-import uuid
-from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
+
+from utils.storage import StorageBackend
 
 load_dotenv()
 
-imageKit = ImageKit(
-    private_key=os.getenv("IMAGEKIT_PRIVATE_KEY"),
-    public_key=os.getenv("IMAGEKIT_PUBLIC_KEY"),
-    url_endpoint=os.getenv("IMAGEKIT_URL_ENDPOINT"),
-)
-
-
-async def upload_profile_img(profile_img: UploadFile) -> str | None:
-    if not profile_img or not profile_img.filename:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="No image provided."
-        )
-
-    if profile_img.content_type not in [
-        "image/jpeg",
-        "image/png",
-        "image/webp",
-        "image/gif",
-    ]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image format."
-        )
-
-    image_content = await profile_img.read()
-
-    if not image_content:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-    file_b64 = base64.b64encode(image_content).decode("utf-8")
-
-    ext = profile_img.filename.rsplit(".", 1)[-1].lower()
-    image_name = f"profile_{uuid.uuid4().hex}.{ext}"
-
-    try:
-        result = imageKit.upload_file(
-            file=file_b64,
-            file_name=image_name,
-            options=UploadFileRequestOptions(
-                tags=["users", "profiles"],
-                folder="users/profile",
-                response_fields=["is_private_file", "tags"],
-            ),
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
-    return result.url
+
+class ImageKitBackend(StorageBackend):
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # imagekitio is slow to import; load it with the first upload.
+            from imagekitio import ImageKit
+
+            self._client = ImageKit(
+                private_key=os.getenv("IMAGEKIT_PRIVATE_KEY"),
+                public_key=os.getenv("IMAGEKIT_PUBLIC_KEY"),
+                url_endpoint=os.getenv("IMAGEKIT_URL_ENDPOINT"),
+            )
+        return self._client
+
+    def save(self, path: Path, file_name: str, folder: str, tags: list[str]) -> str:
+        from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
+
+        # Passing an open binary file lets the SDK send it as multipart
+        # instead of a base64 string (~33% larger).
+        with open(path, "rb") as image_file:
+            result = self.client.upload_file(
+                file=image_file,
+                file_name=file_name,
+                options=UploadFileRequestOptions(
+                    tags=tags,
+                    folder=folder,
+                    response_fields=["is_private_file", "tags"],
+                ),
+            )
+        return result.url
@@ -0,0 +1,440 @@
+"""
+Persistent outbox for outgoing mail.
+
+Routes call `enqueue_mail` inside their own transaction, so a message is
+stored exactly when the change that triggered it commits, and it survives a
+restart. `outbox_worker`, started in main.py's lifespan, drains the table:
+
+- Due messages are claimed in batches of MAIL_OUTBOX_BATCH_SIZE by pushing
+  their next_attempt_at forward by MAIL_OUTBOX_LEASE_SECONDS (UPDATE ...
+  RETURNING, with SKIP LOCKED on PostgreSQL). Several app workers can drain
+  the same table, and a batch whose worker died is picked up again once the
+  lease runs out, so delivery is at-least-once.
+- Sends go through one pooled SMTP connection (`PooledSMTP`) that is kept
+  open across batches and closed after MAIL_SMTP_IDLE_SECONDS.
+- A failed send is retried after MAIL_OUTBOX_BACKOFF_SECONDS, doubling per
+  attempt up to MAIL_OUTBOX_BACKOFF_MAX_SECONDS, until
+  MAIL_OUTBOX_MAX_ATTEMPTS. A 5xx reply fails the message at once.
+- Bodies carry live verification links, so a message's body is cleared as
+  soon as it is sent or fails. Every MAIL_OUTBOX_PURGE_INTERVAL_SECONDS,
+  messages still pending MAIL_OUTBOX_MAX_PENDING_SECONDS after they were
+  queued are failed (and cleared) too, and finished rows are deleted
+  MAIL_OUTBOX_RETENTION_SECONDS after they were queued.
+
+`outbox_worker.stats()` (queue depth, oldest pending message, outcomes,
+SMTP connections) and the `mail_outbox_send_seconds` histogram are exported
+by GET /metrics. aiosmtplib is imported where it is used, so it adds nothing
+to startup until the first message goes out.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.session import AsyncSessionLocal
+from models import OutboxMessage
+from utils import smtp_config
+from utils.metrics import Histogram
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MAIL_OUTBOX_WORKER_ENABLED = os.getenv("MAIL_OUTBOX_WORKER_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", 50))
+MAIL_OUTBOX_POLL_SECONDS = float(os.getenv("MAIL_OUTBOX_POLL_SECONDS", 5))
+MAIL_OUTBOX_LEASE_SECONDS = float(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", 300))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", 6))
+MAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv("MAIL_OUTBOX_BACKOFF_SECONDS", 30))
+MAIL_OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("MAIL_OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+MAIL_SMTP_IDLE_SECONDS = float(os.getenv("MAIL_SMTP_IDLE_SECONDS", 60))
+MAIL_OUTBOX_MAX_PENDING_SECONDS = float(os.getenv("MAIL_OUTBOX_MAX_PENDING_SECONDS", 86400))
+MAIL_OUTBOX_RETENTION_SECONDS = float(os.getenv("MAIL_OUTBOX_RETENTION_SECONDS", 7 * 86400))
+MAIL_OUTBOX_PURGE_INTERVAL_SECONDS = float(os.getenv("MAIL_OUTBOX_PURGE_INTERVAL_SECONDS", 600))
+# How long shutdown waits for the batch in flight.
+MAIL_OUTBOX_STOP_TIMEOUT_SECONDS = float(os.getenv("MAIL_OUTBOX_STOP_TIMEOUT_SECONDS", 10))
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+mail_send_duration = Histogram(
+    "mail_outbox_send_seconds",
+    "Time to hand one message to the SMTP server, by outcome.",
+    ("outcome",),
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_mail(
+    db: AsyncSession, recipient: str, subject: str, body: str, subtype: str = "html"
+) -> OutboxMessage:
+    """
+    Add a message to the outbox in the caller's transaction. Call
+    `outbox_worker.wake()` after the commit to send it without waiting for
+    the next poll.
+    """
+    message = OutboxMessage(
+        recipient=recipient, subject=subject, body=body, subtype=subtype
+    )
+    db.add(message)
+    return message
+
+
+def build_email(row) -> EmailMessage:
+    email = EmailMessage()
+    email["From"] = smtp_config.MAIL_FROM
+    email["To"] = row.recipient
+    email["Subject"] = row.subject
+    # Stable across retries, so receivers can drop a duplicate delivery.
+    domain = smtp_config.MAIL_FROM.rpartition("@")[2] or "localhost"
+    email["Message-ID"] = f"<{row.id.hex}@{domain}>"
+    email.set_content(row.body, subtype=row.subtype)
+    return email
+
+
+def is_connection_error(error: Exception) -> bool:
+    """True when the connection, not the message, is at fault."""
+    import aiosmtplib
+
+    return isinstance(
+        error,
+        (
+            aiosmtplib.SMTPServerDisconnected,
+            aiosmtplib.SMTPConnectError,
+            aiosmtplib.SMTPTimeoutError,
+            OSError,
+        ),
+    )
+
+
+def is_permanent(error: Exception) -> bool:
+    import aiosmtplib
+
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(refused.code >= 500 for refused in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+
+
+class PooledSMTP:
+    """One SMTP connection reused across messages and batches."""
+
+    def __init__(self, idle_seconds: float = MAIL_SMTP_IDLE_SECONDS, **options):
+        self.idle_seconds = idle_seconds
+        self.options = options
+        self.connections = 0
+        self._client = None
+        self._last_used = 0.0
+
+    def _new_client(self):
+        import aiosmtplib
+
+        options = {
+            "hostname": smtp_config.MAIL_SERVER,
+            "port": smtp_config.MAIL_PORT,
+            "username": smtp_config.MAIL_USERNAME or None,
+            "password": smtp_config.MAIL_PASSWORD or None,
+            "use_tls": smtp_config.MAIL_SSL_TLS,
+            "start_tls": smtp_config.MAIL_STARTTLS,
+            "timeout": smtp_config.MAIL_TIMEOUT_SECONDS,
+            **self.options,
+        }
+        return aiosmtplib.SMTP(**options)
+
+    async def _connection(self):
+        if self._client is not None and not self._client.is_connected:
+            self._client = None
+        if self._client is None:
+            client = self._new_client()
+            await client.connect()
+            self.connections += 1
+            self._client = client
+        return self._client
+
+    async def send(self, email: EmailMessage) -> None:
+        import aiosmtplib
+
+        reused = self._client is not None
+        try:
+            await (await self._connection()).send_message(email)
+        except aiosmtplib.SMTPServerDisconnected:
+            await self.close()
+            if not reused:
+                raise
+            # The server dropped the idle connection; retry once on a new one.
+            await (await self._connection()).send_message(email)
+        self._last_used = time.monotonic()
+
+    async def close_if_idle(self) -> None:
+        if self._client is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            await self.close()
+
+    async def close(self) -> None:
+        import aiosmtplib
+
+        client, self._client = self._client, None
+        if client is None or not client.is_connected:
+            return
+        try:
+            await client.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            client.close()
+
+
+class OutboxWorker:
+    """Drains mail_outbox; see the module docstring."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        smtp: PooledSMTP | None = None,
+        batch_size: int = MAIL_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = MAIL_OUTBOX_POLL_SECONDS,
+        lease_seconds: float = MAIL_OUTBOX_LEASE_SECONDS,
+        max_attempts: int = MAIL_OUTBOX_MAX_ATTEMPTS,
+        backoff_seconds: float = MAIL_OUTBOX_BACKOFF_SECONDS,
+        backoff_max_seconds: float = MAIL_OUTBOX_BACKOFF_MAX_SECONDS,
+        max_pending_seconds: float = MAIL_OUTBOX_MAX_PENDING_SECONDS,
+        retention_seconds: float = MAIL_OUTBOX_RETENTION_SECONDS,
+        purge_interval: float = MAIL_OUTBOX_PURGE_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.smtp = smtp or PooledSMTP()
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.max_pending_seconds = max_pending_seconds
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self._last_purge: float | None = None
+        self._task: asyncio.Task | None = None
+        self._wake: asyncio.Event | None = None
+        self._stopping = False
+        self.queue_depth = 0
+        self.oldest_pending_seconds = 0.0
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.expired = 0
+        self.purged = 0
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.backoff_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+
+    def start(self) -> None:
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self.run())
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self, timeout: float = MAIL_OUTBOX_STOP_TIMEOUT_SECONDS) -> None:
+        """Let the batch in flight finish; anything unsent stays in the table."""
+        self._stopping = True
+        self.wake()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Mail outbox worker did not stop within %.0fs", timeout)
+            self._task = None
+        await self.smtp.close()
+
+    async def run(self) -> None:
+        while not self._stopping:
+            now = time.monotonic()
+            if self._last_purge is None or now - self._last_purge >= self.purge_interval:
+                self._last_purge = now
+                try:
+                    await self.purge_once()
+                except Exception:
+                    logger.exception("Mail outbox purge failed")
+            try:
+                claimed = await self.drain_once()
+            except Exception:
+                logger.exception("Mail outbox batch failed")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue  # more may be due right away
+            await self.smtp.close_if_idle()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def drain_once(self) -> int:
+        """Claim and send one batch of due messages; returns how many were claimed."""
+        now = _utcnow()
+        async with self.session_factory() as db:
+            due = (
+                select(OutboxMessage.id)
+                .where(OutboxMessage.status == PENDING, OutboxMessage.next_attempt_at <= now)
+                .order_by(OutboxMessage.next_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            # The outer conditions are re-checked on PostgreSQL after a row
+            # lock wait, so a row claimed meanwhile is skipped, not resent.
+            claimed = (
+                await db.execute(
+                    update(OutboxMessage)
+                    .where(
+                        OutboxMessage.id.in_(due),
+                        OutboxMessage.status == PENDING,
+                        OutboxMessage.next_attempt_at <= now,
+                    )
+                    .values(next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+                    .returning(
+                        OutboxMessage.id,
+                        OutboxMessage.recipient,
+                        OutboxMessage.subject,
+                        OutboxMessage.body,
+                        OutboxMessage.subtype,
+                        OutboxMessage.attempts,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            ).all()
+            await db.commit()
+
+            if claimed:
+                changes = [await self._send(row) for row in claimed]
+                await db.execute(update(OutboxMessage), changes)
+                await db.commit()
+                self.batches += 1
+
+            await self._refresh_depth(db)
+        return len(claimed)
+
+    async def _send(self, row) -> dict:
+        attempts = row.attempts + 1
+        started = time.perf_counter()
+        try:
+            await self.smtp.send(build_email(row))
+        except Exception as error:
+            if is_connection_error(error):
+                await self.smtp.close()
+            permanent = is_permanent(error) or attempts >= self.max_attempts
+            outcome = FAILED if permanent else "retry"
+            mail_send_duration.observe((outcome,), time.perf_counter() - started)
+            logger.warning(
+                "Mail %s to %s failed (attempt %d%s): %r",
+                row.id,
+                row.recipient,
+                attempts,
+                ", giving up" if permanent else "",
+                error,
+            )
+            if permanent:
+                self.failed += 1
+                return {
+                    "id": row.id,
+                    "status": FAILED,
+                    "body": "",
+                    "attempts": attempts,
+                    "last_error": repr(error),
+                }
+            self.retried += 1
+            return {
+                "id": row.id,
+                "attempts": attempts,
+                "last_error": repr(error),
+                "next_attempt_at": _utcnow() + timedelta(seconds=self.backoff(attempts)),
+            }
+        mail_send_duration.observe((SENT,), time.perf_counter() - started)
+        self.sent += 1
+        return {
+            "id": row.id,
+            "status": SENT,
+            "body": "",
+            "attempts": attempts,
+            "sent_at": _utcnow(),
+        }
+
+    async def purge_once(self) -> tuple[int, int]:
+        """Fail stale pending messages and delete old finished ones; returns both counts."""
+        now = _utcnow()
+        async with self.session_factory() as db:
+            expired = await db.execute(
+                update(OutboxMessage)
+                .where(
+                    OutboxMessage.status == PENDING,
+                    OutboxMessage.created_at
+                    <= now - timedelta(seconds=self.max_pending_seconds),
+                )
+                .values(status=FAILED, body="", last_error="Expired before delivery")
+                .execution_options(synchronize_session=False)
+            )
+            purged = await db.execute(
+                delete(OutboxMessage)
+                .where(
+                    OutboxMessage.status != PENDING,
+                    OutboxMessage.created_at
+                    <= now - timedelta(seconds=self.retention_seconds),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        self.expired += expired.rowcount
+        self.purged += purged.rowcount
+        if expired.rowcount or purged.rowcount:
+            logger.info(
+                "Mail outbox: expired %d pending, deleted %d finished messages",
+                expired.rowcount,
+                purged.rowcount,
+            )
+        return expired.rowcount, purged.rowcount
+
+    async def _refresh_depth(self, db: AsyncSession) -> None:
+        depth, oldest = (
+            await db.execute(
+                select(func.count(), func.min(OutboxMessage.created_at)).where(
+                    OutboxMessage.status == PENDING
+                )
+            )
+        ).one()
+        self.queue_depth = depth
+        if oldest is None:
+            self.oldest_pending_seconds = 0.0
+        else:
+            if oldest.tzinfo is None:  # SQLite drops the offset; values are UTC
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            self.oldest_pending_seconds = max((_utcnow() - oldest).total_seconds(), 0.0)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": self.queue_depth,
+            "oldest_pending_seconds": self.oldest_pending_seconds,
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "expired": self.expired,
+            "purged": self.purged,
+            "smtp_connections": self.smtp.connections,
+        }
+
+
+outbox_worker = OutboxWorker(AsyncSessionLocal)
@@ -0,0 +1,234 @@
+"""
+Per-route request metrics.
+
+`MetricsMiddleware` times every HTTP request and, through cursor-execute
+hooks registered with `instrument_engine`, counts the queries it runs and
+the time spent in them. The numbers go to process-local Prometheus
+histograms rendered by GET /metrics, and to a `Server-Timing` header:
+
+    Server-Timing: app;dur=12.4, db;dur=3.1;desc="2 queries"
+
+`app` is measured up to the response headers, so for streaming responses
+it excludes the body; the histograms are recorded once the body is done.
+Routes are labelled by their template (/books/{book_id}), never the raw
+path, to keep label cardinality bounded. The same hooks feed the slow-query
+log and N+1 detector in utils/query_inspector.py.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+from utils.query_inspector import check_slow, is_repeatable, report_repeated
+
+load_dotenv()
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Prometheus client defaults.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass(slots=True)
+class RequestStats:
+    scope: dict | None = None
+    queries: int = 0
+    db_seconds: float = 0.0
+    # SELECT text -> executions, for the N+1 check
+    statements: dict[str, int] = field(default_factory=dict)
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar(
+    "current_request", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    stats = current_request.get()
+    check_slow(statement, parameters, executemany, elapsed, stats and stats.scope)
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        if is_repeatable(statement, executemany):
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def instrument_engine(engine) -> None:
+    """Count queries and DB time on `engine` (sync or async) for the current request."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            labels = _labels(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, label_values: tuple[str, ...], amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{{{_labels(zip(self.labels, label_values))}}} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, including the response body.",
+    ("method", "route", "status"),
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time spent in database queries per request.",
+    ("method", "route"),
+)
+request_queries = Counter(
+    "http_request_db_queries_total",
+    "Database queries executed by requests.",
+    ("method", "route"),
+)
+request_n_plus_one = Counter(
+    "http_request_n_plus_one_total",
+    "Requests that repeated an identical SELECT N_PLUS_ONE_THRESHOLD+ times.",
+    ("method", "route"),
+)
+
+
+def render_gauges(name: str, stats: dict, labels: dict[str, str] | None = None) -> list[str]:
+    """Render the numeric values of a stats() dict as `<name>_<key>` gauges."""
+    label_text = f"{{{_labels(labels.items())}}}" if labels else ""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            lines.extend(render_gauges(f"{name}_{key}", value, labels))
+        elif isinstance(value, (bool, int, float)):
+            lines.append(f"{name}_{key}{label_text} {float(value)}")
+    return lines
+
+
+def render_request_metrics() -> list[str]:
+    return (
+        request_duration.render()
+        + request_db_time.render()
+        + request_queries.render()
+        + request_n_plus_one.render()
+    )
+
+
+class MetricsMiddleware:
+    def __init__(self, app, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    queries = f"{stats.queries} quer{'y' if stats.queries == 1 else 'ies'}"
+                    timing = (
+                        f"app;dur={elapsed_ms:.1f}, "
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{queries}"'
+                    )
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", timing.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            request_duration.observe(
+                (method, route_path, str(status_code)), time.perf_counter() - started
+            )
+            request_db_time.observe((method, route_path), stats.db_seconds)
+            request_queries.inc((method, route_path), stats.queries)
+            if report_repeated(stats.statements, scope):
+                request_n_plus_one.inc((method, route_path))
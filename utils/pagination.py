@@ -0,0 +1,78 @@
+"""
+Keyset (cursor) pagination over books ordered by (created_at, id).
+
+A cursor is an opaque, url-safe token carrying the sort key of the row it was
+cut from and the direction to travel from there:
+    next -> rows strictly after the key, ascending
+    prev -> rows strictly before the key, descending (reversed by the caller)
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import Book
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(created_at: datetime, book_id: uuid.UUID, direction: str) -> str:
+    payload = {"c": created_at.isoformat(), "i": book_id.hex, "d": direction}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = payload["d"]
+        if direction not in (NEXT, PREV):
+            raise ValueError("Unknown cursor direction")
+        return (
+            datetime.fromisoformat(payload["c"]),
+            uuid.UUID(hex=payload["i"]),
+            direction,
+        )
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+
+
+def _created_at_bound(dialect_name: str, created_at: datetime) -> ColumnElement:
+    # SQLite keeps server_default timestamps as CURRENT_TIMESTAMP text
+    # ("YYYY-MM-DD HH:MM:SS") while the DateTime bind processor always appends
+    # microseconds, so equal keys would compare as unequal strings. Bind the
+    # value in the stored text format instead.
+    if dialect_name == "sqlite":
+        text_value = created_at.strftime("%Y-%m-%d %H:%M:%S")
+        if created_at.microsecond:
+            text_value += f".{created_at.microsecond:06d}"
+        return literal(text_value, String)
+    return literal(created_at, Book.created_at.type)
+
+
+def keyset_filter(
+    dialect_name: str, created_at: datetime, book_id: uuid.UUID, direction: str
+) -> ColumnElement[bool]:
+    row_key = tuple_(Book.created_at, Book.id)
+    bound_key = tuple_(
+        _created_at_bound(dialect_name, created_at), literal(book_id, Book.id.type)
+    )
+    if direction == NEXT:
+        return row_key > bound_key
+    return row_key < bound_key
+
+
+def keyset_order(direction: str) -> tuple[ColumnElement, ColumnElement]:
+    if direction == NEXT:
+        return Book.created_at.asc(), Book.id.asc()
+    return Book.created_at.desc(), Book.id.desc()
@@ -0,0 +1,46 @@
+import os
+import uuid
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from utils.ttl_cache import TTLCache
+
+load_dotenv()
+
+PRINCIPAL_CACHE_ENABLED = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10_000))
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user as seen by authorization checks."""
+
+    id: uuid.UUID
+    email: str
+    role: str
+    is_verified: bool
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            is_verified=bool(user.is_verified),
+        )
+
+
+# Keyed by token subject (email). Routes that change a user's role or
+# verification state, or delete the user, must invalidate it; other workers
+# only see the change once their entry expires, so keep the TTL short.
+principal_cache: TTLCache[str, Principal] = TTLCache(
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=PRINCIPAL_CACHE_ENABLED,
+)
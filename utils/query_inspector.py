@@ -0,0 +1,138 @@
+"""
+Query inspection on top of the cursor hooks in utils/metrics.py.
+
+Slow queries: every statement slower than SLOW_QUERY_MS is logged with
+the route that ran it and the shape of its parameters (types and counts,
+never values), e.g.
+
+    Slow query 412.0 ms on GET /books: SELECT ... params=(str, int x 2)
+
+N+1: at the end of a request, any SELECT that ran N_PLUS_ONE_THRESHOLD or
+more times with identical SQL (only the bound values differ) is logged
+and counted in `http_request_n_plus_one_total`. That is the signature of a
+lazy relationship loaded row by row. Writes are excluded: chunked bulk
+statements and executemany batches repeat by design.
+
+Tests: `assert_max_queries` fails when a block runs more queries than
+allowed:
+
+    with assert_max_queries(2):
+        client.get("/books")
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+# Longest statement excerpt written to the log.
+MAX_LOGGED_SQL = 500
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by type, collapsing runs: (str, UUID x 20, int)."""
+    if executemany:
+        rows = list(parameters or ())
+        first = parameter_shape(rows[0]) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(
+            f"{key}: {type(value).__name__}" for key, value in parameters.items()
+        ) + "}"
+    names = [type(value).__name__ for value in parameters or ()]
+    parts = []
+    for name, run in groupby(names):
+        count = len(list(run))
+        parts.append(name if count == 1 else f"{name} x {count}")
+    return "(" + ", ".join(parts) + ")"
+
+
+def route_label(scope: dict | None) -> str:
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', scope.get('path', ''))}"
+
+
+def _excerpt(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_LOGGED_SQL:
+        return statement[:MAX_LOGGED_SQL] + "..."
+    return statement
+
+
+def check_slow(statement: str, parameters, executemany: bool, seconds: float, scope) -> None:
+    if seconds * 1000 < SLOW_QUERY_MS:
+        return
+    logger.warning(
+        "Slow query %.1f ms on %s: %s params=%s",
+        seconds * 1000,
+        route_label(scope),
+        _excerpt(statement),
+        parameter_shape(parameters, executemany),
+    )
+
+
+def is_repeatable(statement: str, executemany: bool) -> bool:
+    return not executemany and statement.lstrip()[:6].upper() == "SELECT"
+
+
+def repeated_statements(statements: dict[str, int]) -> list[tuple[str, int]]:
+    return [
+        (statement, count)
+        for statement, count in statements.items()
+        if count >= N_PLUS_ONE_THRESHOLD
+    ]
+
+
+def report_repeated(statements: dict[str, int], scope) -> int:
+    """Log likely N+1 patterns for one request; returns how many were found."""
+    repeated = repeated_statements(statements)
+    for statement, count in repeated:
+        logger.warning(
+            "Possible N+1 on %s: %d identical queries: %s",
+            route_label(scope),
+            count,
+            _excerpt(statement),
+        )
+    return len(repeated)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engines=None):
+    """Fail if the block runs more than `max_queries` statements on `engines`."""
+    if engines is None:
+        from config.session import async_engine, sync_engine
+
+        engines = (sync_engine, async_engine)
+    targets = [getattr(engine, "sync_engine", engine) for engine in engines]
+    lock = threading.Lock()
+    executed: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        with lock:
+            executed.append(statement)
+
+    for target in targets:
+        event.listen(target, "after_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        for target in targets:
+            event.remove(target, "after_cursor_execute", record)
+
+    if len(executed) > max_queries:
+        listing = "\n".join(f"  {n}. {_excerpt(sql)}" for n, sql in enumerate(executed, 1))
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, {len(executed)} ran:\n{listing}"
+        )
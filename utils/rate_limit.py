@@ -0,0 +1,273 @@
+"""
+Token-bucket rate limiting for the auth endpoints.
+
+Every login and registration costs a bcrypt hash (utils/hashing.py), so a
+single client can otherwise use up the hashing pool for everybody. Routes call
+`await rate_limiter.check(request, scope, email)` as their first statement, before
+any database or hashing work. The call takes one token from the client IP's
+bucket, shared by all auth endpoints, and one from the bucket of
+`scope` + email. When either bucket is empty it raises 429 with Retry-After.
+
+A bucket holds up to `burst` tokens and refills at `per_minute` tokens a
+minute. Buckets live in a store (RATE_LIMIT_BACKEND):
+    memory  -> the default: per-worker LRU dicts split into RATE_LIMIT_SHARDS
+               shards, each with its own lock, holding at most
+               RATE_LIMIT_MAX_KEYS buckets in total
+    sqlite  -> one table in RATE_LIMIT_SQLITE_PATH shared by every worker
+               process on the host; each check is a short write transaction,
+               run in the threadpool so waiting for the lock never blocks
+               the event loop; meant for local multi-worker runs and tests
+A shared store for several hosts only needs another `BucketStore`.
+
+Throttled requests are counted in `rate_limit_throttled_total`, exported by
+GET /metrics.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from utils.metrics import Counter
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", 16))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100_000))
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./rate_limit.db")
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", 60))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", 20))
+RATE_LIMIT_EMAIL_PER_MINUTE = float(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", 6))
+RATE_LIMIT_EMAIL_BURST = int(os.getenv("RATE_LIMIT_EMAIL_BURST", 5))
+# Take the client IP from the first X-Forwarded-For entry; only behind a proxy
+# that sets it, or clients can pick their own bucket.
+RATE_LIMIT_TRUST_FORWARDED = os.getenv(
+    "RATE_LIMIT_TRUST_FORWARDED", "false"
+).lower() in ("1", "true", "yes")
+
+throttled_requests = Counter(
+    "rate_limit_throttled_total",
+    "Auth requests rejected with 429, by endpoint and by the bucket that was empty.",
+    ("scope", "key"),
+)
+
+
+class Limit(NamedTuple):
+    per_minute: float
+    burst: int
+
+
+def refill(
+    tokens: float, updated_at: float, now: float, limit: Limit
+) -> tuple[float, float]:
+    """
+    Take one token from a bucket last left at `tokens` at `updated_at`.
+    Returns the tokens left and 0.0, or, for an empty bucket, its unchanged
+    level and the seconds until a token is available.
+    """
+    rate = limit.per_minute / 60
+    tokens = min(limit.burst, tokens + max(now - updated_at, 0.0) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class BucketStore(ABC):
+    """
+    Holds bucket levels; `take` must be atomic per key and must not block the
+    event loop. `stats` is called on every /metrics scrape, so it only reads
+    counters.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take a token from `key`'s bucket; returns 0.0 or the seconds to wait."""
+
+    def stats(self) -> dict[str, float]:
+        return {}
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self, shards: int = RATE_LIMIT_SHARDS, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(max(shards, 1))]
+        self.max_keys_per_shard = max(max_keys // len(self._shards), 1)
+        self.evicted = 0
+
+    async def take(self, key: str, limit: Limit) -> float:
+        # A few dict operations: cheaper inline than a threadpool hop.
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            state = buckets.get(key)
+            if state is None:
+                tokens, wait = refill(limit.burst, now, now, limit)
+                buckets[key] = (tokens, now)
+                if len(buckets) > self.max_keys_per_shard:
+                    # Least recently used first; a dropped bucket comes back
+                    # full, which only favours that client.
+                    buckets.popitem(last=False)
+                    self.evicted += 1
+            else:
+                tokens, wait = refill(*state, now, limit)
+                buckets[key] = (tokens, now)
+                buckets.move_to_end(key)
+        return wait
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": sum(len(buckets) for _, buckets in self._shards),
+            "evicted": self.evicted,
+        }
+
+
+class SQLiteBucketStore(BucketStore):
+    # Rows idle this long are full again and are deleted now and then.
+    IDLE_SECONDS = 3600
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._count_lock = threading.Lock()
+        self._takes = 0
+        # Rows in the table as of the last prune, plus the ones added since
+        # by this process, for stats().
+        self.keys = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    async def take(self, key: str, limit: Limit) -> float:
+        # Waiting for the write lock (up to the 5 s timeout) happens in a worker thread.
+        return await run_in_threadpool(self._take, key, limit)
+
+    def _take(self, key: str, limit: Limit) -> float:
+        conn = self._connection()
+        # Wall-clock time, since several processes share the rows.
+        now = time.time()
+        # IMMEDIATE takes the write lock up front, so the read and the write
+        # below can't interleave with another worker's.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, wait = refill(*(row or (limit.burst, now)), now, limit)
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated_at = excluded.updated_at",
+                (key, tokens, now),
+            )
+            with self._count_lock:
+                self._takes += 1
+                self.keys += row is None
+                prune = self._takes % self.PRUNE_EVERY == 1
+            if prune:
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+                    (now - self.IDLE_SECONDS,),
+                )
+                self.keys = conn.execute(
+                    "SELECT count(*) FROM rate_limit_buckets"
+                ).fetchone()[0]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def stats(self) -> dict[str, float]:
+        return {"keys": self.keys, "takes": self._takes}
+
+
+def get_bucket_store(name: str = RATE_LIMIT_BACKEND) -> BucketStore:
+    if name == "memory":
+        return MemoryBucketStore()
+    if name == "sqlite":
+        return SQLiteBucketStore(RATE_LIMIT_SQLITE_PATH)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        store: BucketStore,
+        ip_limit: Limit,
+        email_limit: Limit,
+        enabled: bool = True,
+        trust_forwarded: bool = False,
+    ):
+        self.store = store
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+        self.enabled = enabled
+        self.trust_forwarded = trust_forwarded
+        self.checked = 0
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",", 1)[0].strip()
+        # The raw ASGI tuple; request.client builds a new Address every call.
+        client = request.scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def check(
+        self, request: Request, scope: str, email: str | None = None
+    ) -> None:
+        """Raise 429 if the client IP or `email` is over its limit for `scope`."""
+        if not self.enabled:
+            return
+        self.checked += 1
+        wait = await self.store.take(f"ip:{self.client_ip(request)}", self.ip_limit)
+        key = "ip"
+        if not wait and email:
+            wait = await self.store.take(
+                f"{scope}:email:{email.strip().lower()}", self.email_limit
+            )
+            key = "email"
+        if wait:
+            throttled_requests.inc((scope, key))
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, try again later.",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "checked": self.checked, "store": self.store.stats()}
+
+
+rate_limiter = RateLimiter(
+    get_bucket_store(),
+    ip_limit=Limit(RATE_LIMIT_IP_PER_MINUTE, RATE_LIMIT_IP_BURST),
+    email_limit=Limit(RATE_LIMIT_EMAIL_PER_MINUTE, RATE_LIMIT_EMAIL_BURST),
+    enabled=RATE_LIMIT_ENABLED,
+    trust_forwarded=RATE_LIMIT_TRUST_FORWARDED,
+)
@@ -1,16 +1,18 @@
-from fastapi_mail import ConnectionConfig
-from dotenv import load_dotenv
-from pydantic import SecretStr
+"""
+SMTP settings used by the mail outbox (utils/mail_outbox.py).
+"""
+
 import os
 
+from dotenv import load_dotenv
+
 load_dotenv()
 
-mail_config = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME") or "",
-    MAIL_PASSWORD=SecretStr(os.getenv("MAIL_PASSWORD") or ""),
-    MAIL_FROM=os.getenv("MAIL_FROM") or "",
-    MAIL_PORT=int(os.getenv("MAIL_PORT") or 587),
-    MAIL_SERVER=os.getenv("MAIL_SERVER") or "smtp.gmail.com",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-)
+MAIL_USERNAME = os.getenv("MAIL_USERNAME") or ""
+MAIL_PASSWORD = os.getenv("MAIL_PASSWORD") or ""
+MAIL_FROM = os.getenv("MAIL_FROM") or ""
+MAIL_PORT = int(os.getenv("MAIL_PORT") or 587)
+MAIL_SERVER = os.getenv("MAIL_SERVER") or "smtp.gmail.com"
+MAIL_STARTTLS = (os.getenv("MAIL_STARTTLS") or "true").lower() in ("1", "true", "yes")
+MAIL_SSL_TLS = (os.getenv("MAIL_SSL_TLS") or "false").lower() in ("1", "true", "yes")
+MAIL_TIMEOUT_SECONDS = float(os.getenv("MAIL_TIMEOUT_SECONDS") or 30)
@@ -0,0 +1,303 @@
+"""
+Image uploads behind a pluggable storage backend.
+
+The upload is streamed to a temporary file on disk while its size is checked,
+so an oversized image is rejected without being held in memory. The backend
+call (a blocking SDK or filesystem operation) then runs in a bounded thread
+pool with a timeout, off the event loop.
+
+Book covers also get resized variants (utils/image_variants.py): the spooled
+file is rendered in a process pool and every variant is stored. The time
+spent in each stage (spool, decode, resize, encode, store) is recorded in
+the `image_pipeline_stage_seconds` histogram.
+
+Backends (STORAGE_BACKEND):
+    imagekit -> ImageKit (utils/imagekit.py), the default
+    local    -> files under LOCAL_STORAGE_ROOT, served at LOCAL_STORAGE_BASE_URL;
+                needs no network, used for tests and benchmarks
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile, status
+
+from utils.image_variants import (
+    IMAGE_VARIANT_TIMEOUT_SECONDS,
+    VariantPool,
+    variant_pool,
+    variants_enabled,
+)
+from utils.metrics import Histogram
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "imagekit")
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "./media")
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "/media")
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", 5 * 1024 * 1024))
+IMAGE_UPLOAD_WORKERS = int(os.getenv("IMAGE_UPLOAD_WORKERS", 4))
+IMAGE_UPLOAD_TIMEOUT_SECONDS = float(os.getenv("IMAGE_UPLOAD_TIMEOUT_SECONDS", 20))
+
+# The stored extension follows the validated content type, never the
+# client's file name.
+IMAGE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+ALLOWED_IMAGE_TYPES = list(IMAGE_EXTENSIONS)
+
+READ_CHUNK_BYTES = 64 * 1024
+
+image_stage_duration = Histogram(
+    "image_pipeline_stage_seconds",
+    "Time spent per image upload stage.",
+    ("stage",),
+)
+
+
+class StorageBackend(ABC):
+    """Blocking storage API; ImageUploadService calls it from worker threads."""
+
+    @abstractmethod
+    def save(self, path: Path, file_name: str, folder: str, tags: list[str]) -> str:
+        """Store the file at `path` and return its public URL."""
+
+
+class LocalFileSystemBackend(StorageBackend):
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, path: Path, file_name: str, folder: str, tags: list[str]) -> str:
+        target_dir = (self.root / folder).resolve()
+        target = (target_dir / file_name).resolve()
+        if target.parent != target_dir or not target_dir.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Refusing to store {file_name!r} outside {folder!r}")
+        target_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        return f"{self.base_url}/{folder}/{file_name}"
+
+
+def get_storage_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name == "local":
+        return LocalFileSystemBackend(LOCAL_STORAGE_ROOT, LOCAL_STORAGE_BASE_URL)
+    if name == "imagekit":
+        from utils.imagekit import ImageKitBackend
+
+        return ImageKitBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {name}")
+
+
+class ImageUploadService:
+    def __init__(
+        self,
+        backend: StorageBackend,
+        max_bytes: int,
+        workers: int,
+        timeout: float,
+    ):
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="image-upload"
+        )
+
+    async def upload(
+        self, image: UploadFile, folder: str, tags: list[str], prefix: str
+    ) -> str:
+        ext = self._check(image)
+        file_name = f"{prefix}_{uuid.uuid4().hex}.{ext}"
+
+        spooled = await self._spool(image)
+        try:
+            (url,) = await self._store([(spooled, file_name)], folder, tags)
+            return url
+        finally:
+            # A timed-out save may still be reading the file; unlinking is
+            # safe on POSIX because its open handle keeps the data alive.
+            spooled.unlink(missing_ok=True)
+
+    async def upload_variants(
+        self,
+        image: UploadFile,
+        folder: str,
+        tags: list[str],
+        prefix: str,
+        pool: VariantPool,
+        timeout: float = IMAGE_VARIANT_TIMEOUT_SECONDS,
+    ) -> dict[str, dict[str, str]]:
+        """
+        Store the resized variants of `image`; returns their URLs as
+        {size: {"webp": url, <original format>: url}}.
+        """
+        self._check(image)
+        spooled = await self._spool(image)
+        out_dir = tempfile.mkdtemp(prefix="variants_")
+        try:
+            try:
+                rendered = await asyncio.wait_for(
+                    pool.render(str(spooled), out_dir), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="Image processing timed out.",
+                )
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image."
+                )
+            for stage, seconds in rendered["timings"].items():
+                image_stage_duration.observe((stage,), seconds)
+
+            stem = f"{prefix}_{uuid.uuid4().hex}"
+            files = rendered["files"]
+            urls = await self._store(
+                [
+                    (Path(path), f"{stem}_{size}.{Path(path).suffix[1:]}")
+                    for size, _, path in files
+                ],
+                folder,
+                tags,
+            )
+        finally:
+            spooled.unlink(missing_ok=True)
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+        variants: dict[str, dict[str, str]] = {}
+        for (size, key, _), url in zip(files, urls):
+            variants.setdefault(size, {})[key] = url
+        return variants
+
+    def _check(self, image: UploadFile) -> str:
+        """Reject what can be refused before reading the body; returns the extension."""
+        if not image or not image.filename:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="No image provided."
+            )
+
+        if image.content_type not in ALLOWED_IMAGE_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image format."
+            )
+
+        if image.size is not None and image.size > self.max_bytes:
+            raise self._too_large()
+
+        return IMAGE_EXTENSIONS[image.content_type]
+
+    async def _store(
+        self, files: list[tuple[Path, str]], folder: str, tags: list[str]
+    ) -> list[str]:
+        """Save (path, file_name) pairs through the backend concurrently; returns their URLs."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            urls = await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            self._executor, self.backend.save, path, file_name, folder, tags
+                        )
+                        for path, file_name in files
+                    )
+                ),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Image upload timed out.",
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Image upload failed: {str(e)}"
+            )
+        image_stage_duration.observe(("store",), time.perf_counter() - started)
+        return urls
+
+    async def _spool(self, image: UploadFile) -> Path:
+        """Copy the upload to a temp file, enforcing the size limit as it streams."""
+        started = time.perf_counter()
+        fd, name = tempfile.mkstemp(prefix="upload_")
+        path = Path(name)
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await image.read(READ_CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise self._too_large()
+                    out.write(chunk)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+        if size == 0:
+            path.unlink(missing_ok=True)
+            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+        image_stage_duration.observe(("spool",), time.perf_counter() - started)
+        return path
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image exceeds {self.max_bytes} bytes.",
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_uploads = ImageUploadService(
+    backend=get_storage_backend(),
+    max_bytes=IMAGE_MAX_BYTES,
+    workers=IMAGE_UPLOAD_WORKERS,
+    timeout=IMAGE_UPLOAD_TIMEOUT_SECONDS,
+)
+
+
+async def upload_profile_img(profile_img: UploadFile) -> str:
+    return await image_uploads.upload(
+        profile_img, folder="users/profile", tags=["users", "profiles"], prefix="profile"
+    )
+
+
+async def upload_book_cover(
+    cover_img: UploadFile,
+) -> tuple[str, dict[str, dict[str, str]] | None]:
+    """
+    Returns the book_cover_image URL and the variant URLs. The URL is the
+    largest variant in the upload's own format; with variants disabled the
+    cover is stored as uploaded and there are no variants.
+    """
+    if not variants_enabled():
+        url = await image_uploads.upload(
+            cover_img, folder="books/covers", tags=["books", "covers"], prefix="cover"
+        )
+        return url, None
+
+    variants = await image_uploads.upload_variants(
+        cover_img,
+        folder="books/covers",
+        tags=["books", "covers"],
+        prefix="cover",
+        pool=variant_pool,
+    )
+    largest = next(iter(variants.values()))
+    url = next((url for key, url in largest.items() if key != "webp"), largest["webp"])
+    return url, variants
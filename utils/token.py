@@ -1,21 +1,38 @@
+import hashlib
 import secrets
 from fastapi import HTTPException
-from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import os
 from dotenv import load_dotenv
+from utils.ttl_cache import TTLCache
 
 load_dotenv()
 
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 SECRET_KEY = os.getenv("SECRET_KEY", "PLACEHOLDER_FOR_SECRET_KEY")
 TOKEN_EXPIRE_MINUTES = int(os.getenv("TOKEN_EXPIRE_MINUTES", 60))
+TOKEN_CACHE_ENABLED = os.getenv("TOKEN_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10_000))
+
+
+# Payloads that already passed signature and claim checks, keyed by a SHA-256
+# digest of the token. Entries expire at the token's own `exp`, so a cached
+# token can't be accepted after it expires.
+verified_tokens: TTLCache[bytes, dict] = TTLCache(
+    max_entries=TOKEN_CACHE_MAX_ENTRIES, enabled=TOKEN_CACHE_ENABLED
+)
 
 
 def create_access_token(
     email: str, role: str, expires_delta: Optional[timedelta] = None
 ) -> tuple[str, int]:
+    from jose import jwt
+
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=TOKEN_EXPIRE_MINUTES)
     )
@@ -27,9 +44,19 @@ def create_access_token(
 
 
 def decode_token(token: str):
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = verified_tokens.get(digest)
+    if payload is not None:
+        return dict(payload)
+    # jose is slow to import, so it is loaded on the first token that is
+    # not already in verified_tokens.
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        if isinstance(payload.get("exp"), (int, float)):
+            verified_tokens.put(digest, payload, expires_at=payload["exp"])
+        return dict(payload)
     except JWTError:
         raise HTTPException(
             status_code=401,
@@ -40,3 +67,8 @@ def decode_token(token: str):
 
 def generate_secret_token() -> str:
     return secrets.token_urlsafe(32)
+
+
+def hash_verification_token(token: str) -> str:
+    """Digest stored in verification_tokens.token_digest and looked up on verify."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
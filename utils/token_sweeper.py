@@ -0,0 +1,108 @@
+"""
+Background cleanup of verification_tokens.
+
+A token is useless once it has expired or been used, and nothing else ever
+deletes it. `token_sweeper`, started in main.py's lifespan, deletes such rows
+every TOKEN_SWEEP_INTERVAL_SECONDS in batches of TOKEN_SWEEP_BATCH_SIZE, one
+short transaction per batch, so a large backlog never holds a long lock.
+Batches are found through the expires_at index.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from config.session import AsyncSessionLocal
+from models import VerificationToken
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SWEEP_ENABLED = os.getenv("TOKEN_SWEEP_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+TOKEN_SWEEP_INTERVAL_SECONDS = float(os.getenv("TOKEN_SWEEP_INTERVAL_SECONDS", 600))
+TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", 1000))
+# Upper bound per run, so one run can't keep the worker busy indefinitely;
+# whatever is left waits for the next run.
+TOKEN_SWEEP_MAX_BATCHES = int(os.getenv("TOKEN_SWEEP_MAX_BATCHES", 100))
+
+
+class TokenSweeper:
+    """Deletes expired and used verification tokens; see the module docstring."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        interval: float = TOKEN_SWEEP_INTERVAL_SECONDS,
+        batch_size: int = TOKEN_SWEEP_BATCH_SIZE,
+        max_batches: int = TOKEN_SWEEP_MAX_BATCHES,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.runs = 0
+        self.deleted = 0
+        self.last_deleted = 0
+
+    async def run(self) -> None:
+        """Sweep until cancelled."""
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("Verification token sweep failed")
+            await asyncio.sleep(self.interval)
+
+    async def sweep_once(self) -> int:
+        """Delete up to max_batches batches of stale tokens; returns the row count."""
+        now = datetime.now(timezone.utc)
+        stale = (
+            select(VerificationToken.token_id)
+            .where(
+                or_(
+                    VerificationToken.expires_at <= now,
+                    VerificationToken.is_used == True,
+                )
+            )
+            .limit(self.batch_size)
+        )
+        deleted = 0
+        for _ in range(self.max_batches):
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    delete(VerificationToken)
+                    .where(VerificationToken.token_id.in_(stale))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                break
+            await asyncio.sleep(0)  # let requests in between batches
+
+        self.runs += 1
+        self.deleted += deleted
+        self.last_deleted = deleted
+        if deleted:
+            logger.info("Deleted %d stale verification tokens", deleted)
+        return deleted
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "last_deleted": self.last_deleted,
+        }
+
+
+token_sweeper = TokenSweeper(AsyncSessionLocal)
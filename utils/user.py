@@ -1,30 +1,40 @@
 from fastapi import Depends, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordBearer
 from models import User
-from database import get_db
+from database import get_async_db
 from .token import decode_token
+from .principal_cache import Principal, principal_cache
 
 oauth_scheme = OAuth2PasswordBearer(tokenUrl="")
 
 
-def get_current_user(
-    request: Request, token: str = Depends(oauth_scheme), db: Session = Depends(get_db)
-):
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
     cookie_token = request.cookies.get("access_token")
     if cookie_token:
         token = cookie_token
 
     payload = decode_token(token)
     email = payload["sub"]
-    user = db.query(User).filter(User.email == email).first()
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(status_code=404, detail="No user found!")
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(email, principal)
+    return principal
 
 
 def allowed_role(allowed_role: str):
-    async def role_checker(current_user=Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role != allowed_role:
             raise HTTPException(
                 status_code=403, detail="Access forbidden: insufficient permissions"